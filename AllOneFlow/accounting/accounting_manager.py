@@ -68,9 +68,16 @@ class AccountingManager:
             )
             session.add(entry)
             
+            # 전표 라인의 계정코드를 한 번에 조회
+            codes = {line['account_code'] for line in lines}
+            accounts = {
+                account.code: account
+                for account in session.query(Account).filter(Account.code.in_(codes))
+            }
+            
             # 전표 라인 생성
             for line in lines:
-                account = session.query(Account).filter_by(code=line['account_code']).first()
+                account = accounts.get(line['account_code'])
                 if not account:
                     raise ValueError(f"계정과목을 찾을 수 없습니다: {line['account_code']}")
                 
@@ -2,7 +2,7 @@ from flask import Flask, request, jsonify, send_file
 from datetime import datetime
 import os
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 from ..database.models import (
     Base, Contract, Transaction, Report, Account, AccountType,
     JournalEntry, FiscalYear, Budget, BudgetType, CostCenter,
@@ -11,6 +11,8 @@ from ..database.models import (
 from ..contract_automation.contract_generator import ContractGenerator
 from ..erp_integration.erp_connector import ERPConnector
 from ..anomaly_detection.anomaly_detector import AnomalyDetector
+from ..anomaly_detection.retrain_scheduler import RetrainScheduler
+from ..anomaly_detection.streaming import AnomalyAlert, StreamingAnomalyScorer
 from ..report_generation.report_generator import ReportGenerator
 from ..accounting.accounting_manager import AccountingManager
 from ..accounting.advanced_accounting_manager import AdvancedAccountingManager
@@ -28,7 +30,14 @@ app = Flask(__name__)
 # 데이터베이스 설정
 engine = create_engine('sqlite:///alloneflow.db')
 Base.metadata.create_all(engine)
-Session = sessionmaker(bind=engine)
+
+# 요청(앱 컨텍스트) 단위 세션: 요청이 끝나면 teardown에서 롤백·종료하여 연결을 반납합니다.
+Session = scoped_session(sessionmaker(bind=engine))
+
+@app.teardown_appcontext
+def remove_session(exception=None):
+    """요청이 끝나면 세션을 정리합니다. (커밋되지 않은 변경은 롤백)"""
+    Session.remove()
 
 # 컴포넌트 초기화
 contract_generator = ContractGenerator()
@@ -37,6 +46,21 @@ erp_connector = ERPConnector(
     api_key=os.getenv('ERP_API_KEY')
 )
 anomaly_detector = AnomalyDetector()
+anomaly_retrain_scheduler = RetrainScheduler(
+    anomaly_detector, Session,
+    interval_seconds=float(os.getenv('ANOMALY_RETRAIN_HOURS', 24)) * 3600
+)
+# 거래 저장 시점 이상 탐지: 새 Transaction을 flush 직전에 평가하고 이상 거래를 알림
+anomaly_stream = StreamingAnomalyScorer(anomaly_detector).listen()
+
+def log_anomaly_alert(alert: AnomalyAlert) -> None:
+    """이상 거래 알림을 로그로 남깁니다."""
+    logger.warning(
+        f"이상 거래 감지({alert.source}): 거래 {alert.transaction_id}, 금액 {alert.amount}, "
+        f"카테고리 {alert.category}, 점수 {alert.score:.3f} (모델 v{alert.model_version})"
+    )
+
+anomaly_stream.subscribe(log_anomaly_alert)
 report_generator = ReportGenerator()
 accounting_manager = AccountingManager()
 advanced_accounting_manager = AdvancedAccountingManager()
@@ -90,27 +114,79 @@ def sync_transactions():
         # 거래 내역 조회
         transactions = erp_connector.fetch_transactions(start_date, end_date)
         
-        # 데이터베이스에 저장
+        # 데이터베이스에 저장 (저장된 모델이 있으면 anomaly_stream이 저장 시점에 평가)
         session = Session()
-        erp_connector.sync_transactions(session, transactions)
-        
-        # 이상 거래 탐지
-        is_anomaly, scores = anomaly_detector.detect_anomalies(transactions)
-        
-        # 이상 거래 정보 업데이트
-        transaction_ids = [t['id'] for t in transactions]
-        anomaly_detector.update_transaction_anomalies(session, transaction_ids, is_anomaly)
+        anomaly_detector.warm_features(session)
+        session.info['anomaly_stream_source'] = 'erp'
+        created = erp_connector.sync_transactions(session, transactions)
+        summary = anomaly_stream.pop_summary(session)
+        
+        if summary is None:
+            # 학습된 모델이 없으면 이번 배치로 학습하여 평가 후 일괄 업데이트
+            rows = [
+                {"id": t.id, "transaction_date": t.transaction_date, "amount": t.amount,
+                 "category": t.category, "contract_id": t.contract_id}
+                for t in created
+            ]
+            is_anomaly, scores = anomaly_detector.detect_anomalies(rows)
+            anomaly_detector.update_transaction_anomalies(
+                session, [row['id'] for row in rows], is_anomaly, scores
+            )
+            summary = {"anomalies": sum(is_anomaly), "model_version": None}
         
         return jsonify({
             "message": "거래 내역이 성공적으로 동기화되었습니다.",
             "total_transactions": len(transactions),
-            "anomalies_detected": sum(is_anomaly)
+            "anomalies_detected": summary["anomalies"],
+            "model_version": summary["model_version"]
         })
         
     except Exception as e:
         logger.error(f"거래 내역 동기화 중 오류 발생: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/anomaly-model', methods=['GET'])
+def get_anomaly_model():
+    """현재 이상 탐지 모델의 버전과 학습 정보를 조회합니다."""
+    try:
+        bundle = anomaly_detector.model_store.latest()
+        if bundle is None:
+            return jsonify({"error": "학습된 이상 탐지 모델이 없습니다."}), 404
+        
+        return jsonify({
+            "version": bundle["version"],
+            "features": bundle["features"],
+            "n_samples": bundle["n_samples"],
+            "trained_at": bundle["trained_at"].isoformat(),
+            "window_start": bundle["window_start"].isoformat(),
+            "window_end": bundle["window_end"].isoformat(),
+            "versions": anomaly_detector.model_store.versions(),
+            "streaming": anomaly_stream.stats()
+        })
+        
+    except Exception as e:
+        logger.error(f"이상 탐지 모델 조회 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/anomaly-model/train', methods=['POST'])
+def train_anomaly_model():
+    """최근 거래로 이상 탐지 모델을 다시 학습합니다."""
+    try:
+        session = Session()
+        try:
+            result = anomaly_detector.train(session)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify({
+            "message": "이상 탐지 모델이 학습되었습니다.",
+            **result
+        }), 201
+        
+    except Exception as e:
+        logger.error(f"이상 탐지 모델 학습 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/reports/weekly', methods=['POST'])
 def generate_weekly_report():
     """주간 보고서를 생성합니다."""
@@ -497,4 +573,7 @@ def analyze_account(account_id):
         return jsonify({"error": str(e)}), 500
 
 if __name__ == '__main__':
+    # 이상 탐지 모델 주기적 재학습 (ANOMALY_RETRAIN_HOURS, 기본 24시간)
+    anomaly_retrain_scheduler.start()
+    anomaly_stream.start()
     app.run(debug=True) 
\ No newline at end of file
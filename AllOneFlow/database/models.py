@@ -66,18 +66,20 @@ class JournalLine(Base):
     entry = relationship("JournalEntry", back_populates="lines")
     account = relationship("Account")
     cost_center = relationship("CostCenter")
-    cost_allocations = relationship("CostAllocation", backref="journal_line")
+    cost_allocations = relationship("CostAllocation", back_populates="journal_line")
 
 class Transaction(Base):
     """ERP 시스템에서 가져온 거래 정보"""
     __tablename__ = 'transactions'
     
     id = Column(Integer, primary_key=True)
-    transaction_date = Column(DateTime, nullable=False)
+    transaction_date = Column(DateTime, nullable=False, index=True)  # 기간 조회·일괄 평가 순서
     amount = Column(Float, nullable=False)
     description = Column(String(200))
     category = Column(String(50))
     is_anomaly = Column(Boolean, default=False)
+    anomaly_score = Column(Float)  # 이상 점수 (낮을수록 이상치에 가까움)
+    anomaly_model_version = Column(Integer)  # 평가에 사용한 이상 탐지 모델 버전
     contract_id = Column(Integer, ForeignKey('contracts.id'))
     journal_entry_id = Column(Integer, ForeignKey('journal_entries.id'))  # 연결된 전표
     vat_type = Column(Enum(VATType), default=VATType.TAXABLE)  # 부가세 유형
@@ -193,7 +195,7 @@ class CostAllocation(Base):
     amount = Column(Float, nullable=False)  # 배부 금액
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    journal_line = relationship("JournalLine")
+    journal_line = relationship("JournalLine", back_populates="cost_allocations")
     cost_center = relationship("CostCenter")
 
 class CashFlow(Base):
@@ -0,0 +1,206 @@
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session, attributes
+from sqlalchemy import delete, event, func, insert
+from database.models import Account, AccountClosure
+
+class AccountHierarchyManager:
+    """
+    계정과목 계층의 클로저 테이블(상위/하위 계정 쌍)을 관리하는 클래스
+
+    새 계정은 add_accounts()로 클로저 행을 만들고, 기존 계정의 상위 계정(parent_id)이
+    바뀌면 listen()으로 등록한 세션 이벤트가 flush 시점에 move_account()로 하위 계층
+    전체의 클로저 행을 옮깁니다.
+    """
+
+    def add_accounts(self, session: Session, accounts: List[Account]) -> int:
+        """
+        새로 추가된 계정과목의 클로저 행을 생성합니다. (커밋은 호출자가 수행)
+
+        계정은 ID가 부여되어 있어야 하며(flush 이후), 같은 목록 안에서 상위/하위
+        관계가 있어도 순서에 관계없이 처리합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            accounts (List[Account]): 새로 추가된 계정과목 목록
+
+        Returns:
+            int: 생성된 클로저 행 수
+        """
+        if not accounts:
+            return 0
+
+        parent_of = {account.id: account.parent_id for account in accounts}
+
+        # 목록 밖의 상위 계정은 기존 클로저에서 조상 목록을 한 번에 조회
+        external_parents = {
+            parent_id for parent_id in parent_of.values()
+            if parent_id is not None and parent_id not in parent_of
+        }
+        ancestors: Dict[int, Dict[int, int]] = {}
+        if external_parents:
+            for ancestor_id, descendant_id, depth in session.query(
+                AccountClosure.ancestor_id, AccountClosure.descendant_id, AccountClosure.depth
+            ).filter(AccountClosure.descendant_id.in_(external_parents)):
+                ancestors.setdefault(descendant_id, {})[ancestor_id] = depth
+
+        def resolve(account_id: int, visiting: Set[int]) -> Dict[int, int]:
+            if account_id in ancestors:
+                return ancestors[account_id]
+            if account_id in visiting:
+                raise ValueError(f"계정과목 계층에 순환이 있습니다: {account_id}")
+
+            visiting.add(account_id)
+            result = {account_id: 0}
+            parent_id = parent_of.get(account_id)
+            if parent_id is not None:
+                for ancestor_id, depth in resolve(parent_id, visiting).items():
+                    result[ancestor_id] = depth + 1
+            ancestors[account_id] = result
+            return result
+
+        rows = [
+            {'ancestor_id': ancestor_id, 'descendant_id': account_id, 'depth': depth}
+            for account_id in parent_of
+            for ancestor_id, depth in resolve(account_id, set()).items()
+        ]
+        session.execute(insert(AccountClosure), rows)
+        return len(rows)
+
+    def move_account(self, session: Session, account_id: int, parent_id: Optional[int]) -> int:
+        """
+        계정과목을 새 상위 계정 아래로 옮기고 하위 계층 전체의 클로저 행을 갱신합니다. (커밋은 호출자가 수행)
+
+        하위 계층 밖의 조상과 이어진 행을 삭제한 뒤 새 상위 계정의 조상들과 다시 잇습니다.
+        Account.parent_id는 변경하지 않습니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            account_id (int): 옮길 계정과목 ID
+            parent_id (Optional[int]): 새 상위 계정과목 ID (None이면 최상위)
+
+        Returns:
+            int: 새로 생성된 클로저 행 수
+        """
+        subtree = dict(
+            session.query(AccountClosure.descendant_id, AccountClosure.depth)
+            .filter(AccountClosure.ancestor_id == account_id)
+        )
+        if not subtree:
+            # 클로저 행이 아직 없는 새 계정은 add_accounts()에서 생성
+            return 0
+        if parent_id in subtree:
+            raise ValueError(f"계정과목 계층에 순환이 생깁니다: {account_id} → {parent_id}")
+
+        session.execute(
+            delete(AccountClosure).where(
+                AccountClosure.descendant_id.in_(list(subtree)),
+                AccountClosure.ancestor_id.not_in(list(subtree))
+            ).execution_options(synchronize_session=False)
+        )
+        if parent_id is None:
+            return 0
+
+        ancestors = session.query(AccountClosure.ancestor_id, AccountClosure.depth)\
+            .filter(AccountClosure.descendant_id == parent_id).all()
+        rows = [
+            {'ancestor_id': ancestor_id, 'descendant_id': descendant_id,
+             'depth': ancestor_depth + depth + 1}
+            for ancestor_id, ancestor_depth in ancestors
+            for descendant_id, depth in subtree.items()
+        ]
+        if rows:
+            session.execute(insert(AccountClosure), rows)
+        return len(rows)
+
+    def rebuild(self, session: Session) -> int:
+        """
+        Account.parent_id로부터 클로저 테이블 전체를 다시 생성합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+
+        Returns:
+            int: 생성된 클로저 행 수
+        """
+        session.query(AccountClosure).delete(synchronize_session=False)
+        accounts = session.query(Account.id, Account.parent_id).all()
+
+        parent_of = {account_id: parent_id for account_id, parent_id in accounts}
+        rows = []
+        for account_id in parent_of:
+            depth, current, seen = 0, account_id, set()
+            while current is not None and current not in seen:
+                seen.add(current)
+                rows.append({'ancestor_id': current, 'descendant_id': account_id, 'depth': depth})
+                current = parent_of.get(current)
+                depth += 1
+
+        if rows:
+            session.execute(insert(AccountClosure), rows)
+        session.commit()
+        return len(rows)
+
+    def levels(self, session: Session) -> Dict[int, int]:
+        """계정과목 ID별 계층 깊이(최상위 = 0)를 반환합니다."""
+        return dict(
+            session.query(AccountClosure.descendant_id, func.max(AccountClosure.depth))
+            .group_by(AccountClosure.descendant_id).all()
+        )
+
+    def parent_ids(self, session: Session) -> Set[int]:
+        """하위 계정을 가진 계정과목 ID 집합을 반환합니다."""
+        return {
+            ancestor_id for ancestor_id, in session.query(AccountClosure.ancestor_id)
+            .filter(AccountClosure.depth > 0).distinct()
+        }
+
+    def accounts_at_level(self, session: Session, level: Optional[int]) -> Tuple[List[int], List[int]]:
+        """
+        지정한 계층에서 보고할 계정과목 ID 목록을 반환합니다.
+
+        하위 합계로 보고할 계정은 해당 깊이의 계정과 그보다 얕지만 하위 계정이 없는
+        계정이고, 그보다 얕은 상위 계정은 자기 계정에 직접 기록된 금액만 보고합니다.
+        두 목록의 금액을 더하면 전체 금액과 같습니다. level이 None이면 모든 계정을
+        자기 계정 금액으로 보고합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            level (Optional[int]): 계층 깊이 (최상위 = 0)
+
+        Returns:
+            Tuple[List[int], List[int]]: (하위 합계로 보고할 계정 ID 목록, 자기 금액만 보고할 계정 ID 목록)
+        """
+        levels = self.levels(session)
+
+        if level is None:
+            return [], list(levels)
+
+        parents = self.parent_ids(session)
+        subtree_ids, own_ids = [], []
+        for account_id, depth in levels.items():
+            if depth == level or (depth < level and account_id not in parents):
+                subtree_ids.append(account_id)
+            elif depth < level:
+                own_ids.append(account_id)
+        return subtree_ids, own_ids
+
+    # 세션 이벤트: 기존 계정의 상위 계정이 바뀌면 flush 시점에 클로저를 옮김
+    def _after_flush(self, session: Session, flush_context) -> None:
+        moved = [
+            obj for obj in session.dirty
+            if isinstance(obj, Account) and obj.id is not None and (
+                attributes.get_history(obj, 'parent_id').has_changes()
+                or attributes.get_history(obj, 'parent').has_changes()
+            )
+        ]
+        with session.no_autoflush:
+            for account in moved:
+                self.move_account(session, account.id, account.parent_id)
+
+    def listen(self) -> 'AccountHierarchyManager':
+        """모든 세션에서 계정과목의 상위 계정 변경 시 클로저를 갱신하도록 세션 이벤트를 등록합니다."""
+        event.listen(Session, 'after_flush', self._after_flush)
+        return self
+
+# 상위 계정 변경 감지용 (프로세스당 한 번 등록)
+account_hierarchy_listener = AccountHierarchyManager().listen()
@@ -1,8 +1,18 @@
 from datetime import datetime
+import numpy as np
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from database.models import Account, AccountType, JournalEntry, JournalLine, FiscalYear
+from database.money import to_decimal, to_minor, minor_bindparam
+from accounting.period_balance_manager import PeriodBalanceManager
+from accounting.account_hierarchy_manager import AccountHierarchyManager
+from accounting.chart_of_accounts_cache import chart_of_accounts_cache
 
 class AccountingManager:
+    def __init__(self):
+        self.period_balance_manager = PeriodBalanceManager()
+        self.hierarchy_manager = AccountHierarchyManager()
+    
     def create_account(self, session: Session, code: str, name: str, account_type: AccountType,
                       description: str = None, parent_code: str = None) -> Account:
         """새로운 계정과목을 생성합니다."""
@@ -14,22 +24,26 @@ class AccountingManager:
         )
         
         if parent_code:
-            parent = session.query(Account).filter_by(code=parent_code).first()
-            if parent:
-                account.parent_id = parent.id
+            account.parent_id = chart_of_accounts_cache.id_for(session, parent_code)
         
         session.add(account)
+        session.flush()
+        self.hierarchy_manager.add_accounts(session, [account])
         session.commit()
         return account
 
     def create_journal_entry(self, session: Session, entry_date: datetime,
                            description: str, lines: list, created_by: str) -> JournalEntry:
         """새로운 전표를 생성합니다."""
-        # 차변과 대변의 합계가 일치하는지 검증
+        # 금액을 최소 단위로 고정한 뒤 차변과 대변의 합계가 정확히 일치하는지 검증
+        lines = [
+            {**line, 'debit': to_decimal(line.get('debit')), 'credit': to_decimal(line.get('credit'))}
+            for line in lines
+        ]
         total_debit = sum(line['debit'] for line in lines)
         total_credit = sum(line['credit'] for line in lines)
         
-        if abs(total_debit - total_credit) > 0.01:  # 반올림 오차 허용
+        if total_debit != total_credit:
             raise ValueError("차변과 대변의 합계가 일치하지 않습니다.")
         
         entry = JournalEntry(
@@ -41,19 +55,159 @@ class AccountingManager:
         session.add(entry)
         session.flush()  # ID 생성을 위해 flush
         
-        for line in lines:
-            journal_line = JournalLine(
-                entry_id=entry.id,
-                account_id=line['account_id'],
-                debit=line['debit'],
-                credit=line['credit'],
-                description=line.get('description')
-            )
-            session.add(journal_line)
+        # 전표 라인 일괄 삽입 (executemany)
+        session.execute(insert(JournalLine), [
+            {
+                'entry_id': entry.id,
+                'account_id': line['account_id'],
+                'debit': line['debit'],
+                'credit': line['credit'],
+                'description': line.get('description')
+            }
+            for line in lines
+        ], execution_options={'render_nulls': True})
+        
+        # 월별 잔액 집계 반영
+        self.period_balance_manager.apply_lines(session, [
+            {**line, 'entry_date': entry_date} for line in lines
+        ])
         
         session.commit()
         return entry
 
+    def create_journal_entries_bulk(self, session: Session, entries: list,
+                                    created_by: str = None) -> list:
+        """
+        여러 전표를 하나의 트랜잭션으로 일괄 생성합니다.
+        
+        차변/대변 검증은 전체 라인에 대해 한 번에 벡터 연산으로 수행하고, 전표와 라인은
+        일괄 삽입(executemany)합니다. 검증에 실패한 전표는 건너뛰고 결과에 오류를 기록합니다.
+        
+        Args:
+            session (Session): 데이터베이스 세션
+            entries (list): [{"entry_date": ..., "description": ..., "lines": [...], "created_by": ...}, ...]
+            created_by (str): 전표별 created_by가 없을 때 사용할 작성자
+            
+        Returns:
+            list: 입력 순서대로 [{"index": 0, "entry_id": 1, "error": None}, ...]
+        """
+        results = [{"index": i, "entry_id": None, "error": None} for i in range(len(entries))]
+        entry_dates = [None] * len(entries)
+        
+        # 라인을 평탄화하여 전표 번호와 함께 배열로 구성
+        line_entry_index, line_account_ids, line_debits, line_credits = [], [], [], []
+        line_descriptions = []
+        for i, data in enumerate(entries):
+            try:
+                entry_date = data['entry_date']
+                entry_dates[i] = (datetime.fromisoformat(entry_date)
+                                  if isinstance(entry_date, str) else entry_date)
+                if not (data.get('created_by') or created_by):
+                    raise ValueError("created_by 필드가 필요합니다.")
+                if not data.get('lines'):
+                    raise ValueError("전표 라인이 없습니다.")
+                
+                parsed = [(int(line['account_id']), to_minor(line.get('debit')),
+                           to_minor(line.get('credit')), line.get('description'))
+                          for line in data['lines']]
+            except (KeyError, TypeError, ValueError) as e:
+                results[i]["error"] = f"잘못된 전표 데이터: {e}"
+                continue
+            
+            for account_id, debit, credit, description in parsed:
+                line_entry_index.append(i)
+                line_account_ids.append(account_id)
+                line_debits.append(debit)
+                line_credits.append(credit)
+                line_descriptions.append(description)
+        
+        line_entry_index = np.asarray(line_entry_index, dtype=np.int64)
+        line_account_ids = np.asarray(line_account_ids, dtype=np.int64)
+        line_debits = np.asarray(line_debits, dtype=np.int64)
+        line_credits = np.asarray(line_credits, dtype=np.int64)
+        
+        # 차변과 대변의 합계 검증 (최소 단위 정수로 전표별 합계를 한 번에 계산)
+        total_debit = np.zeros(len(entries), dtype=np.int64)
+        total_credit = np.zeros(len(entries), dtype=np.int64)
+        np.add.at(total_debit, line_entry_index, line_debits)
+        np.add.at(total_credit, line_entry_index, line_credits)
+        for i in np.flatnonzero(total_debit != total_credit):
+            if results[i]["error"] is None:
+                results[i]["error"] = "차변과 대변의 합계가 일치하지 않습니다."
+        
+        # 존재하지 않는 계정과목 검증
+        unique_account_ids = np.unique(line_account_ids)
+        known_account_ids = [account_id for (account_id,) in session.query(Account.id)
+                             .filter(Account.id.in_(unique_account_ids.tolist()))]
+        unknown_mask = ~np.isin(line_account_ids, known_account_ids)
+        for i in np.unique(line_entry_index[unknown_mask]):
+            if results[i]["error"] is None:
+                results[i]["error"] = "계정과목을 찾을 수 없습니다."
+        
+        valid_indexes = [i for i, result in enumerate(results) if result["error"] is None]
+        if not valid_indexes:
+            return results
+        
+        try:
+            # 전표 일괄 삽입
+            inserted = session.execute(
+                insert(JournalEntry).returning(JournalEntry.id, sort_by_parameter_order=True),
+                [
+                    {
+                        'entry_date': entry_dates[i],
+                        'description': entries[i].get('description'),
+                        'created_by': entries[i].get('created_by') or created_by
+                    }
+                    for i in valid_indexes
+                ],
+                execution_options={'render_nulls': True}
+            )
+            # sort_by_parameter_order로 반환 ID가 입력 순서와 일치
+            entry_ids = np.zeros(len(entries), dtype=np.int64)
+            for i, entry_id in zip(valid_indexes, inserted.scalars().all()):
+                entry_ids[i] = entry_id
+                results[i]["entry_id"] = entry_id
+            
+            # 전표 라인 일괄 삽입 (executemany)
+            valid_mask = entry_ids[line_entry_index] > 0
+            line_rows = [
+                {
+                    'entry_id': entry_id,
+                    'account_id': account_id,
+                    'debit': debit,
+                    'credit': credit,
+                    'description': line_descriptions[position]
+                }
+                for position, entry_id, account_id, debit, credit in zip(
+                    np.flatnonzero(valid_mask).tolist(),
+                    entry_ids[line_entry_index[valid_mask]].tolist(),
+                    line_account_ids[valid_mask].tolist(),
+                    line_debits[valid_mask].tolist(),
+                    line_credits[valid_mask].tolist()
+                )
+            ]
+            # 금액은 최소 단위 정수 그대로 바인딩
+            session.execute(
+                JournalLine.__table__.insert().values(
+                    debit=minor_bindparam('debit'),
+                    credit=minor_bindparam('credit')
+                ),
+                line_rows
+            )
+            
+            # 월별 잔액 집계 반영
+            self.period_balance_manager.apply_lines(session, (
+                {**row, 'entry_date': entry_dates[entry_index]}
+                for row, entry_index in zip(line_rows, line_entry_index[valid_mask].tolist())
+            ), minor_units=True)
+            
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        
+        return results
+
     def create_fiscal_year(self, session: Session, year: int) -> FiscalYear:
         """새로운 회계연도를 생성합니다."""
         start_date = datetime(year, 1, 1)
@@ -78,23 +232,16 @@ class AccountingManager:
         if fiscal_year.is_closed:
             raise ValueError("이미 마감된 회계연도입니다.")
         
-        # 수익과 비용 계정의 잔액을 자본금으로 대체
-        retained_earnings = self._calculate_retained_earnings(session, fiscal_year)
+        # 수익과 비용 계정의 잔액을 이익잉여금으로 대체
+        closing_lines = self._build_closing_lines(session, fiscal_year)
         
-        if retained_earnings != 0:
+        if closing_lines:
             # 결산 전표 생성
             closing_entry = self.create_journal_entry(
                 session=session,
                 entry_date=fiscal_year.end_date,
                 description=f"{fiscal_year.year}년 결산 전표",
-                lines=[
-                    {
-                        'account_id': self._get_retained_earnings_account(session).id,
-                        'debit': retained_earnings if retained_earnings > 0 else 0,
-                        'credit': -retained_earnings if retained_earnings < 0 else 0,
-                        'description': "당기순이익(손실) 대체"
-                    }
-                ],
+                lines=closing_lines,
                 created_by=closed_by
             )
         
@@ -105,40 +252,56 @@ class AccountingManager:
         session.commit()
         return fiscal_year
 
-    def _calculate_retained_earnings(self, session: Session, fiscal_year: FiscalYear) -> float:
-        """해당 회계연도의 당기순이익을 계산합니다."""
-        total_revenue = 0
-        total_expense = 0
-        
-        # 수익과 비용 계정의 전표 내역 조회
-        revenue_accounts = session.query(Account).filter_by(type=AccountType.REVENUE).all()
-        expense_accounts = session.query(Account).filter_by(type=AccountType.EXPENSE).all()
-        
-        for account in revenue_accounts:
-            for line in account.journal_lines:
-                if (line.entry.entry_date >= fiscal_year.start_date and
-                    line.entry.entry_date <= fiscal_year.end_date):
-                    total_revenue += line.credit - line.debit
-        
-        for account in expense_accounts:
-            for line in account.journal_lines:
-                if (line.entry.entry_date >= fiscal_year.start_date and
-                    line.entry.entry_date <= fiscal_year.end_date):
-                    total_expense += line.debit - line.credit
-        
-        return total_revenue - total_expense
+    def _build_closing_lines(self, session: Session, fiscal_year: FiscalYear) -> list:
+        """수익·비용 계정 잔액을 0으로 만들고 차액을 이익잉여금으로 대체하는 결산 라인을 생성합니다."""
+        # 계정과목별 합계를 한 번에 집계 (라인 수가 아닌 계정 수에 비례)
+        totals = self.period_balance_manager.account_totals(
+            session,
+            start=fiscal_year.start_date,
+            end=fiscal_year.end_date,
+            account_types=[AccountType.REVENUE, AccountType.EXPENSE]
+        )
+        
+        lines = []
+        net_income = 0
+        
+        for account_id, (debit, credit) in sorted(totals.items()):
+            balance = debit - credit  # 차변 잔액 (수익은 음수, 비용은 양수)
+            if balance == 0:
+                continue
+            
+            net_income -= balance
+            lines.append({
+                'account_id': account_id,
+                'debit': -balance if balance < 0 else 0,
+                'credit': balance if balance > 0 else 0,
+                'description': "손익 대체"
+            })
+        
+        if not lines:
+            return []
+        
+        if net_income != 0:
+            lines.append({
+                'account_id': self._get_retained_earnings_account_id(session),
+                'debit': -net_income if net_income < 0 else 0,
+                'credit': net_income if net_income > 0 else 0,
+                'description': "당기순이익(손실) 대체"
+            })
+        
+        return lines
 
-    def _get_retained_earnings_account(self, session: Session) -> Account:
-        """이익잉여금 계정을 조회하거나 생성합니다."""
-        retained_earnings = session.query(Account).filter_by(code="3200").first()
+    def _get_retained_earnings_account_id(self, session: Session) -> int:
+        """이익잉여금 계정의 ID를 조회하거나 계정을 생성합니다."""
+        retained_earnings_id = chart_of_accounts_cache.id_for(session, "3200")
         
-        if not retained_earnings:
-            retained_earnings = self.create_account(
+        if retained_earnings_id is None:
+            retained_earnings_id = self.create_account(
                 session=session,
                 code="3200",
                 name="이익잉여금",
                 account_type=AccountType.EQUITY,
                 description="당기순이익 누적액"
-            )
+            ).id
         
-        return retained_earnings 
\ No newline at end of file
+        return retained_earnings_id 
\ No newline at end of file
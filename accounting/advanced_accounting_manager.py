@@ -1,13 +1,27 @@
 from datetime import datetime
+from decimal import Decimal
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import BigInteger, and_, func, insert, type_coerce
 from database.models import (
     Budget, BudgetType, CostCenter, CostAllocation,
-    CashFlow, TaxReport, AccountAnalysis, Account,
-    JournalEntry, JournalLine
+    TaxReport, AccountAnalysis, Account,
+    JournalEntry, JournalLine, AccountType, AccountClosure, FiscalYear, AllocationRule
 )
+from database.money import from_minor, to_decimal
+from accounting.period_balance_manager import PeriodBalanceManager
+from accounting.account_hierarchy_manager import AccountHierarchyManager
+from accounting.tax_manager import TaxManager
+from accounting.cost_allocation_manager import CostAllocationManager
+from accounting.cash_flow_manager import CashFlowManager
 
 class AdvancedAccountingManager:
+    def __init__(self):
+        self.period_balance_manager = PeriodBalanceManager()
+        self.hierarchy_manager = AccountHierarchyManager()
+        self.tax_manager = TaxManager()
+        self.cost_allocation_manager = CostAllocationManager()
+        self.cash_flow_manager = CashFlowManager()
+    
     def create_budget(self, session: Session, fiscal_year_id: int, account_id: int,
                      budget_type: BudgetType, period_start: datetime, period_end: datetime,
                      amount: float, description: str = None) -> Budget:
@@ -26,23 +40,32 @@ class AdvancedAccountingManager:
         session.commit()
         return budget
 
-    def analyze_budget_variance(self, session: Session, budget_id: int) -> dict:
-        """예산 실적을 분석합니다."""
+    def analyze_budget_variance(self, session: Session, budget_id: int,
+                                include_descendants: bool = False) -> dict:
+        """예산 실적을 분석합니다. (include_descendants이면 하위 계정 실적 포함)"""
         budget = session.query(Budget).get(budget_id)
         if not budget:
             raise ValueError("예산을 찾을 수 없습니다.")
         
         # 실제 금액 계산
-        actual_amount = session.query(func.sum(JournalLine.debit - JournalLine.credit))\
-            .join(JournalEntry)\
-            .filter(
-                JournalLine.account_id == budget.account_id,
-                JournalEntry.entry_date >= budget.period_start,
-                JournalEntry.entry_date <= budget.period_end
-            ).scalar() or 0
+        if include_descendants:
+            debit, credit = self.period_balance_manager.subtree_totals(
+                session,
+                start=budget.period_start,
+                end=budget.period_end,
+                account_ids=[budget.account_id]
+            ).get(budget.account_id, (0, 0))
+            actual_amount = debit - credit
+        else:
+            actual_amount = self.period_balance_manager.net_balance(
+                session,
+                budget.account_id,
+                start=budget.period_start,
+                end=budget.period_end
+            )
         
         variance = actual_amount - budget.amount
-        variance_percentage = (variance / budget.amount) * 100 if budget.amount != 0 else 0
+        variance_percentage = float(variance / budget.amount * 100) if budget.amount != 0 else 0
         
         return {
             "budget_amount": budget.amount,
@@ -51,6 +74,110 @@ class AdvancedAccountingManager:
             "variance_percentage": variance_percentage
         }
 
+    def analyze_fiscal_year_budget_variance(self, session: Session, fiscal_year_id: int,
+                                            budget_type=None, cost_center_id: int = None,
+                                            include_descendants: bool = False) -> dict:
+        """
+        회계연도의 모든 예산 실적을 한 번의 쿼리로 분석합니다.
+
+        예산마다 자신의 기간(period_start 이상, period_end 이하)에 속한 전표 라인을 조인하여
+        합산하므로 기간이 겹치는 예산(연간/분기/월간)도 각각 정확히 계산됩니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            fiscal_year_id (int): 회계연도 ID
+            budget_type (BudgetType | str): 예산 유형 필터
+            cost_center_id (int): 원가 중심점 필터 (해당 원가 중심점에 배부된 금액만 실적으로 집계)
+            include_descendants (bool): 하위 계정 실적 포함 여부
+
+        Returns:
+            dict: 예산별 분석 결과 목록과 합계
+        """
+        fiscal_year = session.query(FiscalYear).get(fiscal_year_id)
+        if not fiscal_year:
+            raise ValueError("회계연도를 찾을 수 없습니다.")
+
+        # 실적 원천: 전표 라인 순액(차변 - 대변) 또는 원가 중심점 배부 금액 (최소 단위 정수)
+        if cost_center_id is not None:
+            actuals = session.query(
+                JournalLine.account_id.label('account_id'),
+                JournalEntry.entry_date.label('entry_date'),
+                type_coerce(CostAllocation.amount, BigInteger).label('net')
+            ).join(JournalLine, JournalLine.id == CostAllocation.journal_line_id)\
+                .join(JournalEntry, JournalEntry.id == JournalLine.entry_id)\
+                .filter(CostAllocation.cost_center_id == cost_center_id).subquery()
+        else:
+            actuals = session.query(
+                JournalLine.account_id.label('account_id'),
+                JournalEntry.entry_date.label('entry_date'),
+                (type_coerce(JournalLine.debit, BigInteger) -
+                 type_coerce(JournalLine.credit, BigInteger)).label('net')
+            ).join(JournalEntry, JournalEntry.id == JournalLine.entry_id).subquery()
+
+        query = session.query(
+            Budget.id,
+            Budget.account_id,
+            Account.code,
+            Account.name,
+            Budget.type,
+            Budget.period_start,
+            Budget.period_end,
+            type_coerce(Budget.amount, BigInteger),
+            type_coerce(func.coalesce(func.sum(actuals.c.net), 0), BigInteger)
+        ).join(Account, Account.id == Budget.account_id)
+
+        if include_descendants:
+            query = query.outerjoin(AccountClosure, AccountClosure.ancestor_id == Budget.account_id)
+            actual_account = AccountClosure.descendant_id
+        else:
+            actual_account = Budget.account_id
+
+        query = query.outerjoin(actuals, and_(
+            actuals.c.account_id == actual_account,
+            actuals.c.entry_date >= Budget.period_start,
+            actuals.c.entry_date <= Budget.period_end
+        )).filter(Budget.fiscal_year_id == fiscal_year_id)
+
+        if budget_type is not None:
+            query = query.filter(Budget.type == BudgetType(budget_type))
+
+        rows = query.group_by(
+            Budget.id, Budget.account_id, Account.code, Account.name,
+            Budget.type, Budget.period_start, Budget.period_end, Budget.amount
+        ).order_by(Budget.period_start, Account.code, Budget.id).all()
+
+        budgets = []
+        total_budget = total_actual = 0
+        for (budget_id, account_id, code, name, type_, period_start, period_end,
+             budget_minor, actual_minor) in rows:
+            variance_minor = actual_minor - budget_minor
+            budgets.append({
+                "budget_id": budget_id,
+                "account_id": account_id,
+                "account_code": code,
+                "account_name": name,
+                "type": type_.value,
+                "period_start": period_start.isoformat(),
+                "period_end": period_end.isoformat(),
+                "budget_amount": from_minor(budget_minor),
+                "actual_amount": from_minor(actual_minor),
+                "variance": from_minor(variance_minor),
+                "variance_percentage": variance_minor / budget_minor * 100 if budget_minor != 0 else 0
+            })
+            total_budget += budget_minor
+            total_actual += actual_minor
+
+        return {
+            "fiscal_year_id": fiscal_year.id,
+            "year": fiscal_year.year,
+            "budgets": budgets,
+            "totals": {
+                "budget_amount": from_minor(total_budget),
+                "actual_amount": from_minor(total_actual),
+                "variance": from_minor(total_actual - total_budget)
+            }
+        }
+
     def create_cost_center(self, session: Session, code: str, name: str,
                           description: str = None) -> CostCenter:
         """새로운 원가 중심점을 생성합니다."""
@@ -84,7 +211,7 @@ class AdvancedAccountingManager:
                 journal_line_id=journal_line_id,
                 cost_center_id=alloc['cost_center_id'],
                 ratio=alloc['ratio'],
-                amount=total_amount * alloc['ratio']
+                amount=to_decimal(total_amount * Decimal(str(alloc['ratio'])))
             )
             session.add(cost_allocation)
             cost_allocations.append(cost_allocation)
@@ -92,112 +219,157 @@ class AdvancedAccountingManager:
         session.commit()
         return cost_allocations
 
+    def create_allocation_rule(self, session: Session, name: str, allocations: list,
+                               account_id: int = None, account_code_from: str = None,
+                               account_code_to: str = None, description: str = None) -> AllocationRule:
+        """계정과목 또는 계정코드 범위에 적용할 원가 배부 규칙을 생성합니다."""
+        return self.cost_allocation_manager.create_rule(
+            session, name, allocations,
+            account_id=account_id,
+            account_code_from=account_code_from,
+            account_code_to=account_code_to,
+            description=description
+        )
+
+    def apply_allocation_rule(self, session: Session, rule_id: int, start_date: datetime,
+                              end_date: datetime) -> dict:
+        """기간 내 규칙 대상 전표 라인을 원가 중심점에 일괄 배부합니다."""
+        return self.cost_allocation_manager.apply_rule(session, rule_id, start_date, end_date)
+
     def generate_cash_flow_statement(self, session: Session, start_date: datetime,
-                                   end_date: datetime) -> list[CashFlow]:
-        """현금 흐름표를 생성합니다."""
-        # 영업활동 현금흐름
-        operating_entries = session.query(JournalEntry)\
-            .filter(
-                JournalEntry.entry_date >= start_date,
-                JournalEntry.entry_date <= end_date,
-                JournalEntry.is_posted == True
-            ).all()
-        
-        cash_flows = []
-        
-        for entry in operating_entries:
-            cash_amount = 0
-            for line in entry.lines:
-                if line.account.code.startswith('1'):  # 현금 및 현금성 자산
-                    cash_amount += line.debit - line.credit
-            
-            if cash_amount != 0:
-                flow_type = self._determine_cash_flow_type(entry)
-                cash_flow = CashFlow(
-                    entry_id=entry.id,
-                    type=flow_type,
-                    amount=abs(cash_amount),
-                    description=entry.description
-                )
-                session.add(cash_flow)
-                cash_flows.append(cash_flow)
+                                   end_date: datetime) -> dict:
+        """
+        현금 흐름표를 생성합니다.
         
-        session.commit()
-        return cash_flows
+        마지막 실행 이후 추가된 전표만 분류해 저장한 뒤, 저장된 현금흐름으로
+        기간의 활동별 합계를 집계합니다. 같은 기간을 다시 실행해도 중복 집계되지 않습니다.
+        """
+        classified_count = self.cash_flow_manager.classify_new_entries(session)
+        statement = self.cash_flow_manager.statement(session, start_date, end_date)
+        statement["classified_count"] = classified_count
+        return statement
 
-    def generate_tax_report(self, session: Session, report_type: str,
-                          period_start: datetime, period_end: datetime) -> TaxReport:
-        """세금 신고 자료를 생성합니다."""
-        if report_type not in ["VAT", "CORPORATE_TAX"]:
-            raise ValueError("지원하지 않는 세금 신고 유형입니다.")
+    def generate_financial_statements(self, session: Session, start_date: datetime,
+                                      end_date: datetime, level: int = None) -> dict:
+        """
+        재무상태표(end_date 기준 누계)와 손익계산서(start_date~end_date)를 생성합니다.
         
-        total_amount = 0
+        level을 지정하면 해당 계층의 계정별로 하위 계정을 포함한 소계를 보고하고
+        (그보다 얕은 상위 계정은 직접 기록된 금액만), 지정하지 않으면 모든 계정을
+        직접 기록된 금액으로 보고합니다.
+        """
+        subtree_ids, own_ids = self.hierarchy_manager.accounts_at_level(session, level)
+        levels = self.hierarchy_manager.levels(session)
+        accounts = {
+            account.id: account for account in session.query(
+                Account.id, Account.code, Account.name, Account.type
+            ).filter(Account.id.in_(subtree_ids + own_ids))
+        }
         
-        if report_type == "VAT":
-            # 매출/매입 부가세 계산
-            vat_accounts = session.query(Account)\
-                .filter(Account.code.in_(['21510', '11510']))\
-                .all()  # 부가세 예수금, 부가세 대급금
-            
-            for account in vat_accounts:
-                entries = session.query(JournalLine)\
-                    .join(JournalEntry)\
-                    .filter(
-                        JournalLine.account_id == account.id,
-                        JournalEntry.entry_date >= period_start,
-                        JournalEntry.entry_date <= period_end
-                    ).all()
-                
-                for entry in entries:
-                    total_amount += entry.credit - entry.debit
-        
-        else:  # CORPORATE_TAX
-            # 당기순이익 계산
-            revenue_accounts = session.query(Account)\
-                .filter(Account.type == "REVENUE").all()
-            expense_accounts = session.query(Account)\
-                .filter(Account.type == "EXPENSE").all()
-            
-            total_revenue = 0
-            total_expense = 0
-            
-            for account in revenue_accounts:
-                entries = session.query(JournalLine)\
-                    .join(JournalEntry)\
-                    .filter(
-                        JournalLine.account_id == account.id,
-                        JournalEntry.entry_date >= period_start,
-                        JournalEntry.entry_date <= period_end
-                    ).all()
-                
-                for entry in entries:
-                    total_revenue += entry.credit - entry.debit
+        balance_sheet_types = [AccountType.ASSET, AccountType.LIABILITY, AccountType.EQUITY]
+        income_types = [AccountType.REVENUE, AccountType.EXPENSE]
+        
+        totals = {}
+        for account_ids, account_totals in ((subtree_ids, self.period_balance_manager.subtree_totals),
+                                            (own_ids, self.period_balance_manager.account_totals)):
+            if not account_ids:
+                continue
+            totals.update(account_totals(
+                session, end=end_date, account_ids=account_ids, account_types=balance_sheet_types
+            ))
+            totals.update(account_totals(
+                session, start=start_date, end=end_date, account_ids=account_ids, account_types=income_types
+            ))
+        
+        sections = {
+            AccountType.ASSET: [], AccountType.LIABILITY: [], AccountType.EQUITY: [],
+            AccountType.REVENUE: [], AccountType.EXPENSE: []
+        }
+        for account in sorted(accounts.values(), key=lambda a: a.code):
+            debit, credit = totals.get(account.id, (0, 0))
+            # 자산·비용은 차변, 부채·자본·수익은 대변 잔액 기준
+            if account.type in [AccountType.ASSET, AccountType.EXPENSE]:
+                balance = debit - credit
+            else:
+                balance = credit - debit
             
-            for account in expense_accounts:
-                entries = session.query(JournalLine)\
-                    .join(JournalEntry)\
-                    .filter(
-                        JournalLine.account_id == account.id,
-                        JournalEntry.entry_date >= period_start,
-                        JournalEntry.entry_date <= period_end
-                    ).all()
-                
-                for entry in entries:
-                    total_expense += entry.debit - entry.credit
+            if balance == 0 and debit == 0 and credit == 0:
+                continue
             
-            total_amount = total_revenue - total_expense
+            sections[account.type].append({
+                "account_id": account.id,
+                "code": account.code,
+                "name": account.name,
+                "level": levels.get(account.id, 0),
+                "debit": debit,
+                "credit": credit,
+                "balance": balance
+            })
+        
+        def section_total(account_type):
+            return sum(item["balance"] for item in sections[account_type])
+        
+        total_revenue = section_total(AccountType.REVENUE)
+        total_expense = section_total(AccountType.EXPENSE)
+        
+        return {
+            "period_start": start_date.isoformat(),
+            "period_end": end_date.isoformat(),
+            "level": level,
+            "balance_sheet": {
+                "assets": sections[AccountType.ASSET],
+                "liabilities": sections[AccountType.LIABILITY],
+                "equity": sections[AccountType.EQUITY],
+                "total_assets": section_total(AccountType.ASSET),
+                "total_liabilities": section_total(AccountType.LIABILITY),
+                "total_equity": section_total(AccountType.EQUITY)
+            },
+            "income_statement": {
+                "revenue": sections[AccountType.REVENUE],
+                "expense": sections[AccountType.EXPENSE],
+                "total_revenue": total_revenue,
+                "total_expense": total_expense,
+                "net_income": total_revenue - total_expense
+            }
+        }
+
+    def generate_tax_report(self, session: Session, report_type: str,
+                          period_start: datetime, period_end: datetime) -> TaxReport:
+        """세금 신고 자료를 생성합니다."""
+        result = self.tax_manager.compute(session, report_type, [(period_start, period_end)])[0]
         
         tax_report = TaxReport(
             report_type=report_type,
             period_start=period_start,
             period_end=period_end,
-            total_amount=total_amount
+            total_amount=result["total_amount"]
         )
         
         session.add(tax_report)
         session.commit()
         return tax_report
 
+    def generate_vat_reports(self, session: Session, year: int) -> list:
+        """연도의 부가가치세 분기 신고 자료(1기·2기 예정/확정)를 한 번에 생성합니다."""
+        vat_periods = self.tax_manager.vat_periods(year)
+        results = self.tax_manager.compute(
+            session, "VAT", [(start, end) for _, start, end in vat_periods]
+        )
+        
+        reports = []
+        for (label, start, end), result in zip(vat_periods, results):
+            tax_report = TaxReport(
+                report_type="VAT",
+                period_start=start,
+                period_end=end,
+                total_amount=result["total_amount"]
+            )
+            session.add(tax_report)
+            reports.append((label, tax_report, result))
+        
+        session.commit()
+        return reports
+
     def submit_tax_report(self, session: Session, report_id: int,
                          submitted_by: str) -> TaxReport:
         """세금 신고 자료를 제출합니다."""
@@ -217,39 +389,25 @@ class AdvancedAccountingManager:
 
     def analyze_account(self, session: Session, account_id: int,
                        analysis_date: datetime) -> AccountAnalysis:
-        """계정과목을 분석합니다."""
+        """
+        계정과목을 분석합니다.
+        
+        전월 말 잔액은 월말 잔액 스냅샷에서, 당월 증감은 당월 전표에서 계산합니다.
+        같은 일자의 기존 분석 결과는 새 결과로 대체합니다.
+        """
         account = session.query(Account).get(account_id)
         if not account:
             raise ValueError("계정과목을 찾을 수 없습니다.")
         
-        # 현재 잔액 계산
-        current_balance = session.query(func.sum(JournalLine.debit - JournalLine.credit))\
-            .join(JournalEntry)\
-            .filter(
-                JournalLine.account_id == account_id,
-                JournalEntry.entry_date <= analysis_date
-            ).scalar() or 0
-        
-        # 이전 달 잔액 계산
-        previous_month = analysis_date.replace(day=1)
-        previous_balance = session.query(func.sum(JournalLine.debit - JournalLine.credit))\
-            .join(JournalEntry)\
-            .filter(
-                JournalLine.account_id == account_id,
-                JournalEntry.entry_date < previous_month
-            ).scalar() or 0
-        
-        # 추세 분석
-        if current_balance > previous_balance:
-            trend = "INCREASING"
-        elif current_balance < previous_balance:
-            trend = "DECREASING"
-        else:
-            trend = "STABLE"
+        current_balance, previous_balance = self._analysis_balances(
+            session, analysis_date, [account_id]
+        )[account_id]
+        trend, variance_percentage = self._analyze_trend(current_balance, previous_balance)
         
-        # 변동률 계산
-        variance_percentage = ((current_balance - previous_balance) / previous_balance * 100
-                             if previous_balance != 0 else 0)
+        session.query(AccountAnalysis).filter(
+            AccountAnalysis.account_id == account_id,
+            AccountAnalysis.analysis_date == analysis_date
+        ).delete(synchronize_session=False)
         
         analysis = AccountAnalysis(
             account_id=account_id,
@@ -263,19 +421,80 @@ class AdvancedAccountingManager:
         session.commit()
         return analysis
 
-    def _determine_cash_flow_type(self, entry: JournalEntry) -> str:
-        """현금 흐름의 유형을 결정합니다."""
-        # 간단한 규칙으로 현금 흐름 유형 결정
-        for line in entry.lines:
-            if line.account.code.startswith('4'):  # 수익 계정
-                return "OPERATING"
-            elif line.account.code.startswith('5'):  # 비용 계정
-                return "OPERATING"
-            elif line.account.code.startswith('15'):  # 투자자산
-                return "INVESTING"
-            elif line.account.code.startswith('2') and int(line.account.code) > 2200:  # 비유동부채
-                return "FINANCING"
-            elif line.account.code.startswith('31'):  # 자본금
-                return "FINANCING"
-        
-        return "OPERATING"  # 기본값 
\ No newline at end of file
+    def analyze_accounts(self, session: Session, analysis_date: datetime,
+                         account_ids: list = None) -> list:
+        """
+        여러 계정과목(기본: 활성 계정 전체)을 한 번에 분석합니다.
+        
+        전월 말 잔액 스냅샷 조회, 당월 전표 집계, 분석 결과 일괄 저장으로 처리하며
+        같은 일자의 기존 분석 결과는 새 결과로 대체합니다.
+        
+        Returns:
+            list: 계정과목별 분석 결과 (account_id, balance, trend, variance_percentage)
+        """
+        if account_ids is None:
+            account_ids = [
+                account_id for account_id, in
+                session.query(Account.id).filter(Account.is_active == True).order_by(Account.id)
+            ]
+        if not account_ids:
+            return []
+        
+        balances = self._analysis_balances(session, analysis_date, account_ids)
+        
+        results = []
+        for account_id in account_ids:
+            current_balance, previous_balance = balances[account_id]
+            trend, variance_percentage = self._analyze_trend(current_balance, previous_balance)
+            results.append({
+                "account_id": account_id,
+                "balance": current_balance,
+                "previous_balance": previous_balance,
+                "trend": trend,
+                "variance_percentage": variance_percentage
+            })
+        
+        session.query(AccountAnalysis).filter(
+            AccountAnalysis.analysis_date == analysis_date,
+            AccountAnalysis.account_id.in_(account_ids)
+        ).delete(synchronize_session=False)
+        session.execute(insert(AccountAnalysis), [{
+            "account_id": result["account_id"],
+            "analysis_date": analysis_date,
+            "balance": result["balance"],
+            "trend": result["trend"],
+            "variance_percentage": result["variance_percentage"]
+        } for result in results])
+        session.commit()
+        return results
+
+    def _analysis_balances(self, session: Session, analysis_date: datetime, account_ids: list) -> dict:
+        """계정과목 ID별 (분석일 잔액, 전월 말 잔액)을 계산합니다."""
+        manager = self.period_balance_manager
+        period = manager.period_of(analysis_date)
+        
+        previous = manager.closing_balances(session, manager.previous_period(period), account_ids)
+        current_month = manager.account_totals(
+            session, start=manager.period_start(period), end=analysis_date, account_ids=account_ids
+        )
+        
+        balances = {}
+        for account_id in account_ids:
+            previous_balance = previous.get(account_id, Decimal(0))
+            debit, credit = current_month.get(account_id, (Decimal(0), Decimal(0)))
+            balances[account_id] = (previous_balance + debit - credit, previous_balance)
+        return balances
+
+    @staticmethod
+    def _analyze_trend(current_balance: Decimal, previous_balance: Decimal):
+        """잔액 추세와 전월 대비 변동률을 계산합니다."""
+        if current_balance > previous_balance:
+            trend = "INCREASING"
+        elif current_balance < previous_balance:
+            trend = "DECREASING"
+        else:
+            trend = "STABLE"
+        
+        variance_percentage = (float((current_balance - previous_balance) / previous_balance * 100)
+                               if previous_balance != 0 else 0)
+        return trend, variance_percentage
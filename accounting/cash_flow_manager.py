@@ -0,0 +1,195 @@
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, and_, case, exists, func, or_, type_coerce
+from database.models import Account, CashFlow, JournalEntry, JournalLine, ProcessingWatermark
+from database.money import from_minor, minor_bindparam
+
+class CashFlowManager:
+    """전표를 현금흐름 활동별로 증분 분류하고 저장된 분류 결과로 현금흐름표를 집계하는 클래스"""
+
+    WATERMARK_NAME = 'cash_flow'
+    ACTIVITY_TYPES = ('OPERATING', 'INVESTING', 'FINANCING')
+
+    def __init__(self, chunk_size: int = 5000, late_commit_window: timedelta = timedelta(hours=1)):
+        """
+        Args:
+            chunk_size (int): 한 번에 읽고 저장할 행 수
+            late_commit_window (timedelta): 워터마크 아래에서 늦게 커밋된 전표를 다시 찾을 기간
+                (이전 실행 시각 기준, SQLite 제외)
+        """
+        self.chunk_size = chunk_size
+        self.late_commit_window = late_commit_window
+
+    @staticmethod
+    def is_cash_account(code: str) -> bool:
+        """현금 및 현금성 자산 계정인지 확인합니다."""
+        return code.startswith('1')
+
+    @staticmethod
+    def cash_flow_category(code: str) -> Optional[str]:
+        """계정코드가 결정하는 현금흐름 활동 유형을 반환합니다. (결정하지 않으면 None)"""
+        if code.startswith('4'):  # 수익 계정
+            return "OPERATING"
+        if code.startswith('5'):  # 비용 계정
+            return "OPERATING"
+        if code.startswith('15'):  # 투자자산
+            return "INVESTING"
+        if code.startswith('2') and code.isdigit() and int(code) > 2200:  # 비유동부채
+            return "FINANCING"
+        if code.startswith('31'):  # 자본금
+            return "FINANCING"
+        return None
+
+    def account_map(self, session: Session) -> Dict[int, Tuple[bool, Optional[str]]]:
+        """계정과목 ID별 (현금 계정 여부, 현금흐름 활동 유형)을 한 번에 계산합니다."""
+        return {
+            account_id: (self.is_cash_account(code), self.cash_flow_category(code))
+            for account_id, code in session.query(Account.id, Account.code)
+        }
+
+    def classify_new_entries(self, session: Session) -> int:
+        """
+        마지막 실행 이후 추가된 전표만 현금흐름으로 분류하여 저장합니다.
+
+        분류를 마친 마지막 전표 ID를 워터마크로 기록하므로 다시 실행해도 같은 전표가
+        두 번 저장되지 않습니다. 워터마크가 없으면(최초 실행) 이전 방식으로 중복 저장된
+        현금흐름을 지우고 전체를 다시 분류합니다. 게시 여부는 집계 시점에 확인하므로
+        나중에 게시된 전표도 누락되지 않습니다.
+
+        PostgreSQL 등에서는 ID가 발급 순서와 다르게 커밋될 수 있어, 이전 실행 때 아직
+        커밋되지 않았던 워터마크 이하 전표를 놓칠 수 있습니다. 그래서 이전 실행 시각에서
+        late_commit_window 이전부터 생성된 워터마크 이하 전표 중 현금흐름이 없는 전표를
+        함께 분류합니다. (SQLite는 쓰기가 직렬화되어 ID 순서대로 커밋되므로 제외)
+
+        Args:
+            session (Session): 데이터베이스 세션
+
+        Returns:
+            int: 새로 저장한 현금흐름 행 수
+        """
+        watermark = session.query(ProcessingWatermark).get(self.WATERMARK_NAME)
+        if watermark is None:
+            session.query(CashFlow).delete(synchronize_session=False)
+            watermark = ProcessingWatermark(name=self.WATERMARK_NAME, last_id=0)
+            session.add(watermark)
+            session.flush()
+
+        last_id, last_run = watermark.last_id, watermark.updated_at
+        high_id = max(session.query(func.max(JournalEntry.id)).scalar() or 0, last_id)
+        entry_filter = and_(JournalLine.entry_id > last_id, JournalLine.entry_id <= high_id)
+
+        recheck_late = (last_id > 0 and last_run is not None
+                        and session.get_bind().dialect.name != 'sqlite')
+        if recheck_late:
+            # 워터마크 이하이지만 이전 실행 이후 커밋되어 아직 분류되지 않은 전표
+            entry_filter = or_(entry_filter, and_(
+                JournalLine.entry_id <= last_id,
+                JournalEntry.created_at >= last_run - self.late_commit_window,
+                ~exists().where(CashFlow.entry_id == JournalLine.entry_id)
+            ))
+        elif high_id <= last_id:
+            session.commit()
+            return 0
+
+        accounts = self.account_map(session)
+        lines = session.query(
+            JournalLine.entry_id,
+            JournalLine.account_id,
+            type_coerce(JournalLine.debit, BigInteger),
+            type_coerce(JournalLine.credit, BigInteger),
+            JournalEntry.description
+        ).join(JournalEntry, JournalEntry.id == JournalLine.entry_id).filter(
+            entry_filter
+        ).order_by(JournalLine.entry_id, JournalLine.id).yield_per(self.chunk_size)
+
+        insert = CashFlow.__table__.insert().values(amount=minor_bindparam('amount'))
+        created_at = datetime.utcnow()
+        rows, count = [], 0
+
+        for entry_id, entry_lines in groupby(lines, key=lambda line: line[0]):
+            cash_amount, flow_type, description = 0, None, None
+            for _, account_id, debit, credit, description in entry_lines:
+                is_cash, category = accounts.get(account_id, (False, None))
+                if is_cash:
+                    cash_amount += (debit or 0) - (credit or 0)
+                if flow_type is None:
+                    flow_type = category
+
+            if cash_amount != 0:
+                rows.append({
+                    'entry_id': entry_id,
+                    'type': flow_type or "OPERATING",
+                    'amount': cash_amount,
+                    'description': description,
+                    'created_at': created_at
+                })
+
+            if len(rows) >= self.chunk_size:
+                session.execute(insert, rows)
+                count += len(rows)
+                rows = []
+
+        if rows:
+            session.execute(insert, rows)
+            count += len(rows)
+
+        # 동시에 실행된 다른 작업이 먼저 워터마크를 옮겼다면 이번 결과는 버림
+        updated = session.query(ProcessingWatermark).filter(
+            ProcessingWatermark.name == self.WATERMARK_NAME,
+            ProcessingWatermark.last_id == last_id,
+            ProcessingWatermark.updated_at == last_run
+        ).update({'last_id': high_id, 'updated_at': datetime.utcnow()}, synchronize_session=False)
+        if not updated:
+            session.rollback()
+            return 0
+
+        session.commit()
+        return count
+
+    def rebuild(self, session: Session) -> int:
+        """저장된 현금흐름과 워터마크를 지우고 전체 전표를 다시 분류합니다."""
+        session.query(ProcessingWatermark).filter(
+            ProcessingWatermark.name == self.WATERMARK_NAME
+        ).delete(synchronize_session=False)
+        session.flush()
+        return self.classify_new_entries(session)
+
+    def statement(self, session: Session, start_date: datetime, end_date: datetime) -> dict:
+        """
+        저장된 현금흐름으로 기간(종료일 포함)의 게시된 전표에 대한 현금흐름표를 집계합니다.
+
+        Returns:
+            dict: 활동별 유입/유출/순증감/건수와 전체 순증감
+        """
+        amount = type_coerce(CashFlow.amount, BigInteger)
+        rows = session.query(
+            CashFlow.type,
+            func.sum(case((amount > 0, amount), else_=0)),
+            func.sum(case((amount < 0, -amount), else_=0)),
+            func.count(CashFlow.id)
+        ).join(JournalEntry, JournalEntry.id == CashFlow.entry_id).filter(
+            JournalEntry.entry_date >= start_date,
+            JournalEntry.entry_date <= end_date,
+            JournalEntry.is_posted == True
+        ).group_by(CashFlow.type).all()
+
+        totals = {flow_type: (0, 0, 0) for flow_type in self.ACTIVITY_TYPES}
+        for flow_type, inflow, outflow, count in rows:
+            totals[flow_type] = (inflow or 0, outflow or 0, count)
+
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "activities": {
+                flow_type: {
+                    "inflow": from_minor(inflow),
+                    "outflow": from_minor(outflow),
+                    "net": from_minor(inflow - outflow),
+                    "count": count
+                }
+                for flow_type, (inflow, outflow, count) in totals.items()
+            },
+            "net_change": from_minor(sum(inflow - outflow for inflow, outflow, _ in totals.values()))
+        }
@@ -0,0 +1,175 @@
+import threading
+import weakref
+from typing import Dict, Iterable, NamedTuple, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from database.models import Account, AccountType
+
+class CachedAccount(NamedTuple):
+    """캐시에 보관하는 계정과목 정보"""
+    id: int
+    code: str
+    type: AccountType
+    parent_id: Optional[int]
+
+class ChartOfAccountsCache:
+    """
+    계정코드 → 계정과목(ID, 유형, 상위 계정) 프로세스 내 캐시
+
+    데이터베이스(엔진)마다 첫 조회 때 전체 계정과목을 한 번 읽어 두고, 이후 코드 조회는
+    딕셔너리 조회로 처리합니다. 세션에서 계정과목이 추가·변경·삭제된 트랜잭션이 커밋되거나
+    롤백되면 해당 데이터베이스의 캐시를 비우므로(세션 이벤트) 관리자마다 따로 무효화할
+    필요가 없습니다.
+
+    계정과목을 바꾸는 트랜잭션이 아직 끝나지 않은 세션에서는 캐시를 쓰지 않고 직접 조회하며,
+    캐시에 없는 코드는 한 번 더 조회하여 다른 프로세스에서 추가된 계정과목도 찾습니다.
+    """
+
+    _DIRTY_KEY = 'chart_of_accounts_dirty'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._maps = weakref.WeakKeyDictionary()      # 엔진 → {코드: CachedAccount}
+        self._versions = weakref.WeakKeyDictionary()  # 엔진 → 무효화 횟수
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _engine(session: Session):
+        bind = session.get_bind()
+        return getattr(bind, 'engine', bind)
+
+    def _load(self, session: Session) -> Dict[str, CachedAccount]:
+        """전체 계정과목을 코드별로 읽습니다."""
+        return {
+            row.code: CachedAccount(*row)
+            for row in session.query(Account.id, Account.code, Account.type, Account.parent_id)
+        }
+
+    def _code_map(self, session: Session) -> Dict[str, CachedAccount]:
+        """세션의 데이터베이스에 해당하는 코드 맵을 반환합니다. (필요하면 읽어서 저장)"""
+        if session.info.get(self._DIRTY_KEY):
+            return self._load(session)
+
+        engine = self._engine(session)
+        with self._lock:
+            code_map = self._maps.get(engine)
+            version = self._versions.get(engine, 0)
+        if code_map is not None:
+            return code_map
+
+        code_map = self._load(session)
+        with self._lock:
+            self.loads += 1
+            # 읽는 동안 무효화되었다면 저장하지 않음
+            if self._versions.get(engine, 0) == version:
+                self._maps[engine] = code_map
+        return code_map
+
+    def get(self, session: Session, code: str) -> Optional[CachedAccount]:
+        """
+        계정코드로 계정과목 정보를 조회합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            code (str): 계정코드
+
+        Returns:
+            Optional[CachedAccount]: 계정과목 정보 (없으면 None)
+        """
+        return self.resolve(session, [code]).get(code)
+
+    def id_for(self, session: Session, code: str) -> Optional[int]:
+        """계정코드의 계정과목 ID를 반환합니다. (없으면 None)"""
+        account = self.get(session, code)
+        return account.id if account else None
+
+    def resolve(self, session: Session, codes: Iterable[str]) -> Dict[str, CachedAccount]:
+        """
+        여러 계정코드를 한 번에 조회합니다.
+
+        캐시에 없는 코드는 한 번의 쿼리로 다시 확인하고, 찾은 계정과목은 캐시에 추가합니다.
+
+        Returns:
+            Dict[str, CachedAccount]: 찾은 계정코드별 계정과목 정보 (없는 코드는 제외)
+        """
+        codes = set(codes)
+        code_map = self._code_map(session)
+        found = {code: code_map[code] for code in codes if code in code_map}
+        missing = codes - found.keys()
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            rows = session.query(Account.id, Account.code, Account.type, Account.parent_id)\
+                .filter(Account.code.in_(missing)).all()
+            added = {row.code: CachedAccount(*row) for row in rows}
+            found.update(added)
+            if added and not session.info.get(self._DIRTY_KEY):
+                with self._lock:
+                    current = self._maps.get(self._engine(session))
+                    if current is code_map:
+                        current.update(added)
+        return found
+
+    def code_map(self, session: Session) -> Dict[str, int]:
+        """전체 계정코드 → 계정과목 ID 매핑을 반환합니다."""
+        return {code: account.id for code, account in self._code_map(session).items()}
+
+    def invalidate(self, session: Optional[Session] = None) -> None:
+        """세션의 데이터베이스(None이면 전체)에 대한 캐시를 비웁니다."""
+        with self._lock:
+            self.invalidations += 1
+            engines = [self._engine(session)] if session is not None else list(self._maps.keys())
+            for engine in engines:
+                self._maps.pop(engine, None)
+                self._versions[engine] = self._versions.get(engine, 0) + 1
+
+    def stats(self) -> dict:
+        """캐시 적중/실패 횟수와 저장된 계정과목 수를 반환합니다."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "loads": self.loads,
+                "invalidations": self.invalidations,
+                "cached_accounts": sum(len(code_map) for code_map in self._maps.values())
+            }
+
+    # 세션 이벤트: 계정과목 변경을 표시했다가 트랜잭션이 끝나면 캐시를 비움
+    def _after_flush(self, session: Session, flush_context) -> None:
+        if any(isinstance(obj, Account) for obj in (*session.new, *session.dirty, *session.deleted)):
+            session.info[self._DIRTY_KEY] = True
+
+    def _do_orm_execute(self, orm_execute_state) -> None:
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = getattr(orm_execute_state.statement, 'table', None)
+            if getattr(table, 'name', None) == Account.__tablename__:
+                orm_execute_state.session.info[self._DIRTY_KEY] = True
+
+    def _after_transaction_end(self, session: Session) -> None:
+        if session.info.pop(self._DIRTY_KEY, False):
+            self.invalidate(session)
+
+    def _after_rollback(self, session: Session) -> None:
+        self._after_transaction_end(session)
+
+    def _after_commit(self, session: Session) -> None:
+        self._after_transaction_end(session)
+
+    def listen(self) -> 'ChartOfAccountsCache':
+        """모든 세션의 계정과목 변경을 감지하도록 세션 이벤트를 등록합니다."""
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'do_orm_execute', self._do_orm_execute)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_rollback', self._after_rollback)
+        return self
+
+# 관리자들이 함께 사용하는 프로세스 단위 캐시
+chart_of_accounts_cache = ChartOfAccountsCache().listen()
@@ -0,0 +1,189 @@
+from datetime import datetime
+from typing import List, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, exists, type_coerce
+from database.models import (
+    Account, AllocationRule, AllocationRuleItem, CostAllocation, CostCenter,
+    JournalEntry, JournalLine
+)
+from database.money import from_minor, minor_bindparam
+
+class CostAllocationManager:
+    """배부 규칙을 관리하고 규칙에 맞는 전표 라인을 일괄 배부하는 클래스"""
+
+    RATIO_TOLERANCE = 1e-6
+
+    def create_rule(self, session: Session, name: str, allocations: list,
+                    account_id: Optional[int] = None, account_code_from: Optional[str] = None,
+                    account_code_to: Optional[str] = None, description: str = None) -> AllocationRule:
+        """
+        원가 배부 규칙을 생성합니다.
+
+        규칙은 계정과목 하나(account_id) 또는 계정코드 범위(account_code_from ~ account_code_to)에
+        적용되며, 배부 비율의 합은 1이어야 합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            name (str): 규칙 이름 (중복 불가)
+            allocations (list): [{"cost_center_id": int, "ratio": float}, ...]
+            account_id (Optional[int]): 대상 계정과목 ID
+            account_code_from (Optional[str]): 대상 계정코드 범위 시작 (포함)
+            account_code_to (Optional[str]): 대상 계정코드 범위 끝 (포함)
+            description (str): 설명
+
+        Returns:
+            AllocationRule: 생성된 배부 규칙
+        """
+        has_range = account_code_from is not None or account_code_to is not None
+        if (account_id is None) == (not has_range):
+            raise ValueError("account_id 또는 계정코드 범위 중 하나만 지정해야 합니다.")
+        if has_range and (account_code_from is None or account_code_to is None or
+                          account_code_from > account_code_to):
+            raise ValueError("계정코드 범위가 올바르지 않습니다.")
+        if account_id is not None and not session.query(Account.id).filter(Account.id == account_id).first():
+            raise ValueError("계정과목을 찾을 수 없습니다.")
+
+        self._validate_allocations(session, allocations)
+
+        rule = AllocationRule(
+            name=name,
+            account_id=account_id,
+            account_code_from=account_code_from,
+            account_code_to=account_code_to,
+            description=description,
+            items=[
+                AllocationRuleItem(cost_center_id=alloc['cost_center_id'], ratio=float(alloc['ratio']))
+                for alloc in allocations
+            ]
+        )
+        session.add(rule)
+        session.commit()
+        return rule
+
+    def list_rules(self, session: Session, active_only: bool = True) -> List[AllocationRule]:
+        """배부 규칙 목록을 조회합니다."""
+        query = session.query(AllocationRule)
+        if active_only:
+            query = query.filter(AllocationRule.is_active == True)
+        return query.order_by(AllocationRule.name).all()
+
+    def apply_rule(self, session: Session, rule_id: int, start_date: datetime, end_date: datetime) -> dict:
+        """
+        기간 내 규칙 대상 계정의 전표 라인을 규칙의 비율로 일괄 배부합니다.
+
+        이미 배부된 라인은 건너뛰므로 같은 기간에 다시 실행해도 중복 배부되지 않습니다.
+        라인 금액(차변 - 대변)과 비율을 행렬로 곱해 최소 단위로 내림한 뒤, 남는 단수는
+        소수점 이하가 큰 원가 중심점부터(같으면 규칙 항목 순서대로) 1씩 더해
+        라인별 배부 합계가 라인 금액과 정확히 일치하도록 합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            rule_id (int): 배부 규칙 ID
+            start_date (datetime): 시작일
+            end_date (datetime): 종료일 (포함)
+
+        Returns:
+            dict: 배부한 라인 수, 생성한 배부 행 수, 배부 금액 합계
+        """
+        rule = session.query(AllocationRule).get(rule_id)
+        if not rule:
+            raise ValueError("배부 규칙을 찾을 수 없습니다.")
+        if not rule.is_active:
+            raise ValueError("비활성화된 배부 규칙입니다.")
+        if start_date > end_date:
+            raise ValueError("시작일이 종료일보다 늦습니다.")
+
+        query = session.query(
+            JournalLine.id,
+            type_coerce(JournalLine.debit, BigInteger),
+            type_coerce(JournalLine.credit, BigInteger)
+        ).join(JournalEntry, JournalEntry.id == JournalLine.entry_id).filter(
+            JournalEntry.entry_date >= start_date,
+            JournalEntry.entry_date <= end_date,
+            ~exists().where(CostAllocation.journal_line_id == JournalLine.id)
+        )
+        if rule.account_id is not None:
+            query = query.filter(JournalLine.account_id == rule.account_id)
+        else:
+            query = query.join(Account, Account.id == JournalLine.account_id).filter(
+                Account.code >= rule.account_code_from,
+                Account.code <= rule.account_code_to
+            )
+
+        lines = query.order_by(JournalLine.id).all()
+        line_ids = np.array([line_id for line_id, _, _ in lines], dtype=np.int64)
+        amounts = np.array([(debit or 0) - (credit or 0) for _, debit, credit in lines], dtype=np.int64)
+
+        nonzero = amounts != 0
+        line_ids, amounts = line_ids[nonzero], amounts[nonzero]
+        if len(amounts) == 0:
+            return {"rule_id": rule.id, "line_count": 0, "allocation_count": 0, "total_amount": from_minor(0)}
+
+        cost_center_ids = [item.cost_center_id for item in rule.items]
+        ratios = np.array([item.ratio for item in rule.items], dtype=np.float64)
+        shares = self.split_amounts(amounts, ratios)
+
+        rows = [
+            {
+                'journal_line_id': line_id,
+                'cost_center_id': cost_center_ids[column],
+                'ratio': float(ratios[column]),
+                'amount': share
+            }
+            for line_id, line_shares in zip(line_ids.tolist(), shares.tolist())
+            for column, share in enumerate(line_shares)
+        ]
+        session.execute(CostAllocation.__table__.insert().values(amount=minor_bindparam('amount')), rows)
+        session.commit()
+
+        return {
+            "rule_id": rule.id,
+            "line_count": len(line_ids),
+            "allocation_count": len(rows),
+            "total_amount": from_minor(amounts.sum())
+        }
+
+    @staticmethod
+    def split_amounts(amounts: np.ndarray, ratios: np.ndarray) -> np.ndarray:
+        """
+        최소 단위 금액 배열을 비율대로 나눈 (라인 수 × 비율 수) 정수 행렬을 반환합니다.
+
+        각 행의 합은 원래 금액과 정확히 같습니다. (최대 잉여 방식, 동률은 앞 순서 우선)
+        """
+        ratios = ratios / ratios.sum()
+        signs = np.sign(amounts)
+        magnitudes = np.abs(amounts)
+
+        # 2진 표현 오차가 내림 결과를 바꾸지 않도록 소수 6자리에서 먼저 정리
+        raw = np.round(magnitudes[:, None] * ratios[None, :], 6)
+        shares = np.floor(raw).astype(np.int64)
+        remainders = magnitudes - shares.sum(axis=1)
+
+        order = np.argsort(-(raw - shares), axis=1, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.broadcast_to(np.arange(len(ratios)), order.shape), axis=1)
+        shares += ranks < remainders[:, None]
+
+        return shares * signs[:, None]
+
+    def _validate_allocations(self, session: Session, allocations: list) -> None:
+        """배부 비율(양수, 합계 1)과 원가 중심점을 검증합니다."""
+        if not allocations:
+            raise ValueError("배부 비율이 필요합니다.")
+
+        cost_center_ids = [alloc['cost_center_id'] for alloc in allocations]
+        if len(set(cost_center_ids)) != len(cost_center_ids):
+            raise ValueError("같은 원가 중심점이 중복되었습니다.")
+        if any(float(alloc['ratio']) <= 0 for alloc in allocations):
+            raise ValueError("배부 비율은 0보다 커야 합니다.")
+        if abs(sum(float(alloc['ratio']) for alloc in allocations) - 1.0) > self.RATIO_TOLERANCE:
+            raise ValueError("배부 비율의 합이 1이 아닙니다.")
+
+        found = {
+            cost_center_id for cost_center_id, in session.query(CostCenter.id)
+            .filter(CostCenter.id.in_(cost_center_ids))
+        }
+        missing = set(cost_center_ids) - found
+        if missing:
+            raise ValueError(f"원가 중심점을 찾을 수 없습니다: {sorted(missing)}")
@@ -1,16 +1,30 @@
+import csv
+import io
 import os
+import numpy as np
+import openpyxl
 import pandas as pd
+import xlsxwriter
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Any
 import logging
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from database.models import Account, AccountType, JournalEntry, JournalLine
+from database.money import float_array_to_minor, minor_bindparam
+from accounting.period_balance_manager import PeriodBalanceManager
+from accounting.trial_balance_manager import TrialBalanceManager
+from accounting.account_hierarchy_manager import AccountHierarchyManager
+from accounting.chart_of_accounts_cache import chart_of_accounts_cache
 
 class ExcelManager:
     """Excel 파일 관리를 담당하는 클래스"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.period_balance_manager = PeriodBalanceManager()
+        self.trial_balance_manager = TrialBalanceManager()
+        self.hierarchy_manager = AccountHierarchyManager()
     
     def read_excel_template(self, file_path: str) -> Dict[str, pd.DataFrame]:
         """
@@ -35,19 +49,202 @@ class ExcelManager:
             self.logger.error(f"Excel 파일 읽기 중 오류 발생: {str(e)}")
             raise
     
-    def import_chart_of_accounts(self, session: Session, df: pd.DataFrame) -> List[Account]:
+    def iter_excel_chunks(self, file_path: str, chunk_size: int = 10000,
+                          sheet_names: Optional[List[str]] = None) -> Iterator[Tuple[str, pd.DataFrame]]:
+        """
+        Excel 파일을 시트별로 읽으면서 chunk_size 행씩 데이터프레임으로 반환합니다.
+        
+        openpyxl 읽기 전용 모드의 행 반복자를 사용하므로 메모리 사용량은 파일 크기가 아니라
+        chunk_size에 비례합니다. 각 시트의 첫 행은 헤더로 사용하며, 데이터프레임의 인덱스는
+        Excel 행 번호입니다. (.xls 파일은 스트리밍을 지원하지 않아 시트 전체를 읽은 뒤 나눕니다.)
+        
+        Args:
+            file_path (str): Excel 파일 경로
+            chunk_size (int): 한 번에 반환할 최대 행 수
+            sheet_names (Optional[List[str]]): 읽을 시트명 목록 (기본값: 전체 시트)
+            
+        Yields:
+            Tuple[str, pd.DataFrame]: (시트명, 데이터프레임 조각)
+        """
+        if os.path.splitext(file_path)[1].lower() == '.xls':
+            self.logger.warning(".xls 파일은 스트리밍 읽기를 지원하지 않아 시트 전체를 읽습니다.")
+            for sheet_name, df in self.read_excel_template(file_path).items():
+                if sheet_names and sheet_name not in sheet_names:
+                    continue
+                df.index = df.index + 2
+                for start in range(0, len(df), chunk_size):
+                    yield sheet_name, df.iloc[start:start + chunk_size]
+            return
+        
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for worksheet in workbook.worksheets:
+                if sheet_names and worksheet.title not in sheet_names:
+                    continue
+                
+                rows = worksheet.iter_rows(values_only=True)
+                header = next(rows, None)
+                if header is None:
+                    continue
+                
+                columns = [str(value).strip() if value is not None else f"Unnamed: {i}"
+                           for i, value in enumerate(header)]
+                width = len(columns)
+                buffer, row_numbers = [], []
+                
+                for row_number, row in enumerate(rows, start=2):
+                    if all(value is None for value in row):
+                        continue
+                    
+                    # 읽기 전용 모드에서는 행마다 길이가 다를 수 있으므로 헤더 길이에 맞춤
+                    row = tuple(row[:width]) + (None,) * (width - len(row))
+                    buffer.append(row)
+                    row_numbers.append(row_number)
+                    
+                    if len(buffer) >= chunk_size:
+                        yield worksheet.title, pd.DataFrame(buffer, columns=columns, index=row_numbers)
+                        buffer, row_numbers = [], []
+                
+                if buffer:
+                    yield worksheet.title, pd.DataFrame(buffer, columns=columns, index=row_numbers)
+        except Exception as e:
+            self.logger.error(f"Excel 파일 스트리밍 읽기 중 오류 발생: {str(e)}")
+            raise
+        finally:
+            workbook.close()
+    
+    def import_excel_streaming(self, session: Session, file_path: str, chunk_size: int = 10000,
+                               on_chunk: Optional[Callable[[str, int], None]] = None,
+                               resume: Optional[Dict[str, Any]] = None,
+                               on_batch: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Excel 파일을 조각 단위로 읽어 계정과목과 전표를 순차적으로 가져옵니다.
+        
+        헤더로 시트 종류를 판별합니다. ('계정코드', '계정명', '계정유형' → 계정과목,
+        '날짜', '적요', '계정코드', '차변', '대변' → 전표) 조각 경계에 걸친 날짜의 행은
+        다음 조각으로 넘겨 하나의 전표로 만듭니다. 같은 날짜의 행이 시트 곳곳에 흩어져
+        있으면 조각마다 별도의 전표가 생성되므로, 전표 시트는 날짜순 정렬을 권장합니다.
+        
+        넘길 행이 chunk_size 이상이면(한 날짜가 여러 조각에 걸친 경우) 마지막 적요가 이어지는
+        행만 넘기고 나머지는 먼저 가져오므로, 그 날짜는 적요 경계에서 나뉜 여러 전표가 되고
+        각 전표는 따로 차변/대변 합계를 검증합니다. 같은 날짜·적요의 연속된 행이 chunk_size
+        이상이면 넘기지 않고 조각 단위로 가져옵니다. 따라서 한 번에 처리하는 행 수는
+        chunk_size의 2배를 넘지 않습니다.
+        
+        가져오기 묶음마다 따로 커밋합니다. on_batch는 커밋 직전 같은 트랜잭션 안에서
+        재개 지점({'batch', 'chunk_size', 'accounts_created', 'entries_created', 'rejected_count'})으로
+        호출되므로, 중단된 뒤 같은 파일을 다시 가져올 때 마지막 재개 지점을 resume으로 넘기면
+        같은 조각 크기로 읽으면서 이미 커밋된 묶음은 건너뛰고 이어서 가져옵니다.
+        
+        Args:
+            session (Session): 데이터베이스 세션
+            file_path (str): Excel 파일 경로
+            chunk_size (int): 한 번에 처리할 최대 행 수
+            on_chunk (Optional[Callable[[str, int], None]]): 조각을 읽을 때마다 (시트 이름, 지금까지 읽은 행 수)로 호출
+            resume (Optional[Dict[str, Any]]): 이전 실행에서 마지막으로 커밋된 재개 지점
+            on_batch (Optional[Callable[[Dict[str, Any]], None]]): 묶음을 커밋하기 직전 재개 지점으로 호출
+            
+        Returns:
+            Dict[str, Any]: {'accounts_created': int, 'entries_created': int, 'rejected_count': int,
+                'rejections': pd.DataFrame} (건수는 재개 이전 묶음 포함, 'rejections'는 이번 실행에서
+                거부된 행이며 '시트' 컬럼이 추가됩니다.)
+        """
+        account_columns = ['계정코드', '계정명', '계정유형']
+        journal_columns = ['날짜', '적요', '계정코드', '차변', '대변']
+        resume = resume or {}
+        chunk_size = resume.get('chunk_size', chunk_size)  # 묶음 경계가 이전 실행과 같도록
+        summary = {key: resume.get(key, 0) for key in ('accounts_created', 'entries_created', 'rejected_count')}
+        rejections = []
+        carry: Optional[pd.DataFrame] = None
+        carry_sheet = None
+        batch = 0
+        
+        def run_batch(import_batch: Callable[[], None]):
+            nonlocal batch
+            batch += 1
+            if batch <= resume.get('batch', 0):
+                return  # 이전 실행에서 커밋된 묶음
+            import_batch()
+            if on_batch:
+                on_batch({'batch': batch, 'chunk_size': chunk_size, **summary})
+            session.commit()
+        
+        def import_journal_chunk(sheet_name: str, chunk: pd.DataFrame):
+            entry_ids, rejected = self.import_journal_entries(session, chunk, commit=False)
+            summary['entries_created'] += len(entry_ids)
+            summary['rejected_count'] += len(rejected)
+            if len(rejected):
+                rejections.append(rejected.assign(시트=sheet_name))
+        
+        def import_accounts_chunk(chunk: pd.DataFrame):
+            summary['accounts_created'] += len(self.import_chart_of_accounts(session, chunk, commit=False))
+        
+        rows_read = 0
+        for sheet_name, chunk in self.iter_excel_chunks(file_path, chunk_size):
+            rows_read += len(chunk)
+            if on_chunk:
+                on_chunk(sheet_name, rows_read)
+            
+            # 시트가 바뀌면 이전 시트에서 넘겨받은 행을 먼저 처리
+            if carry is not None and sheet_name != carry_sheet:
+                run_batch(lambda: import_journal_chunk(carry_sheet, carry))
+                carry = None
+            
+            if all(col in chunk.columns for col in journal_columns):
+                if carry is not None:
+                    chunk = pd.concat([carry, chunk])
+                
+                # 마지막 날짜의 행은 다음 조각과 이어질 수 있으므로 보류
+                dates = pd.to_datetime(chunk['날짜'], errors='coerce').dt.normalize()
+                tail = (dates == dates.iloc[-1]).to_numpy() if pd.notna(dates.iloc[-1]) \
+                    else np.zeros(len(chunk), dtype=bool)
+                # 보류할 행이 조각 크기 이상이면 마지막 적요의 연속된 행만 보류 (그마저 넘으면 보류하지 않음)
+                if tail.sum() >= chunk_size:
+                    tail = tail & self._trailing_run(chunk['적요'])
+                    if tail.sum() >= chunk_size:
+                        tail[:] = False
+                carry, carry_sheet = chunk[tail], sheet_name
+                
+                if (~tail).any():
+                    run_batch(lambda: import_journal_chunk(sheet_name, chunk[~tail]))
+            
+            elif all(col in chunk.columns for col in account_columns):
+                run_batch(lambda: import_accounts_chunk(chunk))
+            
+            else:
+                self.logger.info(f"회계 데이터 형식이 아닌 시트를 건너뜁니다: {sheet_name}")
+        
+        if carry is not None and len(carry):
+            run_batch(lambda: import_journal_chunk(carry_sheet, carry))
+        
+        summary['rejections'] = pd.concat(rejections, ignore_index=True) if rejections else pd.DataFrame()
+        return summary
+    
+    @staticmethod
+    def _trailing_run(values: pd.Series) -> np.ndarray:
+        """마지막 행과 값이 같은 끝쪽 연속 행 여부"""
+        values = values.astype(str).to_numpy()
+        different = np.flatnonzero(values != values[-1])
+        run = np.zeros(len(values), dtype=bool)
+        run[different[-1] + 1 if len(different) else 0:] = True
+        return run
+    
+    def import_chart_of_accounts(self, session: Session, df: pd.DataFrame, commit: bool = True) -> List[Account]:
         """
         Excel 데이터프레임에서 계정과목을 가져와 데이터베이스에 저장합니다.
         
         Args:
             session (Session): 데이터베이스 세션
             df (pd.DataFrame): 계정과목 데이터프레임
+            commit (bool): 저장 후 커밋할지 여부 (False이면 호출자가 커밋)
             
         Returns:
             List[Account]: 생성된 계정과목 리스트
         """
         try:
             accounts = []
+            parent_codes = {}
+            existing_codes = set(chart_of_accounts_cache.code_map(session))
             
             # 데이터프레임 컬럼 확인 및 필요한 컬럼 매핑
             required_columns = ['계정코드', '계정명', '계정유형']
@@ -70,10 +267,10 @@ class ExcelManager:
                 account_type_str = str(row['계정유형']).strip()
                 description = str(row.get('설명', ''))
                 
-                # 이미 존재하는 계정과목인지 확인
-                existing_account = session.query(Account).filter_by(code=code).first()
-                if existing_account:
+                # 이미 존재하거나 같은 시트에서 먼저 나온 계정과목인지 확인
+                if code in existing_codes:
                     continue
+                existing_codes.add(code)
                 
                 # 계정 유형 매핑
                 if account_type_str not in account_type_map:
@@ -90,10 +287,34 @@ class ExcelManager:
                     description=description
                 )
                 
+                parent_code = row.get('상위계정코드')
+                if pd.notna(parent_code) and str(parent_code).strip():
+                    parent_codes[code] = str(parent_code).strip()
+                
                 session.add(account)
                 accounts.append(account)
             
-            session.commit()
+            session.flush()
+            
+            # 상위 계정 연결 (같은 시트에서 함께 생성된 계정 포함) 후 클로저 갱신
+            if parent_codes:
+                code_to_id = dict(
+                    session.query(Account.code, Account.id)
+                    .filter(Account.code.in_(set(parent_codes.values()))).all()
+                )
+                for account in accounts:
+                    parent_code = parent_codes.get(account.code)
+                    if parent_code is None:
+                        continue
+                    if parent_code in code_to_id:
+                        account.parent_id = code_to_id[parent_code]
+                    else:
+                        self.logger.warning(f"상위 계정과목을 찾을 수 없음: {account.code} → {parent_code}")
+                session.flush()
+            
+            self.hierarchy_manager.add_accounts(session, accounts)
+            if commit:
+                session.commit()
             return accounts
             
         except Exception as e:
@@ -101,86 +322,142 @@ class ExcelManager:
             self.logger.error(f"계정과목 가져오기 중 오류 발생: {str(e)}")
             raise
     
-    def import_journal_entries(self, session: Session, df: pd.DataFrame) -> List[JournalEntry]:
+    def import_journal_entries(self, session: Session, df: pd.DataFrame,
+                               commit: bool = True) -> Tuple[List[int], pd.DataFrame]:
         """
         Excel 데이터프레임에서 전표를 가져와 데이터베이스에 저장합니다.
         
+        계정코드는 한 번 읽어 둔 코드→ID 매핑과 병합하고, 날짜별 차변/대변 합계를
+        groupby로 검증한 뒤 전표와 라인을 일괄 삽입합니다. 날짜별로 하나의 전표를 생성합니다.
+        
         Args:
             session (Session): 데이터베이스 세션
             df (pd.DataFrame): 전표 데이터프레임
+            commit (bool): 저장 후 커밋할지 여부 (False이면 호출자가 커밋)
             
         Returns:
-            List[JournalEntry]: 생성된 전표 리스트
+            Tuple[List[int], pd.DataFrame]: (생성된 전표 ID 목록, 거부된 행 데이터프레임)
+                거부된 행 데이터프레임은 원본 컬럼에 '행번호', '사유' 컬럼이 추가됩니다.
         """
         try:
-            entries = []
-            
             # 데이터프레임 컬럼 확인 및 필요한 컬럼 매핑
             required_columns = ['날짜', '적요', '계정코드', '차변', '대변']
             if not all(col in df.columns for col in required_columns):
                 raise ValueError("전표 데이터프레임에 필요한 컬럼이 없습니다.")
             
-            # 날짜별로 그룹화
-            grouped = df.groupby('날짜')
-            
-            for date, group in grouped:
-                # 날짜 처리
-                try:
-                    if isinstance(date, str):
-                        entry_date = datetime.strptime(date, '%Y-%m-%d')
-                    else:
-                        entry_date = pd.to_datetime(date).to_pydatetime()
-                except Exception:
-                    self.logger.warning(f"잘못된 날짜 형식: {date}, 현재 날짜로 설정")
-                    entry_date = datetime.now()
-                
-                # 적요 처리
-                descriptions = group['적요'].unique()
-                description = descriptions[0] if len(descriptions) > 0 else "Excel에서 가져온 전표"
-                
-                # 전표 생성
-                entry = JournalEntry(
-                    entry_date=entry_date,
-                    description=description,
-                    created_by="Excel Import"
-                )
-                
-                session.add(entry)
-                session.flush()  # ID 할당을 위해 flush
-                
-                # 전표 라인 생성
-                for _, row in group.iterrows():
-                    code = str(row['계정코드']).strip()
-                    debit = float(row['차변']) if not pd.isna(row['차변']) else 0
-                    credit = float(row['대변']) if not pd.isna(row['대변']) else 0
-                    
-                    # 계정과목 조회
-                    account = session.query(Account).filter_by(code=code).first()
-                    if not account:
-                        self.logger.warning(f"계정과목을 찾을 수 없음: {code}, 이 라인은 건너뜁니다.")
-                        continue
-                    
-                    # 전표 라인 생성
-                    line = JournalLine(
-                        entry_id=entry.id,
-                        account_id=account.id,
-                        debit=debit,
-                        credit=credit,
-                        description=row.get('라인설명', '')
-                    )
-                    
-                    session.add(line)
-                
-                entries.append(entry)
+            debit, invalid_debit = self._parse_amounts(df['차변'])
+            credit, invalid_credit = self._parse_amounts(df['대변'])
+            lines = pd.DataFrame({
+                '행번호': df.index,
+                'entry_date': pd.to_datetime(df['날짜'], errors='coerce').dt.normalize(),
+                'description': df['적요'],
+                'code': df['계정코드'].astype(str).str.strip(),
+                'debit': debit,
+                'credit': credit,
+                'invalid_amount': invalid_debit | invalid_credit,
+                'line_description': df['라인설명'] if '라인설명' in df.columns else ''
+            })
+            
+            # 계정코드 → 계정 ID 매핑 (계정과목 캐시)
+            account_map = pd.DataFrame(list(chart_of_accounts_cache.code_map(session).items()),
+                                       columns=['code', 'account_id'])
+            lines = lines.merge(account_map, on='code', how='left')
+            
+            # 거부 사유 판정
+            reasons = pd.Series(None, index=lines.index, dtype=object)
+            reasons[lines['entry_date'].isna()] = "잘못된 날짜 형식"
+            reasons[reasons.isna() & lines['invalid_amount']] = "잘못된 금액 형식"
+            reasons[reasons.isna() & lines['account_id'].isna()] = "계정과목을 찾을 수 없음"
+            
+            # 날짜별 차변/대변 합계 검증 (최소 단위 정수이므로 정확히 비교)
+            sums = lines[reasons.isna()].groupby('entry_date')[['debit', 'credit']].sum()
+            unbalanced_dates = sums.index[sums['debit'] != sums['credit']]
+            reasons[reasons.isna() & lines['entry_date'].isin(unbalanced_dates)] = "차변과 대변의 합계가 일치하지 않음"
+            
+            # 다른 행이 거부된 날짜는 일부 라인만 들어가지 않도록 전체를 거부
+            rejected_dates = lines.loc[reasons.notna(), 'entry_date'].dropna().unique()
+            reasons[reasons.isna() & lines['entry_date'].isin(rejected_dates)] = "같은 날짜의 다른 행이 거부됨"
+            
+            rejections = df.loc[lines.loc[reasons.notna(), '행번호']].copy()
+            rejections.insert(0, '행번호', rejections.index)
+            rejections['사유'] = reasons[reasons.notna()].values
+            if len(rejections):
+                self.logger.warning(f"전표 가져오기에서 {len(rejections)}개 행이 거부되었습니다.")
+            
+            valid = lines[reasons.isna()]
+            if valid.empty:
+                return [], rejections.reset_index(drop=True)
+            
+            # 날짜별 전표 일괄 생성
+            headers = valid.groupby('entry_date', sort=True)['description'].first()
+            inserted = session.execute(
+                insert(JournalEntry).returning(JournalEntry.id, sort_by_parameter_order=True),
+                [
+                    {
+                        'entry_date': entry_date.to_pydatetime(),
+                        'description': description if pd.notna(description) else "Excel에서 가져온 전표",
+                        'created_by': "Excel Import"
+                    }
+                    for entry_date, description in headers.items()
+                ]
+            )
+            # sort_by_parameter_order로 반환 ID가 입력 순서와 일치
+            entry_ids = pd.Series(inserted.scalars().all(), index=headers.index)
+            
+            # 전표 라인 일괄 삽입 (executemany)
+            line_rows = pd.DataFrame({
+                'entry_id': valid['entry_date'].map(entry_ids).astype(int),
+                'account_id': valid['account_id'].astype(int),
+                'debit': valid['debit'],
+                'credit': valid['credit'],
+                'description': valid['line_description'].where(valid['line_description'].notna(), None)
+            })
+            session.execute(
+                JournalLine.__table__.insert().values(
+                    debit=minor_bindparam('debit'),
+                    credit=minor_bindparam('credit')
+                ),
+                line_rows.to_dict('records')
+            )
+            
+            # 월별 잔액 집계 반영 (계정·월 단위로 미리 합산)
+            monthly = valid.assign(entry_date=valid['entry_date'].dt.to_period('M').dt.to_timestamp())\
+                .groupby(['account_id', 'entry_date'], as_index=False)[['debit', 'credit']].sum()
+            self.period_balance_manager.apply_lines(session, (
+                {
+                    'account_id': int(row.account_id),
+                    'entry_date': row.entry_date.to_pydatetime(),
+                    'debit': int(row.debit),
+                    'credit': int(row.credit)
+                }
+                for row in monthly.itertuples(index=False)
+            ), minor_units=True)
             
-            session.commit()
-            return entries
+            if commit:
+                session.commit()
+            return entry_ids.tolist(), rejections.reset_index(drop=True)
             
         except Exception as e:
             session.rollback()
             self.logger.error(f"전표 가져오기 중 오류 발생: {str(e)}")
             raise
     
+    @staticmethod
+    def _parse_amounts(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        금액 컬럼을 최소 단위 정수 배열로 변환합니다.
+        
+        빈 칸만 0으로 처리하고, 값이 있지만 숫자로 읽을 수 없는 칸('1,000' 등)은
+        0으로 바꾸지 않고 잘못된 값으로 표시합니다.
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (최소 단위 금액, 잘못된 값 여부)
+        """
+        blank = (values.isna() | values.astype(str).str.strip().eq('')).to_numpy()
+        numbers = pd.to_numeric(values.where(~blank), errors='coerce').to_numpy(dtype=np.float64)
+        invalid = ~blank & ~np.isfinite(numbers)
+        return float_array_to_minor(np.where(invalid | blank, 0.0, numbers)), invalid
+    
     def export_chart_of_accounts(self, session: Session) -> pd.DataFrame:
         """
         데이터베이스의 계정과목을 Excel로 내보낼 수 있는 데이터프레임으로 변환합니다.
@@ -203,13 +480,16 @@ class ExcelManager:
                 AccountType.EXPENSE: '비용'
             }
             
+            code_by_id = {account.id: account.code for account in accounts}
+            
             data = []
             for account in accounts:
                 data.append({
                     '계정코드': account.code,
                     '계정명': account.name,
                     '계정유형': account_type_map.get(account.type, '기타'),
-                    '설명': account.description or ''
+                    '설명': account.description or '',
+                    '상위계정코드': code_by_id.get(account.parent_id, '')
                 })
             
             return pd.DataFrame(data)
@@ -218,10 +498,145 @@ class ExcelManager:
             self.logger.error(f"계정과목 내보내기 중 오류 발생: {str(e)}")
             raise
     
+    JOURNAL_EXPORT_COLUMNS = ['날짜', '적요', '계정코드', '계정명', '차변', '대변', '라인설명']
+    
+    def iter_journal_rows(self, session: Session, start_date: Optional[datetime] = None,
+                          end_date: Optional[datetime] = None, batch_size: int = 5000) -> Iterator[tuple]:
+        """
+        전표 라인을 내보내기 형식의 튜플로 하나씩 반환합니다.
+        
+        전표·라인·계정과목을 조인한 컬럼 쿼리 하나를 yield_per로 batch_size씩 읽으므로
+        ORM 객체를 만들지 않고, 원장 전체를 메모리에 올리지 않습니다.
+        
+        Args:
+            session (Session): 데이터베이스 세션
+            start_date (Optional[datetime]): 조회 시작일 (기본값: None)
+            end_date (Optional[datetime]): 조회 종료일 (기본값: None)
+            batch_size (int): 데이터베이스에서 한 번에 가져올 행 수
+            
+        Yields:
+            tuple: JOURNAL_EXPORT_COLUMNS 순서의 값
+        """
+        query = session.query(
+            JournalEntry.entry_date,
+            JournalEntry.description,
+            Account.code,
+            Account.name,
+            JournalLine.debit,
+            JournalLine.credit,
+            JournalLine.description
+        ).join(JournalLine, JournalLine.entry_id == JournalEntry.id)\
+            .join(Account, Account.id == JournalLine.account_id)
+        
+        # 날짜 필터 적용
+        if start_date:
+            query = query.filter(JournalEntry.entry_date >= start_date)
+        if end_date:
+            query = query.filter(JournalEntry.entry_date <= end_date)
+        
+        query = query.order_by(JournalEntry.entry_date, JournalEntry.id, JournalLine.id)\
+            .yield_per(batch_size)
+        
+        for entry_date, description, code, name, debit, credit, line_description in query:
+            yield (
+                entry_date.strftime('%Y-%m-%d'),
+                description,
+                code,
+                name,
+                debit if debit and debit > 0 else None,
+                credit if credit and credit > 0 else None,
+                line_description or ''
+            )
+    
+    def iter_journal_csv(self, session: Session, start_date: Optional[datetime] = None,
+                         end_date: Optional[datetime] = None, batch_size: int = 5000) -> Iterator[str]:
+        """
+        전표를 CSV 텍스트 조각으로 반환합니다. (HTTP 청크 응답용, Excel 호환을 위해 BOM 포함)
+        
+        Args:
+            session (Session): 데이터베이스 세션
+            start_date (Optional[datetime]): 조회 시작일 (기본값: None)
+            end_date (Optional[datetime]): 조회 종료일 (기본값: None)
+            batch_size (int): 조각 하나에 담을 행 수
+            
+        Yields:
+            str: CSV 텍스트 조각
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')
+        writer.writerow(self.JOURNAL_EXPORT_COLUMNS)
+        
+        for count, row in enumerate(self.iter_journal_rows(session, start_date, end_date, batch_size), start=1):
+            writer.writerow(row)
+            if count % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        
+        yield buffer.getvalue()
+    
+    def write_journal_csv(self, session: Session, output_path: str, start_date: Optional[datetime] = None,
+                          end_date: Optional[datetime] = None) -> str:
+        """
+        전표를 CSV 파일로 스트리밍 저장합니다.
+        
+        Args:
+            session (Session): 데이터베이스 세션
+            output_path (str): 저장할 파일 경로
+            start_date (Optional[datetime]): 조회 시작일 (기본값: None)
+            end_date (Optional[datetime]): 조회 종료일 (기본값: None)
+            
+        Returns:
+            str: 생성된 파일 경로
+        """
+        try:
+            with open(output_path, 'w', encoding='utf-8', newline='') as f:
+                for chunk in self.iter_journal_csv(session, start_date, end_date):
+                    f.write(chunk)
+            return output_path
+        except Exception as e:
+            self.logger.error(f"전표 CSV 내보내기 중 오류 발생: {str(e)}")
+            raise
+    
+    def write_journal_excel(self, session: Session, output_path: str, start_date: Optional[datetime] = None,
+                            end_date: Optional[datetime] = None) -> str:
+        """
+        전표를 xlsxwriter constant_memory 모드로 Excel 파일에 스트리밍 저장합니다.
+        
+        Args:
+            session (Session): 데이터베이스 세션
+            output_path (str): 저장할 파일 경로
+            start_date (Optional[datetime]): 조회 시작일 (기본값: None)
+            end_date (Optional[datetime]): 조회 종료일 (기본값: None)
+            
+        Returns:
+            str: 생성된 파일 경로
+        """
+        try:
+            workbook = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+            try:
+                worksheet = workbook.add_worksheet('전표')
+                worksheet.set_column('A:G', 15)
+                header_format = workbook.add_format({'bold': True, 'bg_color': '#D9E1F2', 'border': 1})
+                
+                worksheet.write_row(0, 0, self.JOURNAL_EXPORT_COLUMNS, header_format)
+                for row_number, row in enumerate(self.iter_journal_rows(session, start_date, end_date), start=1):
+                    worksheet.write_row(row_number, 0, row)
+            finally:
+                workbook.close()
+            
+            return output_path
+        except Exception as e:
+            self.logger.error(f"전표 Excel 내보내기 중 오류 발생: {str(e)}")
+            raise
+    
     def export_journal_entries(self, session: Session, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> pd.DataFrame:
         """
         데이터베이스의 전표를 Excel로 내보낼 수 있는 데이터프레임으로 변환합니다.
         
+        대용량 원장은 write_journal_excel / write_journal_csv를 사용하세요.
+        
         Args:
             session (Session): 데이터베이스 세션
             start_date (Optional[datetime]): 조회 시작일 (기본값: None)
@@ -231,35 +646,102 @@ class ExcelManager:
             pd.DataFrame: 전표 데이터프레임
         """
         try:
-            # 전표 조회 쿼리 생성
-            query = session.query(JournalEntry)
+            return pd.DataFrame(
+                list(self.iter_journal_rows(session, start_date, end_date)),
+                columns=self.JOURNAL_EXPORT_COLUMNS
+            )
+            
+        except Exception as e:
+            self.logger.error(f"전표 내보내기 중 오류 발생: {str(e)}")
+            raise
+    
+    def trial_balance_to_dataframe(self, trial_balance: dict) -> pd.DataFrame:
+        """
+        TrialBalanceManager.generate_trial_balance 결과를 시산표 데이터프레임으로 변환합니다.
+        
+        기간이 하나이면 '계정코드, 계정명, 기초잔액, 차변합계, 대변합계, 잔액' 형식이고,
+        여러 기간이면 기간별 차변/대변/잔액 열이 기초잔액 뒤에 추가됩니다.
+        
+        Args:
+            trial_balance (dict): 시산표 계산 결과
             
-            # 날짜 필터 적용
-            if start_date:
-                query = query.filter(JournalEntry.entry_date >= start_date)
-            if end_date:
-                query = query.filter(JournalEntry.entry_date <= end_date)
+        Returns:
+            pd.DataFrame: 시산표 데이터프레임
+        """
+        labels = trial_balance['periods']
+        multi_period = len(labels) > 1
+        
+        data = []
+        for account in trial_balance['accounts']:
+            # 상위 계정 합산 시 계층을 들여쓰기로 표시
+            row = {
+                '계정코드': account['code'],
+                '계정명': '  ' * account['level'] + account['name'] if trial_balance['rollup'] else account['name'],
+                '기초잔액': account['opening_balance']
+            }
+            if multi_period:
+                for label, period in zip(labels, account['periods']):
+                    row[f'{label} 차변'] = period['debit']
+                    row[f'{label} 대변'] = period['credit']
+                    row[f'{label} 잔액'] = period['closing_balance']
+            row['차변합계'] = account['debit']
+            row['대변합계'] = account['credit']
+            row['잔액'] = account['closing_balance']
+            data.append(row)
+        
+        columns = ['계정코드', '계정명', '기초잔액']
+        if multi_period:
+            for label in labels:
+                columns.extend([f'{label} 차변', f'{label} 대변', f'{label} 잔액'])
+        columns.extend(['차변합계', '대변합계', '잔액'])
+        
+        return pd.DataFrame(data, columns=columns)
+    
+    def export_trial_balance(self, session: Session, output_path: str, start_date: datetime,
+                             end_date: datetime, granularity: str = 'month', rollup: bool = False) -> str:
+        """
+        기간별 시산표를 Excel 파일로 저장합니다.
+        
+        Args:
+            session (Session): 데이터베이스 세션
+            output_path (str): 저장할 파일 경로
+            start_date (datetime): 시작일
+            end_date (datetime): 종료일
+            granularity (str): 열 단위 ('month', 'quarter', 'year')
+            rollup (bool): 상위 계정에 하위 계정 금액을 합산할지 여부
             
-            # 날짜순 정렬
-            entries = query.order_by(JournalEntry.entry_date).all()
+        Returns:
+            str: 생성된 파일 경로
+        """
+        try:
+            trial_balance = self.trial_balance_manager.generate_trial_balance(
+                session, start_date, end_date, granularity=granularity, rollup=rollup
+            )
+            df = self.trial_balance_to_dataframe(trial_balance)
             
-            data = []
-            for entry in entries:
-                for line in entry.lines:
-                    data.append({
-                        '날짜': entry.entry_date.strftime('%Y-%m-%d'),
-                        '적요': entry.description,
-                        '계정코드': line.account.code,
-                        '계정명': line.account.name,
-                        '차변': line.debit if line.debit > 0 else None,
-                        '대변': line.credit if line.credit > 0 else None,
-                        '라인설명': line.description or ''
-                    })
+            with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
+                df.to_excel(writer, sheet_name='시산표', index=False)
+                
+                workbook = writer.book
+                worksheet = writer.sheets['시산표']
+                worksheet.set_column(0, 1, 20)
+                worksheet.set_column(2, len(df.columns) - 1, 15, workbook.add_format({'num_format': '#,##0'}))
+                worksheet.freeze_panes(1, 2)
+                
+                header_format = workbook.add_format({
+                    'bold': True,
+                    'text_wrap': True,
+                    'valign': 'top',
+                    'bg_color': '#D9E1F2',
+                    'border': 1
+                })
+                for col_num, value in enumerate(df.columns):
+                    worksheet.write(0, col_num, value, header_format)
             
-            return pd.DataFrame(data)
+            return output_path
             
         except Exception as e:
-            self.logger.error(f"전표 내보내기 중 오류 발생: {str(e)}")
+            self.logger.error(f"시산표 내보내기 중 오류 발생: {str(e)}")
             raise
     
     def create_custom_excel_template(self, session: Session, output_path: str) -> str:
@@ -282,10 +764,13 @@ class ExcelManager:
                 '날짜', '적요', '계정코드', '계정명', '차변', '대변', '라인설명'
             ])
             
-            # 빈 시산표 데이터프레임 생성
-            trial_balance_template = pd.DataFrame(columns=[
-                '계정코드', '계정명', '기초잔액', '차변합계', '대변합계', '잔액'
-            ])
+            # 당해 연도 누계 시산표 생성
+            today = datetime.now()
+            trial_balance_template = self.trial_balance_to_dataframe(
+                self.trial_balance_manager.generate_trial_balance(
+                    session, datetime(today.year, 1, 1), today, granularity='year'
+                )
+            )
             
             # 재무제표 템플릿 데이터프레임 생성
             financial_statements_template = pd.DataFrame(columns=[
@@ -293,15 +778,20 @@ class ExcelManager:
             ])
             
             # Excel 파일 생성
+            sheets = {
+                '계정과목': accounts_df,
+                '전표입력': journal_template,
+                '시산표': trial_balance_template,
+                '재무제표': financial_statements_template
+            }
+            
             with pd.ExcelWriter(output_path, engine='xlsxwriter') as writer:
-                accounts_df.to_excel(writer, sheet_name='계정과목', index=False)
-                journal_template.to_excel(writer, sheet_name='전표입력', index=False)
-                trial_balance_template.to_excel(writer, sheet_name='시산표', index=False)
-                financial_statements_template.to_excel(writer, sheet_name='재무제표', index=False)
+                for sheet_name, df in sheets.items():
+                    df.to_excel(writer, sheet_name=sheet_name, index=False)
                 
                 # 워크시트 포맷 설정
                 workbook = writer.book
-                for sheet_name in writer.sheets:
+                for sheet_name, df in sheets.items():
                     worksheet = writer.sheets[sheet_name]
                     
                     # 열 너비 설정
@@ -317,7 +807,7 @@ class ExcelManager:
                     })
                     
                     # 헤더에 포맷 적용
-                    for col_num, value in enumerate(writer.sheets[sheet_name].table.columns):
+                    for col_num, value in enumerate(df.columns):
                         worksheet.write(0, col_num, value, header_format)
             
             return output_path
@@ -0,0 +1,370 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, bindparam, func, extract, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from database.models import (
+    Account, AccountType, AccountClosure, AccountPeriodBalance, AccountBalanceSnapshot,
+    JournalEntry, JournalLine
+)
+from database.money import to_minor, minor_bindparam
+
+def upsert(session: Session, table):
+    """세션의 데이터베이스에 맞는 INSERT ... ON CONFLICT 문을 만듭니다. (SQLite, PostgreSQL)"""
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite.insert(table)
+    if dialect == 'postgresql':
+        return postgresql.insert(table)
+    raise NotImplementedError(f"지원하지 않는 데이터베이스입니다: {dialect}")
+
+class PeriodBalanceManager:
+    """계정과목별·월별 차변/대변 합계(집계 테이블)를 관리하는 클래스"""
+
+    @staticmethod
+    def period_of(date: datetime) -> int:
+        """일자를 YYYYMM 형식의 기간으로 변환합니다."""
+        return date.year * 100 + date.month
+
+    @staticmethod
+    def period_start(period: int) -> datetime:
+        """기간의 시작 일시(해당 월 1일 0시)를 반환합니다."""
+        return datetime(period // 100, period % 100, 1)
+
+    @staticmethod
+    def next_period(period: int) -> int:
+        """다음 달 기간을 반환합니다."""
+        year, month = divmod(period, 100)
+        return (year + 1) * 100 + 1 if month == 12 else period + 1
+
+    @staticmethod
+    def previous_period(period: int) -> int:
+        """이전 달 기간을 반환합니다."""
+        year, month = divmod(period, 100)
+        return (year - 1) * 100 + 12 if month == 1 else period - 1
+
+    def apply_lines(self, session: Session, lines: Iterable[dict], minor_units: bool = False) -> None:
+        """
+        전표 라인의 금액을 월별 집계에 반영합니다. (커밋은 호출자가 수행)
+
+        Args:
+            session (Session): 데이터베이스 세션
+            lines (Iterable[dict]): account_id, entry_date, debit, credit 키를 가진 라인 목록
+            minor_units (bool): debit/credit이 이미 최소 단위 정수인지 여부
+        """
+        # 최소 단위 정수로 누적하여 금액 타입(Decimal/float/int)에 관계없이 정확하게 합산
+        convert = int if minor_units else to_minor
+        deltas: Dict[Tuple[int, int], List[int]] = {}
+        for line in lines:
+            key = (line['account_id'], self.period_of(line['entry_date']))
+            delta = deltas.setdefault(key, [0, 0])
+            delta[0] += convert(line.get('debit') or 0)
+            delta[1] += convert(line.get('credit') or 0)
+
+        if not deltas:
+            return
+
+        self._invalidate_snapshots(session, deltas)
+
+        # (계정, 월)마다 한 문장으로 누적하여 동시에 반영하는 세션끼리 합계를 잃거나
+        # 고유 키 충돌로 실패하지 않도록 함
+        table = AccountPeriodBalance.__table__
+        statement = upsert(session, table).values(
+            account_id=bindparam('account_id'),
+            period=bindparam('period'),
+            debit=minor_bindparam('debit'),
+            credit=minor_bindparam('credit'),
+            updated_at=bindparam('updated_at')
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.account_id, table.c.period],
+            set_={
+                'debit': func.coalesce(table.c.debit, 0) + statement.excluded.debit,
+                'credit': func.coalesce(table.c.credit, 0) + statement.excluded.credit,
+                'updated_at': statement.excluded.updated_at
+            }
+        )
+        now = datetime.utcnow()
+        session.execute(statement, [
+            {'account_id': account_id, 'period': period, 'debit': debit, 'credit': credit, 'updated_at': now}
+            for (account_id, period), (debit, credit) in deltas.items()
+        ])
+
+    def rebuild(self, session: Session) -> int:
+        """
+        전표 라인 전체로부터 월별 집계 테이블을 다시 생성합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+
+        Returns:
+            int: 생성된 집계 행 수
+        """
+        period = (extract('year', JournalEntry.entry_date) * 100 +
+                  extract('month', JournalEntry.entry_date))
+
+        source = session.query(
+            JournalLine.account_id,
+            period,
+            func.sum(JournalLine.debit),
+            func.sum(JournalLine.credit)
+        ).join(JournalEntry).group_by(JournalLine.account_id, period)
+
+        session.query(AccountBalanceSnapshot).delete(synchronize_session=False)
+        session.query(AccountPeriodBalance).delete(synchronize_session=False)
+        session.execute(
+            insert(AccountPeriodBalance).from_select(
+                ['account_id', 'period', 'debit', 'credit'],
+                source.statement
+            )
+        )
+        session.commit()
+        return session.query(func.count(AccountPeriodBalance.id)).scalar()
+
+    def closing_balances(self, session: Session, period: int,
+                         account_ids: Optional[List[int]] = None) -> Dict[int, Decimal]:
+        """
+        월말 누적 잔액(차변 - 대변)을 스냅샷에서 조회합니다. (커밋은 호출자가 수행)
+
+        스냅샷이 없는 계정은 가장 최근 스냅샷에 그 이후 월별 집계를 더해 계산하고
+        스냅샷으로 저장하므로, 이후 조회는 스냅샷 조회 한 번으로 끝납니다.
+        소급 전표가 반영되면 apply_lines가 해당 월 이후 스냅샷을 삭제합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            period (int): 기간 (YYYYMM)
+            account_ids (Optional[List[int]]): 대상 계정과목 ID 목록 (None이면 전체)
+
+        Returns:
+            Dict[int, Decimal]: 계정과목 ID별 월말 잔액
+        """
+        if account_ids is None:
+            account_ids = [account_id for account_id, in session.query(Account.id)]
+        if not account_ids:
+            return {}
+
+        balances = dict(
+            session.query(AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.balance).filter(
+                AccountBalanceSnapshot.period == period,
+                AccountBalanceSnapshot.account_id.in_(account_ids)
+            )
+        )
+        missing = [account_id for account_id in set(account_ids) if account_id not in balances]
+        if not missing:
+            return balances
+
+        # 계정별 가장 최근 스냅샷을 기준으로 그 이후 월별 집계만 더함
+        latest = session.query(
+            AccountBalanceSnapshot.account_id,
+            func.max(AccountBalanceSnapshot.period).label('period')
+        ).filter(
+            AccountBalanceSnapshot.period < period,
+            AccountBalanceSnapshot.account_id.in_(missing)
+        ).group_by(AccountBalanceSnapshot.account_id).subquery()
+
+        bases: Dict[int, Tuple[int, Decimal]] = {account_id: (0, Decimal(0)) for account_id in missing}
+        for account_id, base_period, balance in session.query(
+            AccountBalanceSnapshot.account_id, AccountBalanceSnapshot.period, AccountBalanceSnapshot.balance
+        ).join(latest, and_(
+            AccountBalanceSnapshot.account_id == latest.c.account_id,
+            AccountBalanceSnapshot.period == latest.c.period
+        )):
+            bases[account_id] = (base_period, balance)
+
+        by_base: Dict[int, List[int]] = {}
+        for account_id, (base_period, _) in bases.items():
+            by_base.setdefault(base_period, []).append(account_id)
+
+        for base_period, group in by_base.items():
+            rows = session.query(
+                AccountPeriodBalance.account_id,
+                func.sum(AccountPeriodBalance.debit),
+                func.sum(AccountPeriodBalance.credit)
+            ).filter(
+                AccountPeriodBalance.period > base_period,
+                AccountPeriodBalance.period <= period,
+                AccountPeriodBalance.account_id.in_(group)
+            ).group_by(AccountPeriodBalance.account_id)
+            totals = {account_id: (debit or 0) - (credit or 0) for account_id, debit, credit in rows}
+            for account_id in group:
+                balances[account_id] = bases[account_id][1] + totals.get(account_id, 0)
+
+        # 같은 스냅샷을 동시에 계산한 조회끼리 고유 키 충돌로 실패하지 않도록 먼저 저장한 값을 유지
+        table = AccountBalanceSnapshot.__table__
+        session.execute(
+            upsert(session, table).on_conflict_do_nothing(index_elements=[table.c.account_id, table.c.period]),
+            [
+                {'account_id': account_id, 'period': period, 'balance': balances[account_id],
+                 'created_at': datetime.utcnow()}
+                for account_id in missing
+            ]
+        )
+        return balances
+
+    def account_totals(self, session: Session, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None, account_ids: Optional[List[int]] = None,
+                       account_types: Optional[List[AccountType]] = None) -> Dict[int, Tuple[Decimal, Decimal]]:
+        """
+        기간(start 이상, end 이하)의 계정과목별 차변/대변 합계를 계산합니다.
+
+        온전히 포함되는 월은 월별 집계에서 읽고, 기간 경계에 걸친 월만
+        전표 라인에서 직접 합산합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            start (Optional[datetime]): 시작 일시 (None이면 처음부터)
+            end (Optional[datetime]): 종료 일시 (None이면 끝까지)
+            account_ids (Optional[List[int]]): 대상 계정과목 ID 목록
+            account_types (Optional[List[AccountType]]): 대상 계정 유형 목록
+
+        Returns:
+            Dict[int, Tuple[Decimal, Decimal]]: 계정과목 ID별 (차변 합계, 대변 합계)
+        """
+        return self._totals(session, start, end, account_ids, account_types, by_ancestor=False)
+
+    def subtree_totals(self, session: Session, start: Optional[datetime] = None,
+                       end: Optional[datetime] = None, account_ids: Optional[List[int]] = None,
+                       account_types: Optional[List[AccountType]] = None) -> Dict[int, Tuple[Decimal, Decimal]]:
+        """
+        기간의 계정과목별 하위 계정 포함 차변/대변 합계를 계산합니다.
+
+        계정 클로저 테이블과 한 번 조인하여 상위 계정 기준으로 묶으므로
+        계층의 어느 단계든 같은 비용으로 소계를 구할 수 있습니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            start (Optional[datetime]): 시작 일시 (None이면 처음부터)
+            end (Optional[datetime]): 종료 일시 (None이면 끝까지)
+            account_ids (Optional[List[int]]): 소계를 구할 (상위) 계정과목 ID 목록
+            account_types (Optional[List[AccountType]]): 대상 (상위) 계정 유형 목록
+
+        Returns:
+            Dict[int, Tuple[Decimal, Decimal]]: 계정과목 ID별 하위 계정 포함 (차변 합계, 대변 합계)
+        """
+        return self._totals(session, start, end, account_ids, account_types, by_ancestor=True)
+
+    def _totals(self, session: Session, start: Optional[datetime], end: Optional[datetime],
+                account_ids: Optional[List[int]], account_types: Optional[List[AccountType]],
+                by_ancestor: bool) -> Dict[int, Tuple[Decimal, Decimal]]:
+        """월별 집계와 경계 월의 전표 라인을 합쳐 계정과목별 합계를 계산합니다."""
+        totals: Dict[int, List[Decimal]] = {}
+
+        def accumulate(rows):
+            for account_id, debit, credit in rows:
+                total = totals.setdefault(account_id, [Decimal(0), Decimal(0)])
+                total[0] += debit or 0
+                total[1] += credit or 0
+
+        # 집계 테이블에서 읽을 수 있는 월 범위 결정
+        first_full = None
+        if start is not None:
+            first_full = self.period_of(start)
+            if start != self.period_start(first_full):
+                first_full = self.next_period(first_full)
+
+        last_full = None
+        if end is not None:
+            last_full = self.period_of(end)
+            if end + timedelta(microseconds=1) < self.period_start(self.next_period(last_full)):
+                last_full = self.previous_period(last_full)
+
+        if first_full is not None and last_full is not None and first_full > last_full:
+            # 기간 전체가 한 달 안에 있으므로 라인에서 직접 합산
+            accumulate(self._line_totals(session, start, end, account_ids, account_types, by_ancestor))
+            return {account_id: tuple(total) for account_id, total in totals.items()}
+
+        accumulate(self._rollup_totals(session, first_full, last_full, account_ids, account_types, by_ancestor))
+
+        if first_full is not None and start != self.period_start(first_full):
+            accumulate(self._line_totals(
+                session, start, self.period_start(first_full), account_ids, account_types,
+                by_ancestor, end_inclusive=False
+            ))
+
+        if last_full is not None and end is not None:
+            tail_start = self.period_start(self.next_period(last_full))
+            if tail_start <= end:
+                accumulate(self._line_totals(session, tail_start, end, account_ids, account_types, by_ancestor))
+
+        return {account_id: tuple(total) for account_id, total in totals.items()}
+
+    def net_balance(self, session: Session, account_id: int, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None) -> Decimal:
+        """기간의 계정과목 순잔액(차변 - 대변)을 계산합니다."""
+        debit, credit = self.account_totals(session, start, end, account_ids=[account_id])\
+            .get(account_id, (Decimal(0), Decimal(0)))
+        return debit - credit
+
+    def _rollup_totals(self, session: Session, first_period: Optional[int], last_period: Optional[int],
+                       account_ids: Optional[List[int]], account_types: Optional[List[AccountType]],
+                       by_ancestor: bool = False):
+        """월별 집계 테이블에서 계정과목별 합계를 조회합니다."""
+        group_column = AccountClosure.ancestor_id if by_ancestor else AccountPeriodBalance.account_id
+
+        query = session.query(
+            group_column,
+            func.sum(AccountPeriodBalance.debit),
+            func.sum(AccountPeriodBalance.credit)
+        )
+
+        if by_ancestor:
+            query = query.join(AccountClosure, AccountClosure.descendant_id == AccountPeriodBalance.account_id)
+
+        if first_period is not None:
+            query = query.filter(AccountPeriodBalance.period >= first_period)
+        if last_period is not None:
+            query = query.filter(AccountPeriodBalance.period <= last_period)
+        if account_ids is not None:
+            query = query.filter(group_column.in_(account_ids))
+        if account_types is not None:
+            query = query.join(Account, Account.id == group_column)\
+                .filter(Account.type.in_(account_types))
+
+        return query.group_by(group_column).all()
+
+    def _line_totals(self, session: Session, start: Optional[datetime], end: Optional[datetime],
+                     account_ids: Optional[List[int]], account_types: Optional[List[AccountType]],
+                     by_ancestor: bool = False, end_inclusive: bool = True):
+        """전표 라인에서 계정과목별 합계를 직접 조회합니다."""
+        group_column = AccountClosure.ancestor_id if by_ancestor else JournalLine.account_id
+
+        query = session.query(
+            group_column,
+            func.sum(JournalLine.debit),
+            func.sum(JournalLine.credit)
+        ).select_from(JournalLine).join(JournalEntry)
+
+        if by_ancestor:
+            query = query.join(AccountClosure, AccountClosure.descendant_id == JournalLine.account_id)
+
+        if start is not None:
+            query = query.filter(JournalEntry.entry_date >= start)
+        if end is not None:
+            if end_inclusive:
+                query = query.filter(JournalEntry.entry_date <= end)
+            else:
+                query = query.filter(JournalEntry.entry_date < end)
+        if account_ids is not None:
+            query = query.filter(group_column.in_(account_ids))
+        if account_types is not None:
+            query = query.join(Account, Account.id == group_column)\
+                .filter(Account.type.in_(account_types))
+
+        return query.group_by(group_column).all()
+
+    def _invalidate_snapshots(self, session: Session, deltas: Dict[Tuple[int, int], List[int]]) -> None:
+        """변경된 월 이후의 월말 잔액 스냅샷을 계정별로 삭제합니다."""
+        first_changed: Dict[int, int] = {}
+        for account_id, period in deltas:
+            first_changed[account_id] = min(period, first_changed.get(account_id, period))
+
+        by_period: Dict[int, List[int]] = {}
+        for account_id, period in first_changed.items():
+            by_period.setdefault(period, []).append(account_id)
+
+        for period, account_ids in by_period.items():
+            session.query(AccountBalanceSnapshot).filter(
+                AccountBalanceSnapshot.period >= period,
+                AccountBalanceSnapshot.account_id.in_(account_ids)
+            ).delete(synchronize_session=False)
@@ -0,0 +1,251 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func
+from database.models import Account, AccountType, AccountPeriodBalance, JournalEntry, JournalLine
+from accounting.period_balance_manager import PeriodBalanceManager
+
+Period = Tuple[datetime, datetime]
+
+class TaxManager:
+    """세금 신고 금액을 기간 단위로 한 번에 계산하고 마감된 기간의 결과를 캐시하는 클래스"""
+
+    REPORT_TYPES = ('VAT', 'CORPORATE_TAX')
+    VAT_OUTPUT_CODE = '21510'  # 부가세 예수금
+    VAT_INPUT_CODE = '11510'   # 부가세 대급금
+
+    def __init__(self):
+        self.period_balance_manager = PeriodBalanceManager()
+        # (신고 유형, 시작, 종료) → (집계 서명, 계산 결과)
+        self._cache: Dict[Tuple[str, datetime, datetime], Tuple[tuple, dict]] = {}
+
+    @staticmethod
+    def vat_periods(year: int) -> List[Tuple[str, datetime, datetime]]:
+        """연도의 부가가치세 분기 신고 기간(1기 예정/확정, 2기 예정/확정)을 반환합니다."""
+        labels = ['1기 예정', '1기 확정', '2기 예정', '2기 확정']
+        periods = []
+        for quarter, label in enumerate(labels):
+            start = datetime(year, quarter * 3 + 1, 1)
+            end = (datetime(year + 1, 1, 1) if quarter == 3 else datetime(year, quarter * 3 + 4, 1)) \
+                - timedelta(microseconds=1)
+            periods.append((label, start, end))
+        return periods
+
+    def compute(self, session: Session, report_type: str, periods: List[Period]) -> List[dict]:
+        """
+        여러 신고 기간의 세금 신고 금액을 한 번의 그룹 쿼리로 계산합니다.
+
+        마감된 기간(종료일이 현재 이전)의 결과는 캐시하며, 해당 기간의 월별 집계가
+        변경되면(소급 전표 등) 다시 계산합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            report_type (str): 'VAT' 또는 'CORPORATE_TAX'
+            periods (List[Period]): (시작일, 종료일) 목록 (종료일 포함)
+
+        Returns:
+            List[dict]: 기간 순서대로 {"period_start", "period_end", "total_amount", ...}
+        """
+        if report_type not in self.REPORT_TYPES:
+            raise ValueError("지원하지 않는 세금 신고 유형입니다.")
+
+        if any(start > end for start, end in periods):
+            raise ValueError("시작일이 종료일보다 늦습니다.")
+
+        now = datetime.now()
+        results: List[Optional[dict]] = [None] * len(periods)
+        finished = [index for index, (_, end) in enumerate(periods) if end < now]
+        signatures = self._signatures(session, [periods[index] for index in finished])
+        signatures = dict(zip(finished, signatures))
+        pending = []
+
+        for index, (start, end) in enumerate(periods):
+            if index in signatures:
+                cached = self._cache.get((report_type, start, end))
+                if cached and cached[0] == signatures[index]:
+                    results[index] = cached[1]
+                    continue
+            pending.append(index)
+
+        if pending:
+            if report_type == 'VAT':
+                accounts = {
+                    account_id: code for account_id, code in session.query(Account.id, Account.code)
+                    .filter(Account.code.in_([self.VAT_OUTPUT_CODE, self.VAT_INPUT_CODE]))
+                }
+                totals = self.period_totals(session, [periods[i] for i in pending], account_ids=list(accounts))
+            else:
+                accounts = dict(
+                    session.query(Account.id, Account.type)
+                    .filter(Account.type.in_([AccountType.REVENUE, AccountType.EXPENSE]))
+                )
+                totals = self.period_totals(
+                    session, [periods[i] for i in pending],
+                    account_types=[AccountType.REVENUE, AccountType.EXPENSE]
+                )
+
+            for position, index in enumerate(pending):
+                start, end = periods[index]
+                if report_type == 'VAT':
+                    result = self._vat_result(totals[position], accounts)
+                else:
+                    result = self._corporate_tax_result(totals[position], accounts)
+                result.update({"period_start": start, "period_end": end})
+                results[index] = result
+
+                if index in signatures:
+                    self._cache[(report_type, start, end)] = (signatures[index], result)
+
+        return results
+
+    def period_totals(self, session: Session, periods: List[Period], account_ids: Optional[List[int]] = None,
+                      account_types: Optional[List[AccountType]] = None) -> List[Dict[int, Tuple[Decimal, Decimal]]]:
+        """
+        여러 기간의 계정과목별 차변/대변 합계를 그룹 쿼리 한 번으로 계산합니다.
+
+        모든 기간이 월 단위로 나누어떨어지면 월별 집계 테이블을, 그렇지 않으면 전표 라인을
+        기간 경계로 나눈 구간별로 집계한 뒤 기간마다 구간을 합산합니다. 기간이 겹쳐도 됩니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            periods (List[Period]): (시작일, 종료일) 목록 (종료일 포함)
+            account_ids (Optional[List[int]]): 대상 계정과목 ID 목록
+            account_types (Optional[List[AccountType]]): 대상 계정 유형 목록
+
+        Returns:
+            List[Dict[int, Tuple[Decimal, Decimal]]]: 기간 순서대로 계정과목 ID별 (차변 합계, 대변 합계)
+        """
+        results: List[Dict[int, List[Decimal]]] = [{} for _ in periods]
+        if not periods:
+            return []
+
+        if all(self._month_aligned(start, end) for start, end in periods):
+            # 월별 집계: 기간 = 월(YYYYMM) 범위
+            ranges = [
+                (self.period_balance_manager.period_of(start), self.period_balance_manager.period_of(end))
+                for start, end in periods
+            ]
+            bucket_column = AccountPeriodBalance.period
+            query = session.query(
+                AccountPeriodBalance.account_id,
+                bucket_column,
+                func.sum(AccountPeriodBalance.debit),
+                func.sum(AccountPeriodBalance.credit)
+            ).filter(
+                AccountPeriodBalance.period >= min(first for first, _ in ranges),
+                AccountPeriodBalance.period <= max(last for _, last in ranges)
+            )
+            account_column = AccountPeriodBalance.account_id
+
+            def in_period(bucket, index):
+                return ranges[index][0] <= bucket <= ranges[index][1]
+        else:
+            # 전표 라인: 모든 기간 경계로 나눈 겹치지 않는 구간별 집계
+            boundaries = sorted({point for start, end in periods
+                                 for point in (start, end + timedelta(microseconds=1))})
+            segments = list(zip(boundaries, boundaries[1:]))
+            bucket_column = case(
+                *[(and_(JournalEntry.entry_date >= lower, JournalEntry.entry_date < upper), number)
+                  for number, (lower, upper) in enumerate(segments)]
+            )
+            query = session.query(
+                JournalLine.account_id,
+                bucket_column,
+                func.sum(JournalLine.debit),
+                func.sum(JournalLine.credit)
+            ).join(JournalEntry).filter(
+                JournalEntry.entry_date >= boundaries[0],
+                JournalEntry.entry_date < boundaries[-1]
+            )
+            account_column = JournalLine.account_id
+            half_open = [(start, end + timedelta(microseconds=1)) for start, end in periods]
+
+            def in_period(bucket, index):
+                lower, upper = segments[bucket]
+                return half_open[index][0] <= lower and upper <= half_open[index][1]
+
+        if account_ids is not None:
+            query = query.filter(account_column.in_(account_ids))
+        if account_types is not None:
+            query = query.join(Account, Account.id == account_column).filter(Account.type.in_(account_types))
+
+        for account_id, bucket, debit, credit in query.group_by(account_column, bucket_column):
+            for index in range(len(periods)):
+                if in_period(bucket, index):
+                    total = results[index].setdefault(account_id, [Decimal(0), Decimal(0)])
+                    total[0] += debit or 0
+                    total[1] += credit or 0
+
+        return [{account_id: tuple(total) for account_id, total in result.items()} for result in results]
+
+    def clear_cache(self) -> None:
+        """캐시된 신고 금액을 모두 비웁니다."""
+        self._cache.clear()
+
+    def _month_aligned(self, start: datetime, end: datetime) -> bool:
+        """기간이 월 초에 시작해 월 말에 끝나는지 확인합니다."""
+        manager = self.period_balance_manager
+        return (start == manager.period_start(manager.period_of(start)) and
+                end + timedelta(microseconds=1) == manager.period_start(manager.next_period(manager.period_of(end))))
+
+    def _signatures(self, session: Session, periods: List[Period]) -> List[tuple]:
+        """
+        기간별 월별 집계와 계정과목의 변경 여부를 나타내는 서명
+        (집계 행 수, 집계 최종 갱신 일시, 계정과목 수, 계정과목 최종 갱신 일시)을 조회합니다.
+
+        소급 전표가 반영되면 해당 월 집계 행의 갱신 일시가, 계정과목의 유형·코드·사용 여부가
+        바뀌면 계정과목의 갱신 일시가 바뀌므로 캐시가 무효화됩니다.
+        """
+        if not periods:
+            return []
+
+        period_of = self.period_balance_manager.period_of
+        ranges = [(period_of(start), period_of(end)) for start, end in periods]
+        months = session.query(
+            AccountPeriodBalance.period,
+            func.count(AccountPeriodBalance.id),
+            func.max(AccountPeriodBalance.updated_at)
+        ).filter(
+            AccountPeriodBalance.period >= min(first for first, _ in ranges),
+            AccountPeriodBalance.period <= max(last for _, last in ranges)
+        ).group_by(AccountPeriodBalance.period).all()
+
+        # 계정 유형·코드에 따라 집계 대상이 정해지므로 계정과목 변경도 서명에 포함
+        account_count, accounts_updated_at = session.query(func.count(Account.id), func.max(Account.updated_at)).one()
+
+        signatures = []
+        for first, last in ranges:
+            covered = [(count, updated_at) for period, count, updated_at in months if first <= period <= last]
+            signatures.append((
+                sum(count for count, _ in covered),
+                max((updated_at for _, updated_at in covered if updated_at), default=None),
+                account_count,
+                accounts_updated_at
+            ))
+        return signatures
+
+    def _vat_result(self, totals: Dict[int, Tuple[Decimal, Decimal]], accounts: Dict[int, str]) -> dict:
+        """매출세액(예수금 대변 잔액)에서 매입세액(대급금 차변 잔액)을 뺀 납부세액을 계산합니다."""
+        output_tax = sum((credit - debit for account_id, (debit, credit) in totals.items()
+                          if accounts.get(account_id) == self.VAT_OUTPUT_CODE), Decimal(0))
+        input_tax = sum((debit - credit for account_id, (debit, credit) in totals.items()
+                         if accounts.get(account_id) == self.VAT_INPUT_CODE), Decimal(0))
+        return {
+            "output_tax": output_tax,
+            "input_tax": input_tax,
+            "total_amount": output_tax - input_tax
+        }
+
+    def _corporate_tax_result(self, totals: Dict[int, Tuple[Decimal, Decimal]],
+                              accounts: Dict[int, AccountType]) -> dict:
+        """수익 대변 잔액에서 비용 차변 잔액을 뺀 당기순이익(과세표준)을 계산합니다."""
+        total_revenue = sum((credit - debit for account_id, (debit, credit) in totals.items()
+                             if accounts.get(account_id) == AccountType.REVENUE), Decimal(0))
+        total_expense = sum((debit - credit for account_id, (debit, credit) in totals.items()
+                             if accounts.get(account_id) == AccountType.EXPENSE), Decimal(0))
+        return {
+            "total_revenue": total_revenue,
+            "total_expense": total_expense,
+            "total_amount": total_revenue - total_expense
+        }
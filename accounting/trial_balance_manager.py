@@ -0,0 +1,213 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+from sqlalchemy.orm import Session
+from sqlalchemy import BigInteger, func, case, type_coerce
+from database.models import Account, AccountPeriodBalance
+from database.money import from_minor
+from accounting.period_balance_manager import PeriodBalanceManager
+
+class TrialBalanceManager:
+    """월별 집계 테이블을 이용해 기간별 시산표를 계산하는 클래스"""
+
+    GRANULARITIES = ('month', 'quarter', 'year')
+
+    def __init__(self):
+        self.period_balance_manager = PeriodBalanceManager()
+
+    def generate_trial_balance(self, session: Session, start_date: datetime, end_date: datetime,
+                               granularity: str = 'month', rollup: bool = False,
+                               include_zero: bool = False) -> dict:
+        """
+        계정과목별 기초잔액, 기간별 차변/대변 합계, 기말잔액을 계산합니다.
+
+        금액은 월별 집계 테이블에서 그룹 쿼리 한 번으로 읽습니다. 시작 월 이전의
+        금액은 기초잔액 하나로 합쳐지고, 이후 월은 월별로 읽어 month/quarter/year
+        단위 열로 묶습니다. 기간은 start_date가 속한 달부터 end_date가 속한 달까지입니다.
+        잔액은 차변 - 대변 기준이며 금액은 Decimal로 반환합니다.
+
+        Args:
+            session (Session): 데이터베이스 세션
+            start_date (datetime): 시작일
+            end_date (datetime): 종료일
+            granularity (str): 열 단위 ('month', 'quarter', 'year')
+            rollup (bool): 상위 계정(parent_id)에 하위 계정 금액을 합산할지 여부
+            include_zero (bool): 잔액과 거래가 모두 없는 계정도 포함할지 여부
+
+        Returns:
+            dict: 기간 목록, 계정별 시산표 행, 기간별 합계
+        """
+        if granularity not in self.GRANULARITIES:
+            raise ValueError(f"지원하지 않는 기간 단위입니다: {granularity}")
+        if start_date > end_date:
+            raise ValueError("시작일이 종료일보다 늦습니다.")
+
+        first_period = self.period_balance_manager.period_of(start_date)
+        last_period = self.period_balance_manager.period_of(end_date)
+        labels, month_columns = self._build_columns(first_period, last_period, granularity)
+        column_count = len(labels)
+
+        accounts = session.query(
+            Account.id, Account.code, Account.name, Account.type, Account.parent_id
+        ).order_by(Account.code).all()
+        account_index = {account.id: index for index, account in enumerate(accounts)}
+
+        # 금액은 최소 단위 정수(int64)로 계산하여 합계가 정확하도록 유지
+        opening = np.zeros(len(accounts), dtype=np.int64)
+        debits = np.zeros((len(accounts), column_count), dtype=np.int64)
+        credits = np.zeros((len(accounts), column_count), dtype=np.int64)
+
+        # 시작 월 이전 기간은 0으로 묶어 기초잔액 한 행으로 집계
+        bucket = case((AccountPeriodBalance.period < first_period, 0), else_=AccountPeriodBalance.period)
+        rows = session.query(
+            AccountPeriodBalance.account_id,
+            bucket,
+            type_coerce(func.sum(AccountPeriodBalance.debit), BigInteger),
+            type_coerce(func.sum(AccountPeriodBalance.credit), BigInteger)
+        ).filter(AccountPeriodBalance.period <= last_period)\
+            .group_by(AccountPeriodBalance.account_id, bucket).all()
+
+        if rows:
+            data = np.array(
+                [(account_index[account_id], period, debit or 0, credit or 0)
+                 for account_id, period, debit, credit in rows if account_id in account_index],
+                dtype=np.int64
+            ).reshape(-1, 4)
+            rows_index = data[:, 0]
+            periods = data[:, 1]
+
+            is_opening = periods == 0
+            np.add.at(opening, rows_index[is_opening], data[is_opening, 2] - data[is_opening, 3])
+
+            in_range = ~is_opening
+            columns = np.array([month_columns[period] for period in periods[in_range]], dtype=np.int64)
+            np.add.at(debits, (rows_index[in_range], columns), data[in_range, 2])
+            np.add.at(credits, (rows_index[in_range], columns), data[in_range, 3])
+
+        depths = self._account_depths(accounts, account_index)
+        totals = self._column_totals(opening, debits, credits)
+
+        if rollup:
+            opening, debits, credits = self._rollup(accounts, account_index, depths, opening, debits, credits)
+
+        movement = np.cumsum(debits - credits, axis=1)
+        closing = opening[:, None] + movement
+        period_opening = closing - (debits - credits)
+
+        # 행렬을 한 번에 파이썬 정수로 변환한 뒤 Decimal 금액으로 바꿈
+        active = [
+            index for index in range(len(accounts))
+            if include_zero or opening[index] != 0 or debits[index].any() or credits[index].any()
+        ]
+        rows_opening = period_opening[active].tolist()
+        rows_debit = debits[active].tolist()
+        rows_credit = credits[active].tolist()
+        rows_closing = closing[active].tolist()
+
+        result_accounts = []
+        for position, index in enumerate(active):
+            account = accounts[index]
+            period_rows = zip(rows_opening[position], rows_debit[position],
+                              rows_credit[position], rows_closing[position])
+            result_accounts.append({
+                "account_id": account.id,
+                "code": account.code,
+                "name": account.name,
+                "type": account.type.value,
+                "parent_id": account.parent_id,
+                "level": int(depths[index]),
+                "opening_balance": from_minor(opening[index]),
+                "debit": from_minor(sum(rows_debit[position])),
+                "credit": from_minor(sum(rows_credit[position])),
+                "closing_balance": from_minor(rows_closing[position][-1]),
+                "periods": [
+                    {
+                        "opening_balance": from_minor(period_opening_value),
+                        "debit": from_minor(debit),
+                        "credit": from_minor(credit),
+                        "closing_balance": from_minor(closing_value)
+                    }
+                    for period_opening_value, debit, credit, closing_value in period_rows
+                ]
+            })
+
+        return {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            "granularity": granularity,
+            "rollup": rollup,
+            "periods": labels,
+            "accounts": result_accounts,
+            "totals": totals
+        }
+
+    def _build_columns(self, first_period: int, last_period: int, granularity: str):
+        """월(YYYYMM)별 열 번호와 열 이름 목록을 만듭니다."""
+        labels: List[str] = []
+        month_columns: Dict[int, int] = {}
+
+        period = first_period
+        while period <= last_period:
+            year, month = divmod(period, 100)
+            if granularity == 'month':
+                label = f"{year}-{month:02d}"
+            elif granularity == 'quarter':
+                label = f"{year}-Q{(month - 1) // 3 + 1}"
+            else:
+                label = str(year)
+
+            if not labels or labels[-1] != label:
+                labels.append(label)
+            month_columns[period] = len(labels) - 1
+            period = self.period_balance_manager.next_period(period)
+
+        return labels, month_columns
+
+    def _account_depths(self, accounts: list, account_index: Dict[int, int]) -> np.ndarray:
+        """계정과목 계층에서 각 계정의 깊이(최상위 = 0)를 계산합니다."""
+        depths = np.full(len(accounts), -1, dtype=np.int64)
+
+        for index in range(len(accounts)):
+            path = []
+            current: Optional[int] = index
+            while current is not None and depths[current] < 0 and current not in path:
+                path.append(current)
+                parent_id = accounts[current].parent_id
+                current = account_index.get(parent_id) if parent_id is not None else None
+
+            base = depths[current] + 1 if current is not None and depths[current] >= 0 else 0
+            for offset, node in enumerate(reversed(path)):
+                depths[node] = base + offset
+
+        return depths
+
+    def _rollup(self, accounts: list, account_index: Dict[int, int], depths: np.ndarray,
+                opening: np.ndarray, debits: np.ndarray, credits: np.ndarray):
+        """하위 계정 금액을 깊은 계층부터 차례로 상위 계정에 합산합니다."""
+        parents = np.array([
+            account_index.get(account.parent_id, -1) if account.parent_id is not None else -1
+            for account in accounts
+        ], dtype=np.int64)
+
+        opening, debits, credits = opening.copy(), debits.copy(), credits.copy()
+        for depth in range(int(depths.max(initial=0)), 0, -1):
+            children = np.nonzero((depths == depth) & (parents >= 0))[0]
+            np.add.at(opening, parents[children], opening[children])
+            np.add.at(debits, parents[children], debits[children])
+            np.add.at(credits, parents[children], credits[children])
+
+        return opening, debits, credits
+
+    def _column_totals(self, opening: np.ndarray, debits: np.ndarray, credits: np.ndarray) -> dict:
+        """상위 계정 합산 전 금액으로 기간별 합계를 계산합니다. (중복 합산 방지)"""
+        debit_totals = debits.sum(axis=0)
+        credit_totals = credits.sum(axis=0)
+        return {
+            "opening_balance": from_minor(opening.sum()),
+            "debit": from_minor(debit_totals.sum()),
+            "credit": from_minor(credit_totals.sum()),
+            "periods": [
+                {"debit": from_minor(debit), "credit": from_minor(credit)}
+                for debit, credit in zip(debit_totals, credit_totals)
+            ]
+        }
@@ -1,54 +1,201 @@
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
-from typing import List, Dict, Tuple
+from sklearn.preprocessing import StandardScaler
+from typing import List, Dict, Optional, Tuple
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from joblib import parallel_config
+from sqlalchemy import bindparam
 from sqlalchemy.orm import Session
 from ..database.models import Transaction
+from .compiled_forest import CompiledIsolationForest
+from .features import TransactionFeatureBuilder
+from .model_store import AnomalyModelStore
 
 class AnomalyDetector:
     """Isolation Forest를 사용한 이상 지출 탐지 클래스"""
     
-    def __init__(self, contamination: float = 0.1):
+    # 이 건수 이하의 평가는 트리를 펼친 CompiledIsolationForest로 계산 (호출 지연이 짧음)
+    COMPILED_SCORING_MAX_ROWS = 1024
+    
+    def __init__(self, contamination: float = 0.1, model_store: Optional[AnomalyModelStore] = None,
+                 window_days: int = 180, min_training_samples: int = 100,
+                 feature_builder: Optional[TransactionFeatureBuilder] = None, n_jobs: Optional[int] = None):
         """
         Args:
             contamination (float): 예상되는 이상치의 비율 (0.0 ~ 0.5)
+            model_store (Optional[AnomalyModelStore]): 학습된 모델 저장소 (기본: models/anomaly)
+            window_days (int): 학습에 사용할 최근 거래 기간(일)
+            min_training_samples (int): 학습에 필요한 최소 거래 수
+            feature_builder (Optional[TransactionFeatureBuilder]): 특성 계산기 (기본: 90일 기준)
+            n_jobs (Optional[int]): 모델 학습·평가에 사용할 스레드 수 (-1이면 전체 코어)
         """
+        self.contamination = contamination
         self.model = IsolationForest(
             contamination=contamination,
             random_state=42
         )
+        self.model_store = model_store or AnomalyModelStore()
+        self.window_days = window_days
+        self.min_training_samples = min_training_samples
+        self.feature_builder = feature_builder or TransactionFeatureBuilder()
+        self.n_jobs = n_jobs
         self.logger = logging.getLogger(__name__)
     
-    def prepare_features(self, transactions: List[Dict]) -> pd.DataFrame:
+    def prepare_features(self, transactions: List[Dict], update_state: bool = True) -> pd.DataFrame:
         """
         거래 데이터에서 특성을 추출합니다.
         
+        보관된 최근 거래를 기준으로 카테고리별·계약별 특성을 계산하고, 추출한 거래는
+        다음 배치의 기준이 되도록 보관합니다. (TransactionFeatureBuilder 참고)
+        
         Args:
             transactions (List[Dict]): 거래 내역 목록
+            update_state (bool): 추출한 거래를 다음 배치의 기준으로 보관할지 여부
             
         Returns:
             pd.DataFrame: 특성이 추출된 데이터프레임
         """
-        df = pd.DataFrame(transactions)
+        return self.feature_builder.transform(transactions, update_state)
+    
+    def _load_transactions(self, db_session: Session, start: datetime, end: datetime) -> pd.DataFrame:
+        """기간의 거래를 특성 계산에 필요한 컬럼만 읽습니다."""
+        rows = db_session.query(
+            Transaction.id,
+            Transaction.transaction_date,
+            Transaction.amount,
+            Transaction.category,
+            Transaction.contract_id
+        ).filter(
+            Transaction.transaction_date >= start,
+            Transaction.transaction_date <= end
+        ).all()
+        return pd.DataFrame(rows, columns=['id', 'transaction_date', 'amount', 'category', 'contract_id'])
+    
+    def warm_features(self, db_session: Session) -> None:
+        """특성 계산 기준이 비어 있으면 최근 거래를 데이터베이스에서 읽어 채웁니다."""
+        if self.feature_builder.is_warm:
+            return
+        end = datetime.utcnow()
+        start = end - timedelta(days=self.feature_builder.window_days)
+        self.feature_builder.reset(self._load_transactions(db_session, start, end))
+    
+    def fit_model(self, X: pd.DataFrame) -> dict:
+        """
+        특성 스케일러와 Isolation Forest를 학습하여 저장할 모델 묶음을 만듭니다.
         
-        # 시계열 특성 추출
-        df['transaction_date'] = pd.to_datetime(df['transaction_date'])
-        df['day_of_week'] = df['transaction_date'].dt.dayofweek
-        df['hour'] = df['transaction_date'].dt.hour
+        Args:
+            X (pd.DataFrame): prepare_features 결과
+            
+        Returns:
+            dict: {"model", "scaler", "features", "contamination", "n_samples"}
+        """
+        values = X.to_numpy(dtype=np.float64)
+        scaler = StandardScaler().fit(values)
+        model = IsolationForest(
+            contamination=self.contamination,
+            n_jobs=self.n_jobs,
+            random_state=42
+        ).fit(scaler.transform(values))
         
-        # 금액 관련 특성
-        df['amount_abs'] = df['amount'].abs()
+        return {
+            "model": model,
+            "scaler": scaler,
+            "features": list(X.columns),
+            "contamination": self.contamination,
+            "n_samples": len(values)
+        }
+    
+    def train(self, db_session: Session, as_of: Optional[datetime] = None) -> dict:
+        """
+        최근 window_days일의 거래로 모델을 학습하고 새 버전으로 저장합니다.
+        
+        Args:
+            db_session (Session): 데이터베이스 세션
+            as_of (Optional[datetime]): 학습 기준 시각 (기본: 현재)
+            
+        Returns:
+            dict: {"version", "n_samples", "window_start", "window_end"}
+        """
+        window_end = as_of or datetime.utcnow()
+        window_start = window_end - timedelta(days=self.window_days)
         
-        # 사용할 특성 선택
-        features = ['amount_abs', 'day_of_week', 'hour']
-        return df[features]
+        # 학습 구간 첫 거래도 직전 기간과 비교할 수 있도록 특성 계산 기간만큼 앞에서부터 읽음
+        transactions = self._load_transactions(
+            db_session, window_start - timedelta(days=self.feature_builder.window_days), window_end
+        )
+        in_window = (pd.to_datetime(transactions['transaction_date']) >= window_start).to_numpy()
+        n_samples = int(in_window.sum())
+        if n_samples < self.min_training_samples:
+            raise ValueError(f"학습할 거래가 부족합니다: {n_samples}건 (최소 {self.min_training_samples}건)")
+        
+        # 각 거래 이전 거래를 기준으로 특성 계산 후, 최근 거래를 평가 기준으로 보관
+        bundle = self.fit_model(self.feature_builder.build(transactions)[in_window])
+        self.feature_builder.reset(transactions)
+        bundle.update({
+            "trained_at": datetime.utcnow(),
+            "window_start": window_start,
+            "window_end": window_end
+        })
+        version = self.model_store.save(bundle)
+        self.logger.info(f"이상 탐지 모델 v{version} 학습 완료: {n_samples}건")
+        
+        return {
+            "version": version,
+            "n_samples": n_samples,
+            "window_start": window_start.isoformat(),
+            "window_end": window_end.isoformat()
+        }
+    
+    def score_only(self, transactions: List[Dict], version: Optional[int] = None,
+                   update_state: bool = True) -> Tuple[List[bool], List[float], int]:
+        """
+        저장된 모델로 거래를 평가합니다. (다시 학습하지 않음)
+        
+        같은 버전의 모델로 평가한 점수는 배치가 달라도 비교할 수 있습니다.
+        
+        Args:
+            transactions (List[Dict]): 거래 내역 목록 (또는 같은 컬럼의 DataFrame)
+            version (Optional[int]): 사용할 모델 버전 (기본: 현재 버전)
+            update_state (bool): 평가한 거래를 특성 계산 기준에 더할지 여부
+            
+        Returns:
+            Tuple[List[bool], List[float], int]: (이상치 여부 목록, 이상 점수 목록, 모델 버전)
+                점수가 낮을수록 이상치에 가깝습니다.
+        """
+        bundle = self.model_store.latest() if version is None else self.model_store.load(version)
+        if bundle is None:
+            if version is not None:
+                raise ValueError(f"이상 탐지 모델 v{version}이 없습니다.")
+            raise ValueError("학습된 이상 탐지 모델이 없습니다. train()을 먼저 실행하세요.")
+        if not len(transactions):
+            return [], [], bundle["version"]
+        
+        X = self.prepare_features(transactions, update_state)[bundle["features"]].to_numpy(dtype=np.float64)
+        model = bundle["model"]
+        X = bundle["scaler"].transform(X)
+        if len(X) <= self.COMPILED_SCORING_MAX_ROWS:
+            compiled = bundle.get("compiled")
+            if compiled is None:
+                # 불러온 모델 묶음에 한 번만 만들어 둠 (저장 파일에는 포함되지 않음)
+                compiled = bundle["compiled"] = CompiledIsolationForest(model)
+            scores = compiled.score_samples(X)
+        else:
+            with parallel_config(n_jobs=self.n_jobs):
+                scores = model.score_samples(X)
+        
+        # predict()와 같은 기준: 학습 시 정한 임계값(offset_)보다 낮으면 이상치
+        is_anomaly = scores < model.offset_
+        return is_anomaly.tolist(), scores.tolist(), bundle["version"]
     
     def detect_anomalies(self, transactions: List[Dict]) -> Tuple[List[bool], List[float]]:
         """
         거래 내역에서 이상 지출을 탐지합니다.
         
+        저장된 모델이 있으면 score_only로 평가하고, 없으면 전달된 거래로 모델을 학습하여
+        평가합니다. (이 경우 점수는 배치 안에서만 비교할 수 있습니다.)
+        
         Args:
             transactions (List[Dict]): 거래 내역 목록
             
@@ -59,6 +206,12 @@ class AnomalyDetector:
             if not transactions:
                 return [], []
             
+            if self.model_store.latest() is not None:
+                is_anomaly, scores, _ = self.score_only(transactions)
+                return is_anomaly, scores
+            
+            self.logger.warning("학습된 이상 탐지 모델이 없어 현재 배치로 학습합니다.")
+            
             # 특성 추출
             X = self.prepare_features(transactions)
             
@@ -77,20 +230,39 @@ class AnomalyDetector:
             raise
     
     def update_transaction_anomalies(self, db_session: Session, transaction_ids: List[int], 
-                                   is_anomaly: List[bool]) -> None:
+                                   is_anomaly: List[bool], scores: Optional[List[float]] = None,
+                                   model_version: Optional[int] = None) -> None:
         """
         탐지된 이상치 정보를 데이터베이스에 업데이트합니다.
         
+        거래를 하나씩 조회하지 않고 기본 키 기준 UPDATE 한 문장을 일괄 실행(executemany)합니다.
+        
         Args:
             db_session (Session): 데이터베이스 세션
             transaction_ids (List[int]): 거래 ID 목록
             is_anomaly (List[bool]): 이상치 여부 목록
+            scores (Optional[List[float]]): 이상 점수 목록 (없으면 점수와 모델 버전은 그대로 둠)
+            model_version (Optional[int]): 평가에 사용한 모델 버전 (배치 학습이면 None)
         """
+        if not transaction_ids:
+            return
+        
+        table = Transaction.__table__
+        values = {'is_anomaly': bindparam('flag')}
+        if scores is not None:
+            values.update(anomaly_score=bindparam('score'), anomaly_model_version=bindparam('version'))
+        statement = table.update().where(table.c.id == bindparam('transaction_id')).values(**values)
+        
+        rows = [
+            {'transaction_id': int(trans_id), 'flag': bool(anomaly)}
+            for trans_id, anomaly in zip(transaction_ids, is_anomaly)
+        ]
+        if scores is not None:
+            for row, score in zip(rows, scores):
+                row.update(score=float(score), version=model_version)
+        
         try:
-            for trans_id, anomaly in zip(transaction_ids, is_anomaly):
-                transaction = db_session.query(Transaction).get(trans_id)
-                if transaction:
-                    transaction.is_anomaly = anomaly
+            db_session.execute(statement, rows)
             db_session.commit()
         except Exception as e:
             db_session.rollback()
@@ -0,0 +1,243 @@
+"""
+전체 거래를 여러 프로세스로 나누어 이상 탐지 모델로 다시 평가하는 일괄 평가 도구 (야간 작업용)
+
+거래 기간을 프로세스 수만큼 거래 수가 비슷한 연속 구간으로 나누고, 각 프로세스는 자기
+구간 직전 특성 기간(기본 90일)의 거래로 특성 계산 기준을 한 번 채운 뒤 구간의 거래를
+일정 건수씩 시간순으로 읽어 평가하고 결과(여부, 점수, 모델 버전)를 일괄 업데이트합니다.
+모든 프로세스는 시작 시점의 같은 모델 버전을 사용합니다.
+
+사용 예:
+    python -m AllOneFlow.anomaly_detection.batch_scoring --processes 16
+    python -m AllOneFlow.anomaly_detection.batch_scoring --url postgresql+psycopg2://user:pw@host/aof \\
+        --start 2024-01-01 --end 2025-01-01
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+import pandas as pd
+from sqlalchemy import create_engine, func, tuple_
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from ..database.models import Transaction
+from .anomaly_detector import AnomalyDetector
+from .model_store import AnomalyModelStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = 'sqlite:///alloneflow.db'
+
+Progress = Callable[[int, int, int], None]
+
+# 작업 프로세스 → 부모 프로세스 진행 상황 전달용 (작업 프로세스 초기화 시 설정)
+_progress_queue = None
+
+def _create_engine(url: str) -> Engine:
+    """여러 프로세스가 동시에 쓰는 SQLite는 잠금이 풀릴 때까지 기다리도록 엔진을 만듭니다."""
+    if url.startswith('sqlite'):
+        return create_engine(url, connect_args={'timeout': 60})
+    return create_engine(url)
+
+def _init_worker(progress_queue) -> None:
+    global _progress_queue
+    _progress_queue = progress_queue
+    logging.basicConfig(level=logging.INFO)
+
+def _load_chunk(session: Session, start: datetime, end: datetime,
+                after: Optional[Tuple[datetime, int]], limit: int) -> pd.DataFrame:
+    """[start, end) 구간의 거래 중 (거래 일시, ID) 순서로 after 다음 거래를 limit건 읽습니다."""
+    query = session.query(
+        Transaction.id,
+        Transaction.transaction_date,
+        Transaction.amount,
+        Transaction.category,
+        Transaction.contract_id
+    ).filter(Transaction.transaction_date >= start, Transaction.transaction_date < end)
+    if after is not None:
+        query = query.filter(tuple_(Transaction.transaction_date, Transaction.id) > tuple_(*after))
+    rows = query.order_by(Transaction.transaction_date, Transaction.id).limit(limit).all()
+    return pd.DataFrame(rows, columns=['id', 'transaction_date', 'amount', 'category', 'contract_id'])
+
+def score_range(url: str, model_directory: str, version: int, start: datetime, end: datetime,
+                chunk_size: int = 20000) -> Tuple[int, int]:
+    """
+    [start, end) 구간의 거래를 시간순으로 chunk_size건씩 평가하고 결과를 저장합니다. (작업 프로세스에서 실행)
+
+    Returns:
+        Tuple[int, int]: (평가한 거래 수, 이상 거래 수)
+    """
+    engine = _create_engine(url)
+    Session = sessionmaker(bind=engine)
+    # 프로세스 단위로 병렬 처리하므로 모델 평가는 프로세스 안에서 단일 스레드로 실행
+    detector = AnomalyDetector(model_store=AnomalyModelStore(model_directory), n_jobs=1)
+    builder = detector.feature_builder
+    scored = anomalies = 0
+
+    session = Session()
+    try:
+        builder.reset(detector._load_transactions(
+            session, start - timedelta(days=builder.window_days), start - timedelta(microseconds=1)
+        ))
+        after = None
+        while True:
+            chunk = _load_chunk(session, start, end, after, chunk_size)
+            if chunk.empty:
+                break
+            after = (chunk['transaction_date'].iloc[-1].to_pydatetime(), int(chunk['id'].iloc[-1]))
+
+            is_anomaly, scores, _ = detector.score_only(chunk, version=version)
+            detector.update_transaction_anomalies(session, chunk['id'].tolist(), is_anomaly, scores, version)
+
+            scored += len(chunk)
+            anomalies += sum(is_anomaly)
+            if _progress_queue is not None:
+                _progress_queue.put((len(chunk), sum(is_anomaly)))
+    finally:
+        session.close()
+        engine.dispose()
+
+    return scored, anomalies
+
+class BatchAnomalyScorer:
+    """
+    거래 테이블 전체(또는 기간)를 여러 프로세스로 나누어 이상 탐지 모델로 평가하는 클래스
+    """
+
+    def __init__(self, url: str = DEFAULT_DATABASE_URL, model_store: Optional[AnomalyModelStore] = None,
+                 processes: Optional[int] = None, chunk_size: int = 20000):
+        """
+        Args:
+            url (str): 데이터베이스 URL
+            model_store (Optional[AnomalyModelStore]): 학습된 모델 저장소 (기본: models/anomaly)
+            processes (Optional[int]): 작업 프로세스 수 (기본: CPU 코어 수)
+            chunk_size (int): 한 번에 읽어 평가·저장할 거래 수
+        """
+        self.url = url
+        self.model_store = model_store or AnomalyModelStore()
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def plan(self, session: Session, start: Optional[datetime] = None,
+             end: Optional[datetime] = None) -> Tuple[List[Tuple[datetime, datetime]], int]:
+        """
+        일별 거래 수를 기준으로 거래 수가 비슷한 연속 구간을 최대 processes개 만듭니다.
+
+        Returns:
+            Tuple[List[Tuple[datetime, datetime]], int]: ([시작, 끝) 구간 목록, 전체 거래 수)
+        """
+        day = func.date(Transaction.transaction_date)
+        query = session.query(day, func.count(Transaction.id))
+        if start is not None:
+            query = query.filter(Transaction.transaction_date >= start)
+        if end is not None:
+            query = query.filter(Transaction.transaction_date < end)
+        counts = [(pd.Timestamp(d).to_pydatetime(), n) for d, n in query.group_by(day).order_by(day).all()]
+
+        total = sum(n for _, n in counts)
+        if not total:
+            return [], 0
+
+        boundaries, running = [], 0
+        for index, (day_start, n) in enumerate(counts[:-1]):
+            running += n
+            if running >= total * (len(boundaries) + 1) / self.processes:
+                boundaries.append(counts[index + 1][0])
+
+        first = start or counts[0][0]
+        last = end or counts[-1][0] + timedelta(days=1)
+        edges = [first] + [max(first, min(b, last)) for b in boundaries] + [last]
+        ranges = [(a, b) for a, b in zip(edges, edges[1:]) if a < b]
+        return ranges, total
+
+    def run(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+            progress: Optional[Progress] = None) -> dict:
+        """
+        기간의 거래를 평가하고 결과를 저장합니다.
+
+        Args:
+            start (Optional[datetime]): 평가 시작 일시 (기본: 첫 거래)
+            end (Optional[datetime]): 평가 종료 일시(미포함) (기본: 마지막 거래)
+            progress (Optional[Progress]): progress(평가한 거래 수, 전체 거래 수, 이상 거래 수) 콜백
+
+        Returns:
+            dict: {"model_version", "processes", "scored", "anomalies", "elapsed_seconds"}
+        """
+        version = self.model_store.latest_version()
+        if version is None:
+            raise ValueError("학습된 이상 탐지 모델이 없습니다. 먼저 모델을 학습하세요.")
+
+        engine = _create_engine(self.url)
+        session = sessionmaker(bind=engine)()
+        try:
+            ranges, total = self.plan(session, start, end)
+        finally:
+            session.close()
+            engine.dispose()
+
+        started = time.monotonic()
+        scored = anomalies = 0
+        if ranges:
+            context = multiprocessing.get_context('spawn')
+            progress_queue = context.Queue()
+            with ProcessPoolExecutor(max_workers=len(ranges), mp_context=context,
+                                     initializer=_init_worker, initargs=(progress_queue,)) as executor:
+                futures = [
+                    executor.submit(score_range, self.url, self.model_store.directory, version,
+                                    range_start, range_end, self.chunk_size)
+                    for range_start, range_end in ranges
+                ]
+                while not all(future.done() for future in futures) or not progress_queue.empty():
+                    try:
+                        count, flagged = progress_queue.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                    scored += count
+                    anomalies += flagged
+                    if progress is not None:
+                        progress(scored, total, anomalies)
+                # 작업 프로세스 오류는 여기서 다시 발생
+                for future in futures:
+                    future.result()
+
+        return {
+            "model_version": version,
+            "processes": len(ranges),
+            "scored": scored,
+            "anomalies": anomalies,
+            "elapsed_seconds": round(time.monotonic() - started, 3)
+        }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="거래 전체 이상 탐지 일괄 평가")
+    parser.add_argument('--url', default=os.environ.get('ALLONEFLOW_DATABASE_URL', DEFAULT_DATABASE_URL),
+                        help="데이터베이스 URL (기본: ALLONEFLOW_DATABASE_URL 또는 sqlite:///alloneflow.db)")
+    parser.add_argument('--model-dir', help="모델 저장 디렉터리 (기본: ALLONEFLOW_MODEL_DIR 또는 models/anomaly)")
+    parser.add_argument('--processes', type=int, help="작업 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--chunk-size', type=int, default=20000, help="한 번에 평가·저장할 거래 수")
+    parser.add_argument('--start', type=datetime.fromisoformat, help="평가 시작 일시 (예: 2024-01-01)")
+    parser.add_argument('--end', type=datetime.fromisoformat, help="평가 종료 일시(미포함)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    scorer = BatchAnomalyScorer(args.url, AnomalyModelStore(args.model_dir), args.processes, args.chunk_size)
+    reported = [0.0]
+
+    def report(scored: int, total: int, anomalies: int) -> None:
+        now = time.monotonic()
+        if now - reported[0] >= 1 or scored >= total:
+            reported[0] = now
+            logger.info(f"이상 탐지 일괄 평가: {scored}/{total}건 ({scored / total:.1%}), 이상 {anomalies}건")
+
+    summary = scorer.run(args.start, args.end, report)
+    logger.info(
+        f"이상 탐지 일괄 평가 완료: 모델 v{summary['model_version']}, {summary['scored']}건 중 "
+        f"이상 {summary['anomalies']}건, {summary['processes']}개 프로세스, {summary['elapsed_seconds']}초"
+    )
+
+if __name__ == '__main__':
+    main()
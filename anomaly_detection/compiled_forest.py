@@ -0,0 +1,83 @@
+import numpy as np
+from sklearn.ensemble import IsolationForest
+
+EULER_GAMMA = 0.5772156649015329
+
+def average_path_length(n_samples: np.ndarray) -> np.ndarray:
+    """샘플 n개인 이진 탐색 트리에서 실패 탐색의 평균 경로 길이 c(n) (Isolation Forest 논문 식)"""
+    n = np.asarray(n_samples, dtype=np.float64)
+    result = np.zeros_like(n)
+    result[n == 2] = 1.0
+    large = n > 2
+    result[large] = 2.0 * (np.log(n[large] - 1.0) + EULER_GAMMA) - 2.0 * (n[large] - 1.0) / n[large]
+    return result
+
+class CompiledIsolationForest:
+    """
+    학습된 IsolationForest의 트리들을 하나의 노드 배열로 펼쳐 모든 트리를 numpy 연산으로
+    한꺼번에 따라 내려가며 점수를 계산하는 클래스
+
+    score_samples()는 IsolationForest.score_samples()와 같은 값을 반환하지만 트리마다
+    함수를 호출하지 않으므로 건수가 적은 평가(저장 시점 평가 등)에서 지연 시간이 짧습니다.
+    """
+
+    # 한 번에 처리할 행 수 (트리 수 × 행 수 크기의 중간 배열 메모리 제한)
+    CHUNK_ROWS = 4096
+
+    def __init__(self, model: IsolationForest):
+        features, thresholds, lefts, rights, leaf_depths, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+
+        for tree, tree_features in zip(model.estimators_, model.estimators_features_):
+            # 일부 특성만으로 학습한 트리는 트리의 특성 번호를 원래 열 번호로 바꿈
+            subsample = model.bootstrap_features or len(tree_features) != model.n_features_in_
+            nodes = tree.tree_
+            left, right = nodes.children_left, nodes.children_right
+            is_leaf = left == -1
+
+            # 루트 깊이 1 (IsolationForest와 같은 기준)
+            depth = np.ones(nodes.node_count, dtype=np.int64)
+            for node in range(nodes.node_count):
+                if not is_leaf[node]:
+                    depth[left[node]] = depth[right[node]] = depth[node] + 1
+            max_depth = max(max_depth, int(depth.max()) - 1)
+
+            feature = np.where(is_leaf, 0, nodes.feature)
+            if subsample:
+                feature = np.asarray(tree_features)[feature]
+            index = np.arange(nodes.node_count)
+
+            roots.append(offset)
+            features.append(feature)
+            thresholds.append(np.where(is_leaf, np.inf, nodes.threshold))
+            # 잎 노드는 자기 자신을 가리켜 더 내려가지 않음
+            lefts.append(np.where(is_leaf, index, left) + offset)
+            rights.append(np.where(is_leaf, index, right) + offset)
+            leaf_depths.append(depth + average_path_length(nodes.n_node_samples) - 1.0)
+            offset += nodes.node_count
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.leaf_depth = np.concatenate(leaf_depths)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.max_depth = max_depth
+        self.offset_ = model.offset_
+        self.denominator = len(model.estimators_) * average_path_length([model.max_samples_])[0]
+
+    def score_samples(self, X: np.ndarray) -> np.ndarray:
+        """IsolationForest.score_samples()와 같은 이상 점수 (낮을수록 이상치에 가까움)"""
+        # 트리와 같은 기준으로 비교하도록 float32로 변환
+        X = np.asarray(X, dtype=np.float32)
+        scores = np.empty(len(X))
+        for start in range(0, len(X), self.CHUNK_ROWS):
+            chunk = X[start:start + self.CHUNK_ROWS]
+            rows = np.arange(len(chunk))
+            node = np.repeat(self.roots[:, None], len(chunk), axis=1)
+            for _ in range(self.max_depth):
+                go_left = chunk[rows, self.feature[node]] <= self.threshold[node]
+                node = np.where(go_left, self.left[node], self.right[node])
+            depths = self.leaf_depth[node].sum(axis=0)
+            scores[start:start + len(chunk)] = -2.0 ** (-depths / self.denominator)
+        return scores
@@ -0,0 +1,531 @@
+import bisect
+import math
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+import numpy as np
+import pandas as pd
+
+# 직전 거래가 없음을 나타내는 밀리초 시각
+NO_TIME = np.iinfo(np.int64).min
+MILLIS_PER_DAY = 86400000
+
+class _SortedAmounts:
+    """
+    일정 크기 블록으로 나눈 금액 정렬 목록
+
+    추가·삭제는 블록 하나 안에서만 자리를 옮기므로 전체 건수가 많은 그룹에서도 빠르고,
+    순위 조회(중앙값)는 블록 수만큼만 훑습니다.
+    """
+
+    BLOCK_SIZE = 512
+
+    def __init__(self):
+        self._blocks: List[List[float]] = []
+        self._maxes: List[float] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def update(self, values: List[float]) -> None:
+        """금액 여러 개를 추가합니다. (보관된 건수보다 많으면 한 번에 다시 정렬)"""
+        if len(values) < self._size:
+            for value in values:
+                self.add(value)
+            return
+        merged = sorted([value for block in self._blocks for value in block] + values)
+        self._blocks = [merged[i:i + self.BLOCK_SIZE] for i in range(0, len(merged), self.BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._size = len(merged)
+
+    def add(self, value: float) -> None:
+        if not self._blocks:
+            self._blocks.append([value])
+            self._maxes.append(value)
+        else:
+            index = min(bisect.bisect_left(self._maxes, value), len(self._blocks) - 1)
+            block = self._blocks[index]
+            bisect.insort(block, value)
+            self._maxes[index] = block[-1]
+            if len(block) > 2 * self.BLOCK_SIZE:
+                self._blocks[index:index + 1] = [block[:self.BLOCK_SIZE], block[self.BLOCK_SIZE:]]
+                self._maxes[index:index + 1] = [block[self.BLOCK_SIZE - 1], block[-1]]
+        self._size += 1
+
+    def remove(self, value: float) -> None:
+        index = bisect.bisect_left(self._maxes, value)
+        block = self._blocks[index]
+        del block[bisect.bisect_left(block, value)]
+        if block:
+            self._maxes[index] = block[-1]
+        else:
+            del self._blocks[index], self._maxes[index]
+        self._size -= 1
+
+    def __getitem__(self, index: int) -> float:
+        for block in self._blocks:
+            if index < len(block):
+                return block[index]
+            index -= len(block)
+        raise IndexError(index)
+
+    def median(self) -> float:
+        middle = self._size // 2
+        if self._size % 2:
+            return self[middle]
+        return (self[middle - 1] + self[middle]) / 2
+
+class _GroupWindow:
+    """
+    그룹(카테고리 또는 계약) 하나의 보관 기간 거래
+
+    시각순 배열(밀리초, 금액, ID)은 앞쪽 시작 위치만 옮겨 오래된 거래를 버리고, 금액 정렬 목록과
+    최소 단위(1/100) 정수 합계·제곱합으로 중앙값과 표본 표준편차를 바로 계산합니다.
+    """
+
+    def __init__(self):
+        self._times = np.empty(16, dtype=np.int64)
+        self._amounts = np.empty(16, dtype=np.float64)
+        self._ids = np.empty(16, dtype=object)
+        self._start = self._end = 0
+        self._sorted = _SortedAmounts()
+        self._total = 0
+        self._total_sq = 0
+        self._stats: Optional[Tuple[float, float]] = None
+        self.last: Optional[int] = None
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    @property
+    def times(self) -> np.ndarray:
+        """보관된 거래 시각 (밀리초, 오름차순)"""
+        return self._times[self._start:self._end]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[self._start:self._end]
+
+    def _store(self, times: np.ndarray, amounts: np.ndarray, ids: np.ndarray, reserve: int = 0) -> None:
+        """보관 배열을 여유 공간을 두고 새로 만듭니다."""
+        size = len(times)
+        capacity = max(16, 2 * (size + reserve))
+        self._times = np.empty(capacity, dtype=np.int64)
+        self._amounts = np.empty(capacity, dtype=np.float64)
+        self._ids = np.empty(capacity, dtype=object)
+        self._times[:size], self._amounts[:size], self._ids[:size] = times, amounts, ids
+        self._start, self._end = 0, size
+
+    def add(self, times: np.ndarray, amounts: np.ndarray, ids: np.ndarray) -> None:
+        """시각순으로 정렬된 거래를 추가합니다."""
+        minor = np.rint(amounts * 100).astype(np.int64).tolist()
+        self._total += sum(minor)
+        self._total_sq += sum(value * value for value in minor)
+        self._sorted.update(amounts.tolist())
+        newest = int(times.max())
+        self.last = newest if self.last is None else max(self.last, newest)
+        self._stats = None
+
+        count = len(times)
+        if self._end + count > len(self._times):
+            live = slice(self._start, self._end)
+            self._store(self._times[live], self._amounts[live], self._ids[live], reserve=count)
+        # 늦게 도착한 거래가 있으면 들어갈 첫 위치 뒤쪽만 합쳐서 다시 정렬 (같은 시각은 보관된 거래가 앞)
+        first = self._start + int(np.searchsorted(self.times, times[0], 'right'))
+        tail = slice(first, self._end)
+        end = self._end + count
+        if first < self._end:
+            merged = np.concatenate([self._times[tail], times])
+            order = np.argsort(merged, kind='stable')
+            amounts = np.concatenate([self._amounts[tail], amounts])[order]
+            ids = np.concatenate([self._ids[tail], ids])[order]
+            times = merged[order]
+        self._times[first:end], self._amounts[first:end], self._ids[first:end] = times, amounts, ids
+        self._end = end
+
+    def remove(self, time: int, transaction_id: Hashable) -> None:
+        """시각이 time인 거래 중 ID가 같은 거래를 뺍니다."""
+        times = self.times
+        for position in range(np.searchsorted(times, time, 'left'), np.searchsorted(times, time, 'right')):
+            if self._ids[self._start + position] == transaction_id:
+                self._discard(self._amounts[self._start + position])
+                keep = np.ones(len(self), dtype=bool)
+                keep[position] = False
+                live = slice(self._start, self._end)
+                self._store(self._times[live][keep], self._amounts[live][keep], self._ids[live][keep])
+                return
+
+    def trim(self, cutoff: int) -> List:
+        """cutoff 이전 거래를 버리고 버린 거래의 ID 목록을 반환합니다."""
+        count = int(np.searchsorted(self.times, cutoff, 'left'))
+        if not count:
+            return []
+        removed = slice(self._start, self._start + count)
+        for value in self._amounts[removed].tolist():
+            self._discard(value)
+        ids = self._ids[removed].tolist()
+        self._ids[removed] = None
+        self._start += count
+        if self._start > len(self):
+            live = slice(self._start, self._end)
+            self._store(self._times[live], self._amounts[live], self._ids[live])
+        return ids
+
+    def _discard(self, value: float) -> None:
+        minor = round(value * 100)
+        self._total -= minor
+        self._total_sq -= minor * minor
+        self._sorted.remove(value)
+        self._stats = None
+
+    def stats(self) -> Tuple[float, float]:
+        """금액 중앙값과 표본 표준편차 (거래가 없으면 NaN, 1건이면 표준편차 NaN)"""
+        if self._stats is None:
+            n = len(self)
+            median = self._sorted.median() if n else np.nan
+            std = math.sqrt((n * self._total_sq - self._total ** 2) / (n * (n - 1))) / 100 if n > 1 else np.nan
+            self._stats = (median, std)
+        return self._stats
+
+class TransactionFeatureBuilder:
+    """
+    거래 데이터에서 이상 탐지 특성을 벡터 연산으로 계산하는 클래스
+
+    기본 특성(금액, 요일, 시간)에 더해 카테고리별·계약별로 직전 window_days일 거래와
+    비교한 특성(중앙값 대비 z-점수, 최근 frequency_days일 거래 수, 직전 거래 후 경과 시간)과
+    딱 떨어지는 금액 여부를 계산합니다. 각 거래는 자신보다 이전 거래만 기준으로 삼습니다.
+
+    build()는 주어진 거래 안에서 거래마다 정확한 이동 구간으로 계산합니다. (학습용)
+    transform()은 그룹마다 최근 window_days일 거래를 시각순 배열로, 금액을 정렬 목록과
+    합계로 보관해 두고, 새 배치를 그룹별 이진 탐색과 보관된 중앙값·표준편차로 계산한 뒤
+    상태에 추가합니다. 추가할 때는 배치가 닿은 그룹에서만 오래된 거래를 버리고 기준값을
+    갱신하며, 보관 건수만큼 추가될 때마다 전체 그룹을 한 번 정리합니다. 배치 하나가
+    걸치는 기간은 짧으므로 z-점수는 상태 시점의 기준값을 사용하며, 계산량은 보관된
+    거래 수와 관계없이 배치 크기에 비례합니다.
+    """
+
+    BASE_FEATURES = ['amount_abs', 'day_of_week', 'hour']
+    GROUP_FEATURES = ['amount_z', 'count_recent', 'hours_since_last']
+    GROUP_KEYS = {'category': 'category_key', 'contract': 'contract_key'}
+    ROUND_UNITS = (1000, 10000)
+    # 전체 그룹 정리 주기의 최소 추가 건수
+    SWEEP_MIN_ROWS = 1000
+
+    def __init__(self, window_days: int = 90, frequency_days: int = 7):
+        """
+        Args:
+            window_days (int): 중앙값·표준편차를 계산할 직전 기간(일)이자 상태 보관 기간
+            frequency_days (int): 거래 수를 셀 직전 기간(일)
+        """
+        self.window_days = window_days
+        self.frequency_days = frequency_days
+        self._lock = threading.Lock()
+        # 그룹 키 컬럼 → 그룹 값 → 보관 구간 (계약 없는 거래는 보관하지 않음)
+        self._windows: Optional[Dict[str, Dict[Hashable, _GroupWindow]]] = None
+        # 거래 ID → (카테고리, 계약, 시각) (다시 추가·평가하는 거래를 찾기 위함)
+        self._entries: Dict[Hashable, Tuple[Hashable, int, int]] = {}
+        self._latest: Optional[int] = None
+        # 마지막 전체 정리 이후 추가 건수와 그때의 보관 건수
+        self._since_sweep = 0
+        self._swept_size = 0
+
+    @property
+    def feature_names(self) -> List[str]:
+        """build()가 반환하는 특성 컬럼 목록"""
+        return (
+            self.BASE_FEATURES
+            + [f'{prefix}_{name}' for prefix in self.GROUP_KEYS for name in self.GROUP_FEATURES]
+            + [f'is_round_{unit}' for unit in self.ROUND_UNITS]
+        )
+
+    @property
+    def is_warm(self) -> bool:
+        """최근 거래 상태가 채워져 있는지 여부"""
+        return self._windows is not None
+
+    @staticmethod
+    def normalize(transactions: Union[pd.DataFrame, List[Dict]]) -> pd.DataFrame:
+        """거래 목록을 특성 계산에 필요한 컬럼(id, 일시, 금액, 그룹 키)으로 정리합니다."""
+        df = pd.DataFrame(transactions)
+        index = pd.RangeIndex(len(df))
+        amount = pd.to_numeric(df['amount'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        return pd.DataFrame({
+            'id': df['id'].to_numpy() if 'id' in df else np.full(len(df), np.nan),
+            'transaction_date': pd.to_datetime(df['transaction_date']).to_numpy(),
+            'amount_abs': np.abs(amount),
+            'category_key': (df['category'].fillna('').astype(str).to_numpy()
+                             if 'category' in df else np.full(len(df), '')),
+            'contract_key': (pd.to_numeric(df['contract_id'], errors='coerce').fillna(-1).astype(np.int64).to_numpy()
+                             if 'contract_id' in df else np.full(len(df), -1, dtype=np.int64))
+        }, index=index)
+
+    def _group_features(self, frame: pd.DataFrame, key: str) -> pd.DataFrame:
+        """key 그룹 안에서 각 거래 이전 거래와 비교한 특성을 계산합니다. (frame과 같은 인덱스)"""
+        ordered = frame.sort_values([key, 'transaction_date'], kind='stable')
+        grouped = ordered.groupby(key, sort=True)
+
+        window = grouped.rolling(f'{self.window_days}D', on='transaction_date', closed='left')['amount_abs']
+        median = window.median().to_numpy()
+        std = window.std().to_numpy()
+        count = grouped.rolling(f'{self.frequency_days}D', on='transaction_date', closed='left')['amount_abs']\
+            .count().to_numpy()
+        previous = grouped['transaction_date'].shift()
+
+        amount = ordered['amount_abs'].to_numpy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (amount - median) / np.where(std > 0, std, np.nan)
+        hours = (ordered['transaction_date'] - previous).dt.total_seconds().to_numpy() / 3600
+
+        result = pd.DataFrame({
+            'amount_z': np.clip(np.nan_to_num(z, nan=0.0), -50, 50),
+            'count_recent': np.nan_to_num(count, nan=0.0),
+            'hours_since_last': np.nan_to_num(hours, nan=self.window_days * 24.0)
+        }, index=ordered.index)
+        return result.reindex(frame.index)
+
+    def build(self, transactions: Union[pd.DataFrame, List[Dict]]) -> pd.DataFrame:
+        """
+        거래의 특성을 주어진 거래 안에서 계산합니다. (각 거래 이전 거래만 기준)
+
+        Args:
+            transactions (Union[pd.DataFrame, List[Dict]]): 거래 목록
+                (transaction_date, amount 필수, id, category, contract_id 선택)
+
+        Returns:
+            pd.DataFrame: 입력 순서대로 feature_names 컬럼을 가진 특성
+        """
+        return self._build(self.normalize(transactions))
+
+    def _build(self, frame: pd.DataFrame) -> pd.DataFrame:
+        groups = {prefix: self._group_features(frame, key) for prefix, key in self.GROUP_KEYS.items()}
+        return self._assemble(frame, groups)
+
+    def _assemble(self, frame: pd.DataFrame, groups: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """기본 특성, 그룹 특성, 금액 단위 특성을 feature_names 순서로 합칩니다."""
+        dates = pd.DatetimeIndex(frame['transaction_date'])
+        amount = frame['amount_abs'].to_numpy()
+        columns = {
+            'amount_abs': amount,
+            'day_of_week': dates.dayofweek.to_numpy(),
+            'hour': dates.hour.to_numpy()
+        }
+
+        no_contract = frame['contract_key'].to_numpy() < 0
+        defaults = {'amount_z': 0.0, 'count_recent': 0.0, 'hours_since_last': self.window_days * 24.0}
+        for prefix, group in groups.items():
+            for name in self.GROUP_FEATURES:
+                values = group[name].to_numpy()
+                if prefix == 'contract':
+                    # 계약이 없는 거래끼리는 비교하지 않음
+                    values = np.where(no_contract, defaults[name], values)
+                columns[f'{prefix}_{name}'] = values
+
+        for unit in self.ROUND_UNITS:
+            columns[f'is_round_{unit}'] = ((amount > 0) & (np.mod(amount, unit) == 0)).astype(np.int8)
+
+        return pd.DataFrame({name: columns[name] for name in self.feature_names}, index=frame.index)
+
+    def transform(self, transactions: Union[pd.DataFrame, List[Dict]], update_state: bool = True) -> pd.DataFrame:
+        """
+        보관된 상태를 기준으로 새 거래의 특성을 계산하고 상태에 새 거래를 추가합니다.
+
+        상태가 비어 있으면 build()와 같습니다.
+
+        Args:
+            transactions (Union[pd.DataFrame, List[Dict]]): 새 거래 목록
+            update_state (bool): 계산 후 새 거래를 상태에 추가할지 여부
+
+        Returns:
+            pd.DataFrame: 입력 순서대로 feature_names 컬럼을 가진 특성
+        """
+        frame = self.normalize(transactions)
+        groups = None
+        with self._lock:
+            if self._windows and self._windows.get('category_key') and len(frame):
+                # 다시 평가하는 거래는 최근 거래 수·직전 거래 기준에서 제외
+                known = set(frame['id'].dropna().tolist())
+                millis = frame['transaction_date'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+                groups = {
+                    prefix: self._window_features(frame, key, millis, known)
+                    for prefix, key in self.GROUP_KEYS.items()
+                }
+
+        features = self._build(frame) if groups is None else self._assemble(frame, groups)
+        if update_state:
+            self._append(frame)
+        return features
+
+    def _window_features(self, frame: pd.DataFrame, key: str, millis: np.ndarray, known: set) -> pd.DataFrame:
+        """
+        보관된 그룹별 거래와 앞선 배치 거래를 기준으로 배치 거래마다 같은 그룹의 최근
+        frequency_days일 거래 수, 직전 거래 후 경과 시간과 z-점수를 계산합니다.
+        (배치 정렬 + 그룹별 이진 탐색, 밀리초 단위, 호출자가 잠금 보유)
+        """
+        windows = self._windows.get(key, {})
+        window = self.frequency_days * MILLIS_PER_DAY
+        keys = frame[key].to_numpy()
+        codes = pd.factorize(keys)[0].astype(np.int64)
+        order = np.argsort(millis, kind='stable')
+        order = order[np.argsort(codes[order], kind='stable')]
+
+        # 배치 안: 그룹 번호 * span + 시각으로 한 줄로 정렬 (구간 하한이 앞 그룹으로 넘어가지 않도록 window만큼 띄움)
+        shifted = millis - millis.min() + window
+        ordered = codes[order] * (shifted.max() + 1) + shifted[order]
+        count = np.empty(len(frame))
+        count[order] = np.searchsorted(ordered, ordered, 'left') - np.searchsorted(ordered, ordered - window, 'left')
+        previous = np.full(len(frame), NO_TIME)
+        same_group = codes[order][1:] == codes[order][:-1]
+        previous[order[1:]] = np.where(same_group, millis[order][:-1], NO_TIME)
+
+        # 다시 평가하는 거래의 보관된 시각 (그룹별)
+        excluded: Dict[Hashable, List[int]] = {}
+        position = 0 if key == 'category_key' else 1
+        for transaction_id in known:
+            entry = self._entries.get(transaction_id)
+            if entry is not None:
+                excluded.setdefault(entry[position], []).append(entry[2])
+
+        median = np.full(len(frame), np.nan)
+        std = np.full(len(frame), np.nan)
+        for rows in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+            group_key = keys[rows[0]]
+            group = windows.get(group_key)
+            if group is None:
+                continue
+            times = millis[rows]
+            stored = group.times
+            count[rows] += np.searchsorted(stored, times, 'left') - np.searchsorted(stored, times - window, 'left')
+            before = np.searchsorted(stored, times, 'right') - 1
+
+            skipped = excluded.get(group_key)
+            if skipped:
+                skipped = np.sort(skipped)
+                count[rows] -= np.searchsorted(skipped, times, 'left') - np.searchsorted(skipped, times - window, 'left')
+                stored_ids = group.ids
+                for i, index in enumerate(before.tolist()):
+                    while index >= 0 and stored_ids[index] in known:
+                        index -= 1
+                    before[i] = index
+
+            if len(stored):
+                latest = np.where(before >= 0, stored[np.maximum(before, 0)], NO_TIME)
+            elif group.last is not None:
+                # 보관 기간이 지나 비어 있는 그룹은 마지막 거래 시각만 사용
+                latest = np.where(group.last <= times, group.last, NO_TIME)
+            else:
+                latest = np.full(len(rows), NO_TIME)
+            previous[rows] = np.maximum(previous[rows], latest)
+            median[rows], std[rows] = group.stats()
+
+        hours = np.full(len(frame), self.window_days * 24.0)
+        has_previous = previous != NO_TIME
+        hours[has_previous] = (millis[has_previous] - previous[has_previous]) / 3600000
+        # z-점수는 상태에 보관된 그룹별 직전 window_days일 기준값으로 계산
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (frame['amount_abs'].to_numpy() - median) / np.where(std > 0, std, np.nan)
+        return pd.DataFrame({
+            'amount_z': np.clip(np.nan_to_num(z, nan=0.0), -50, 50),
+            'count_recent': count,
+            'hours_since_last': hours
+        }, index=frame.index)
+
+    def reset(self, transactions: Union[pd.DataFrame, List[Dict]]) -> None:
+        """상태를 주어진 거래(최근 window_days일분만 보관)로 교체합니다."""
+        windows: Dict[str, Dict[Hashable, _GroupWindow]] = {key: {} for key in self.GROUP_KEYS.values()}
+        entries: Dict[Hashable, Tuple[Hashable, int, int]] = {}
+        latest = self._add(windows, entries, None, self.normalize(transactions))
+        if latest is not None:
+            self._sweep(windows, entries, latest)
+        with self._lock:
+            self._windows, self._entries, self._latest = windows, entries, latest
+            self._since_sweep, self._swept_size = 0, len(entries)
+
+    def append(self, transactions: Union[pd.DataFrame, List[Dict]]) -> None:
+        """상태에 거래를 추가하고 window_days일이 지난 거래를 버린 뒤 해당 그룹의 기준값을 갱신합니다."""
+        self._append(self.normalize(transactions))
+
+    def _append(self, frame: pd.DataFrame) -> None:
+        with self._lock:
+            if self._windows is None:
+                self._windows = {key: {} for key in self.GROUP_KEYS.values()}
+            self._latest = self._add(self._windows, self._entries, self._latest, frame)
+            # 닿지 않은 그룹의 오래된 거래는 마지막 정리 때의 보관 건수만큼 추가될 때마다 한 번에 정리
+            self._since_sweep += len(frame)
+            if self._latest is not None and self._since_sweep >= max(self._swept_size, self.SWEEP_MIN_ROWS):
+                self._sweep(self._windows, self._entries, self._latest)
+                self._since_sweep, self._swept_size = 0, len(self._entries)
+
+    def _add(self, windows: Dict[str, Dict[Hashable, _GroupWindow]], entries: Dict[Hashable, Tuple[Hashable, int, int]],
+             latest: Optional[int], frame: pd.DataFrame) -> Optional[int]:
+        """
+        거래를 그룹별 보관 구간에 추가하고 추가한 그룹에서 window_days일이 지난 거래를 버립니다.
+
+        Returns:
+            Optional[int]: 보관된 가장 늦은 거래 시각 (밀리초)
+        """
+        if not len(frame):
+            return latest
+        ids = frame['id'].to_numpy()
+        has_id = pd.notna(ids)
+        millis = frame['transaction_date'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        amounts = frame['amount_abs'].to_numpy()
+        categories = frame['category_key'].to_numpy()
+        contracts = frame['contract_key'].to_numpy()
+
+        # 다시 추가하는 거래는 이전 값을 먼저 뺌
+        for transaction_id in (ids[has_id].tolist() if entries else []):
+            entry = entries.pop(transaction_id, None)
+            if entry is None:
+                continue
+            for key, group_key in zip(self.GROUP_KEYS.values(), entry):
+                group = windows[key].get(group_key)
+                if group is not None:
+                    group.remove(entry[2], transaction_id)
+
+        touched = []
+        for key in self.GROUP_KEYS.values():
+            keys = frame[key].to_numpy()
+            codes = pd.factorize(keys)[0]
+            order = np.argsort(millis, kind='stable')
+            order = order[np.argsort(codes[order], kind='stable')]
+            groups = windows[key]
+            for rows in np.split(order, np.flatnonzero(np.diff(codes[order])) + 1):
+                group_key = keys[rows[0]]
+                if key == 'contract_key' and group_key < 0:
+                    continue
+                group = groups.get(group_key)
+                if group is None:
+                    group = groups[group_key] = _GroupWindow()
+                group.add(millis[rows], amounts[rows], ids[rows])
+                touched.append((key, group))
+
+        for transaction_id, category, contract, time in zip(
+                ids[has_id].tolist(), categories[has_id].tolist(), contracts[has_id].tolist(), millis[has_id].tolist()):
+            entries[transaction_id] = (category, contract, time)
+
+        newest = int(millis.max())
+        latest = newest if latest is None else max(latest, newest)
+        cutoff = latest - self.window_days * MILLIS_PER_DAY
+        for key, group in touched:
+            self._forget(entries, key, group.trim(cutoff), cutoff)
+        return latest
+
+    def _sweep(self, windows: Dict[str, Dict[Hashable, _GroupWindow]], entries: Dict[Hashable, Tuple[Hashable, int, int]],
+               latest: int) -> None:
+        """모든 그룹에서 window_days일이 지난 거래를 버리고 빈 그룹을 없앱니다."""
+        cutoff = latest - self.window_days * MILLIS_PER_DAY
+        for key, groups in windows.items():
+            for group_key, group in list(groups.items()):
+                self._forget(entries, key, group.trim(cutoff), cutoff)
+                if not len(group):
+                    del groups[group_key]
+
+    @staticmethod
+    def _forget(entries: Dict[Hashable, Tuple[Hashable, int, int]], key: str, removed: List, cutoff: int) -> None:
+        # 거래마다 카테고리 그룹은 반드시 있으므로 카테고리 그룹에서 버릴 때 ID도 지움
+        if key != 'category_key':
+            return
+        for transaction_id in removed:
+            entry = entries.get(transaction_id)
+            if entry is not None and entry[2] < cutoff:
+                del entries[transaction_id]
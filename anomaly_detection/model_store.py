@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from typing import List, Optional
+import joblib
+
+DEFAULT_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models', 'anomaly')
+
+class AnomalyModelStore:
+    """
+    학습된 이상 탐지 모델을 버전별 파일로 저장하고 불러오는 클래스
+
+    모델, 특성 스케일러, 특성 목록, 학습 정보를 하나의 묶음(dict)으로 anomaly_v0001.joblib
+    형식의 파일에 저장하고, latest.json이 현재 사용할 버전을 가리킵니다. 여러 프로세스가
+    같은 디렉터리를 사용해도 버전 번호가 겹치지 않으며, latest()는 latest.json이 바뀔
+    때만 파일을 다시 읽습니다.
+    """
+
+    FILE_PATTERN = re.compile(r'^anomaly_v(\d+)\.joblib$')
+    LATEST_FILE = 'latest.json'
+
+    def __init__(self, directory: Optional[str] = None, keep: int = 5):
+        """
+        Args:
+            directory (Optional[str]): 저장 디렉터리 (기본: ALLONEFLOW_MODEL_DIR 또는 models/anomaly)
+            keep (int): 보관할 최근 버전 수
+        """
+        self.directory = directory or os.environ.get('ALLONEFLOW_MODEL_DIR') or DEFAULT_MODEL_DIR
+        self.keep = keep
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._cached = None
+        self._cached_stamp = None
+        self._loaded = None
+
+    def _path(self, version: int) -> str:
+        return os.path.join(self.directory, f'anomaly_v{version:04d}.joblib')
+
+    def versions(self) -> List[int]:
+        """저장된 버전 목록을 오름차순으로 반환합니다."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(
+            int(match.group(1)) for match in map(self.FILE_PATTERN.match, os.listdir(self.directory)) if match
+        )
+
+    def save(self, bundle: dict) -> int:
+        """
+        모델 묶음을 새 버전으로 저장하고 현재 버전으로 지정합니다.
+
+        Returns:
+            int: 저장된 버전 번호
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            versions = self.versions()
+            version = (versions[-1] if versions else 0) + 1
+            while True:
+                joblib.dump({**bundle, 'version': version}, temp_path)
+                try:
+                    # 다른 프로세스가 같은 버전을 먼저 저장했으면 다음 번호로 다시 시도
+                    os.link(temp_path, self._path(version))
+                    break
+                except FileExistsError:
+                    version += 1
+        finally:
+            os.remove(temp_path)
+
+        self._write_latest(version)
+        self._prune()
+        return version
+
+    def _write_latest(self, version: int) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'version': version}, f)
+        os.replace(temp_path, os.path.join(self.directory, self.LATEST_FILE))
+
+    def _prune(self) -> None:
+        """보관 수를 넘는 오래된 버전을 삭제합니다."""
+        for version in self.versions()[:-self.keep]:
+            try:
+                os.remove(self._path(version))
+            except OSError as e:
+                self.logger.warning(f"이상 탐지 모델 v{version} 삭제 실패: {e}")
+
+    def load(self, version: int) -> Optional[dict]:
+        """지정한 버전의 모델 묶음을 불러옵니다. (없으면 None, 같은 버전을 다시 부르면 읽어 둔 묶음 사용)"""
+        loaded = self._loaded
+        if loaded is not None and loaded['version'] == version:
+            return loaded
+        path = self._path(version)
+        if not os.path.exists(path):
+            return None
+        # 저장된 버전 파일은 바뀌지 않으므로 마지막으로 읽은 버전을 그대로 재사용
+        self._loaded = joblib.load(path)
+        return self._loaded
+
+    def latest_version(self) -> Optional[int]:
+        """현재 버전 번호를 반환합니다. (저장된 모델이 없으면 None)"""
+        try:
+            with open(os.path.join(self.directory, self.LATEST_FILE)) as f:
+                return json.load(f)['version']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def latest(self) -> Optional[dict]:
+        """현재 버전의 모델 묶음을 반환합니다. (변경이 없으면 메모리에 읽어 둔 묶음 사용)"""
+        try:
+            stat = os.stat(os.path.join(self.directory, self.LATEST_FILE))
+        except OSError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            if self._cached is not None and self._cached_stamp == stamp:
+                return self._cached
+            version = self.latest_version()
+            bundle = self.load(version) if version is not None else None
+            self._cached, self._cached_stamp = bundle, stamp
+            return bundle
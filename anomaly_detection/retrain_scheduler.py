@@ -0,0 +1,64 @@
+import logging
+import threading
+from typing import Callable, Optional
+from sqlalchemy.orm import Session
+from .anomaly_detector import AnomalyDetector
+
+class RetrainScheduler:
+    """
+    일정 간격으로 최근 거래를 학습하여 이상 탐지 모델의 새 버전을 저장하는 백그라운드 스레드
+
+    학습된 모델이 없으면 시작하자마자 한 번 학습합니다. 평가(score_only)는 저장소의 현재
+    버전을 사용하므로 재학습이 끝나면 다음 평가부터 새 모델이 적용됩니다.
+    """
+
+    def __init__(self, detector: AnomalyDetector, session_factory: Callable[[], Session],
+                 interval_seconds: float = 24 * 3600):
+        """
+        Args:
+            detector (AnomalyDetector): 이상 탐지기
+            session_factory (Callable[[], Session]): 세션 생성 함수 (sessionmaker 또는 scoped_session)
+            interval_seconds (float): 재학습 간격(초)
+        """
+        self.detector = detector
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.logger = logging.getLogger(__name__)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Optional[dict]:
+        """모델을 한 번 학습합니다. (학습할 거래가 부족하면 None)"""
+        session = self.session_factory()
+        try:
+            return self.detector.train(session)
+        except ValueError as e:
+            self.logger.info(f"이상 탐지 모델 재학습 생략: {e}")
+            return None
+        except Exception as e:
+            self.logger.error(f"이상 탐지 모델 재학습 중 오류 발생: {str(e)}")
+            return None
+        finally:
+            session.close()
+            # scoped_session이면 이 스레드의 세션을 정리
+            if hasattr(self.session_factory, 'remove'):
+                self.session_factory.remove()
+
+    def _run(self) -> None:
+        if self.detector.model_store.latest_version() is None:
+            self.run_once()
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+    def start(self) -> 'RetrainScheduler':
+        """재학습 스레드를 시작합니다."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='anomaly-retrain', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """재학습 스레드를 멈춥니다. (진행 중인 학습은 끝난 뒤 종료)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,288 @@
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from ..database.models import Transaction
+from .anomaly_detector import AnomalyDetector
+
+class AnomalyAlert(NamedTuple):
+    """이상 거래 알림"""
+    transaction_id: Optional[int]
+    source: str
+    transaction_date: datetime
+    amount: float
+    category: Optional[str]
+    contract_id: Optional[int]
+    score: float
+    model_version: int
+
+Subscriber = Callable[[AnomalyAlert], None]
+
+class StreamingAnomalyScorer:
+    """
+    거래가 저장되는 시점에 현재 모델로 바로 평가하고 이상 거래 알림을 구독자에게 전달하는 클래스
+
+    listen()으로 세션 이벤트를 등록하면 어떤 경로(ERP 동기화 등)로 추가된 Transaction이든
+    flush 직전에 한 묶음으로 평가하여 is_anomaly, anomaly_score, anomaly_model_version을
+    INSERT에 함께 기록합니다. (추가 UPDATE 없음) 커밋되면 평가한 거래를 특성 계산 기준에
+    더하고 이상 거래 알림을 보내며, 롤백되면 버립니다. 알림의 유입 경로는
+    session.info['anomaly_stream_source']로 지정합니다. (기본: 'orm')
+
+    알림은 별도 스레드에서 구독자에게 전달하므로 느린 구독자가 거래 저장을 늦추지 않습니다.
+    대기 중인 알림이 max_pending개를 넘으면 새 알림은 버리고 stats()의 dropped_alerts에 셉니다.
+    특성 계산 기준에 더하는 일도 별도 스레드에서 커밋 순서대로 처리하므로 커밋하는 스레드를
+    막지 않습니다. (버리지 않음, start() 전에는 커밋 시점에 바로 더함) 특성 계산 기준이
+    비어 있으면(warm_features() 전) 더하지 않으므로, 커밋된 몇 건만으로 기준이 채워진 것으로
+    처리되지 않고 다음 warm_features()에서 데이터베이스의 최근 거래로 채워집니다.
+    """
+
+    def __init__(self, detector: AnomalyDetector, max_pending: int = 10000):
+        """
+        Args:
+            detector (AnomalyDetector): 이상 탐지기 (저장된 모델과 특성 계산 기준 사용)
+            max_pending (int): 전달을 기다리는 알림의 최대 수
+        """
+        self.detector = detector
+        self.logger = logging.getLogger(__name__)
+        self._subscribers: List[Subscriber] = []
+        self._alerts: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._updates: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._updater: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.scored = 0
+        self.anomalies = 0
+        self.dropped_alerts = 0
+        self.score_seconds = 0.0
+
+    # 구독
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """
+        이상 거래 알림을 받을 함수를 등록합니다.
+
+        Returns:
+            Callable[[], None]: 호출하면 구독을 해지하는 함수
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+        return lambda: self.unsubscribe(callback)
+
+    def unsubscribe(self, callback: Subscriber) -> None:
+        """등록한 알림 함수를 해지합니다."""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, alerts: List[AnomalyAlert]) -> None:
+        """알림을 전달 대기열에 넣습니다. (대기열이 가득 차면 버림)"""
+        for alert in alerts:
+            try:
+                self._alerts.put_nowait(alert)
+            except queue.Full:
+                with self._lock:
+                    self.dropped_alerts += 1
+
+    def _dispatch(self) -> None:
+        while not self._stop.is_set():
+            try:
+                alert = self._alerts.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for callback in subscribers:
+                try:
+                    callback(alert)
+                except Exception as e:
+                    self.logger.error(f"이상 거래 알림 처리 중 오류 발생: {str(e)}")
+
+    def _apply_updates(self) -> None:
+        # 멈출 때도 대기 중인 거래는 모두 기준에 더한 뒤 끝냄
+        while not self._stop.is_set() or not self._updates.empty():
+            try:
+                rows = self._updates.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            self._append(rows)
+
+    def _append(self, rows: List[Dict]) -> None:
+        feature_builder = self.detector.feature_builder
+        if not feature_builder.is_warm:
+            return
+        try:
+            feature_builder.append(rows)
+        except Exception as e:
+            self.logger.error(f"이상 탐지 특성 기준 갱신 중 오류 발생: {str(e)}")
+
+    def start(self) -> 'StreamingAnomalyScorer':
+        """알림 전달 스레드와 특성 기준 갱신 스레드를 시작합니다."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._dispatch, name='anomaly-alerts', daemon=True)
+        self._updater = threading.Thread(target=self._apply_updates, name='anomaly-features', daemon=True)
+        self._thread.start()
+        self._updater.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """알림 전달 스레드와 특성 기준 갱신 스레드를 멈춥니다."""
+        self._stop.set()
+        for thread in (self._thread, self._updater):
+            if thread is not None:
+                thread.join(timeout)
+        # 스레드가 끝나는 사이 커밋된 거래는 여기서 더함
+        if self._updater is not None and not self._updater.is_alive():
+            while not self._updates.empty():
+                self._append(self._updates.get_nowait())
+
+    # 평가
+    def score(self, records: List[Dict], source: str = 'api',
+              publish: bool = True) -> Optional[Tuple[List[bool], List[float], int]]:
+        """
+        거래 묶음을 현재 모델로 평가합니다. (데이터베이스에 저장하지 않는 경로용)
+
+        평가한 거래는 특성 계산 기준에 더하지 않습니다.
+
+        Args:
+            records (List[Dict]): 거래 목록 (transaction_date, amount 필수, id, category, contract_id 선택)
+            source (str): 알림에 표시할 유입 경로
+            publish (bool): 이상 거래 알림을 보낼지 여부
+
+        Returns:
+            Optional[Tuple[List[bool], List[float], int]]: (이상치 여부 목록, 이상 점수 목록, 모델 버전)
+                학습된 모델이 없으면 None
+        """
+        if not records:
+            return None
+        result = self._score(records)
+        if result is not None and publish:
+            is_anomaly, scores, version = result
+            self.publish([
+                self._alert(record, record.get('id'), source, score, version)
+                for record, anomaly, score in zip(records, is_anomaly, scores) if anomaly
+            ])
+        return result
+
+    def _score(self, records: List[Dict]) -> Optional[Tuple[List[bool], List[float], int]]:
+        if self.detector.model_store.latest() is None:
+            return None
+        started = time.perf_counter()
+        is_anomaly, scores, version = self.detector.score_only(records, update_state=False)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.scored += len(records)
+            self.anomalies += sum(is_anomaly)
+            self.score_seconds += elapsed
+        return is_anomaly, scores, version
+
+    @staticmethod
+    def _alert(record: Dict, transaction_id: Optional[int], source: str, score: float,
+               version: int) -> AnomalyAlert:
+        return AnomalyAlert(
+            transaction_id=transaction_id,
+            source=source,
+            transaction_date=record['transaction_date'],
+            amount=record['amount'],
+            category=record.get('category'),
+            contract_id=record.get('contract_id'),
+            score=score,
+            model_version=version
+        )
+
+    def stats(self) -> dict:
+        """평가 건수, 이상 거래 수, 거래당 평균 평가 시간과 알림 대기 상태를 반환합니다."""
+        with self._lock:
+            return {
+                "scored": self.scored,
+                "anomalies": self.anomalies,
+                "avg_ms_per_transaction": self.score_seconds * 1000 / self.scored if self.scored else 0.0,
+                "pending_alerts": self._alerts.qsize(),
+                "pending_updates": self._updates.qsize(),
+                "dropped_alerts": self.dropped_alerts,
+                "subscribers": len(self._subscribers)
+            }
+
+    @staticmethod
+    def pop_summary(session: Session) -> Optional[dict]:
+        """
+        세션에서 저장 시 평가한 결과를 꺼냅니다. (없으면 None)
+
+        Returns:
+            Optional[dict]: {"scored", "anomalies", "model_version"}
+        """
+        return session.info.pop('anomaly_stream_summary', None)
+
+    # 세션 이벤트: flush 직전에 새 거래를 평가하고, 커밋되면 기준 갱신·알림 전달
+    def _before_flush(self, session: Session, flush_context, instances) -> None:
+        pending = [
+            obj for obj in session.new
+            if isinstance(obj, Transaction) and obj.anomaly_score is None and obj.transaction_date is not None
+        ]
+        if not pending:
+            return
+
+        records = [
+            {"transaction_date": obj.transaction_date, "amount": obj.amount,
+             "category": obj.category, "contract_id": obj.contract_id}
+            for obj in pending
+        ]
+        try:
+            result = self._score(records)
+        except Exception as e:
+            # 평가 실패로 거래 저장이 실패하지 않도록 기록만 남김
+            self.logger.error(f"거래 저장 시 이상 탐지 중 오류 발생: {str(e)}")
+            return
+        if result is None:
+            return
+
+        is_anomaly, scores, version = result
+        for obj, anomaly, score in zip(pending, is_anomaly, scores):
+            obj.is_anomaly = anomaly
+            obj.anomaly_score = score
+            obj.anomaly_model_version = version
+        session.info.setdefault('anomaly_stream_pending', []).extend(zip(pending, records))
+        summary = session.info.setdefault('anomaly_stream_summary', {"scored": 0, "anomalies": 0})
+        summary["scored"] += len(pending)
+        summary["anomalies"] += sum(is_anomaly)
+        summary["model_version"] = version
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        # INSERT 후 ID가 정해진 뒤 알림과 기준에 더할 거래를 만들어 둠
+        pending = session.info.pop('anomaly_stream_pending', None)
+        if not pending:
+            return
+        source = session.info.get('anomaly_stream_source', 'orm')
+        rows = session.info.setdefault('anomaly_stream_rows', [])
+        alerts = session.info.setdefault('anomaly_stream_alerts', [])
+        for obj, record in pending:
+            rows.append({**record, "id": obj.id})
+            if obj.is_anomaly:
+                alerts.append(self._alert(record, obj.id, source, obj.anomaly_score, obj.anomaly_model_version))
+
+    def _after_commit(self, session: Session) -> None:
+        rows = session.info.pop('anomaly_stream_rows', None)
+        alerts = session.info.pop('anomaly_stream_alerts', None)
+        if rows:
+            if self._updater is not None and self._updater.is_alive():
+                self._updates.put(rows)
+            else:
+                self._append(rows)
+        if alerts:
+            self.publish(alerts)
+
+    def _after_rollback(self, session: Session) -> None:
+        for key in ('anomaly_stream_pending', 'anomaly_stream_rows', 'anomaly_stream_alerts',
+                    'anomaly_stream_summary'):
+            session.info.pop(key, None)
+
+    def listen(self) -> 'StreamingAnomalyScorer':
+        """모든 세션에서 새 거래를 저장할 때 평가하도록 세션 이벤트를 등록합니다."""
+        event.listen(Session, 'before_flush', self._before_flush)
+        event.listen(Session, 'after_flush', self._after_flush)
+        event.listen(Session, 'after_commit', self._after_commit)
+        event.listen(Session, 'after_rollback', self._after_rollback)
+        return self
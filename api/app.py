@@ -1,13 +1,25 @@
-from flask import Flask, request, jsonify, send_from_directory, redirect
+from flask import Flask, request, jsonify, send_from_directory, send_file, redirect, Response, stream_with_context
 from datetime import datetime
+from decimal import Decimal
 import os
 import sys
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from database.models import Base, FiscalYear, Account, AccountType
+import tempfile
+from sqlalchemy.orm import scoped_session, sessionmaker
+from database.models import (
+    Base, FiscalYear, Account, AccountType, AccountClosure, AccountPeriodBalance, JournalLine,
+    AllocationRule, AllocationRuleItem
+)
+from database.migrate import create_missing_columns, migrate_money_columns
+from database.config import attach_pool_metrics, create_db_engine, database_url
+from api.listing import keyset_page, list_response, parse_list_params
 from accounting.accounting_manager import AccountingManager
 from accounting.advanced_accounting_manager import AdvancedAccountingManager
+from accounting.chart_of_accounts_cache import chart_of_accounts_cache
 from accounting.excel_manager import ExcelManager
+from accounting.tax_manager import TaxManager
+from accounting.trial_balance_manager import TrialBalanceManager
+from jobs import JobQueue, JobWorkerPool
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import logging
 
@@ -20,18 +32,52 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+class MoneyJSONProvider(DefaultJSONProvider):
+    """Decimal 금액을 문자열이 아닌 JSON 숫자로 직렬화하는 JSON 공급자"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, Decimal):
+            return float(o)
+        return DefaultJSONProvider.default(o)
+
 app = Flask(__name__, static_folder='static')
+app.json = MoneyJSONProvider(app)
 CORS(app)
 
-# 데이터베이스 설정
+# 데이터베이스 설정 (ALLONEFLOW_DATABASE_URL 환경 변수로 PostgreSQL 등 지정 가능)
 db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alloneflow.db')
-engine = create_engine(f'sqlite:///{db_path}')
-Session = sessionmaker(bind=engine)
+engine = create_db_engine(database_url(db_path))
+pool_metrics = attach_pool_metrics(engine)
+
+# 요청(앱 컨텍스트) 단위 세션: 같은 요청 안의 Session()은 같은 세션을 반환하고,
+# 요청이 끝나면 teardown에서 롤백·종료하여 연결을 풀에 반납합니다.
+Session = scoped_session(sessionmaker(bind=engine))
+
+@app.teardown_appcontext
+def remove_session(exception=None):
+    """요청이 끝나면 세션을 정리합니다. (커밋되지 않은 변경은 롤백)"""
+    Session.remove()
 
 # 관리자 객체 초기화
 accounting_manager = AccountingManager()
 advanced_accounting_manager = AdvancedAccountingManager()
 excel_manager = ExcelManager()
+trial_balance_manager = TrialBalanceManager()
+
+# 오래 걸리는 작업(마감, 현금흐름표, 세금 신고, Excel 가져오기)은 작업 큐에 등록하고
+# 작업 프로세스(jobs.worker)가 실행합니다.
+job_queue = JobQueue(engine)
+
+def _job_accepted(job_id: int, message: str, **extra):
+    """작업 등록 응답(202)을 만듭니다."""
+    return jsonify({
+        "message": message,
+        "job_id": job_id,
+        "status": "QUEUED",
+        "status_url": f"/api/jobs/{job_id}",
+        **extra
+    }), 202
 
 # 데이터베이스 초기화 함수
 def init_db():
@@ -40,6 +86,32 @@ def init_db():
         # 테이블 생성
         Base.metadata.create_all(engine)
         logger.info("데이터베이스 테이블 생성 완료")
+        
+        # 기존 테이블에 새로 추가된 컬럼 생성
+        added = create_missing_columns(engine)
+        if added:
+            logger.info(f"컬럼 추가 완료: {', '.join(added)}")
+        
+        # 실수(REAL)로 저장된 기존 금액 컬럼을 최소 단위 정수로 변환
+        converted = migrate_money_columns(engine)
+        if converted:
+            logger.info(f"금액 컬럼 변환 완료: {', '.join(converted)}")
+        
+        # 기존 전표가 있는데 월별 잔액 집계가 비어 있으면 재생성
+        session = Session()
+        try:
+            if (session.query(AccountPeriodBalance.id).first() is None and
+                    session.query(JournalLine.id).first() is not None):
+                count = accounting_manager.period_balance_manager.rebuild(session)
+                logger.info(f"월별 잔액 집계 재생성 완료: {count}건")
+            
+            # 기존 계정과목이 있는데 계층 클로저가 비어 있으면 재생성
+            if (session.query(AccountClosure.ancestor_id).first() is None and
+                    session.query(Account.id).first() is not None):
+                count = accounting_manager.hierarchy_manager.rebuild(session)
+                logger.info(f"계정과목 계층 클로저 재생성 완료: {count}건")
+        finally:
+            session.close()
     except Exception as e:
         logger.error(f"데이터베이스 초기화 중 오류 발생: {e}")
         raise
@@ -93,25 +165,34 @@ def create_fiscal_year():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+FISCAL_YEAR_FIELDS = {
+    "id": FiscalYear.id,
+    "year": FiscalYear.year,
+    "start_date": FiscalYear.start_date,
+    "end_date": FiscalYear.end_date,
+    "is_closed": FiscalYear.is_closed
+}
+
 @app.route('/api/fiscal-years', methods=['GET'])
 def list_fiscal_years():
-    """모든 회계연도를 조회합니다."""
+    """회계연도 목록을 조회합니다. (fields, sort, limit, cursor, is_closed 파라미터 지원)"""
     try:
         session = Session()
-        fiscal_years = session.query(FiscalYear).all()
-        
-        return jsonify([{
-            "id": fy.id,
-            "year": fy.year,
-            "start_date": fy.start_date.isoformat(),
-            "end_date": fy.end_date.isoformat(),
-            "is_closed": fy.is_closed
-        } for fy in fiscal_years])
+        try:
+            params = parse_list_params(FISCAL_YEAR_FIELDS, sort_fields=('id',))
+            filters = []
+            if request.args.get('is_closed') is not None:
+                filters.append(FiscalYear.is_closed == (request.args['is_closed'].lower() in ('1', 'true', 'yes')))
+            
+            items, next_cursor = keyset_page(session, FISCAL_YEAR_FIELDS, params, filters)
+            return list_response(items, next_cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        session.close()
 
 @app.route('/api/accounts', methods=['POST'])
 def create_account():
@@ -137,6 +218,8 @@ def create_account():
                 is_active=data.get('is_active', True)
             )
             session.add(account)
+            session.flush()
+            accounting_manager.hierarchy_manager.add_accounts(session, [account])
             session.commit()
             
             return jsonify({
@@ -160,40 +243,50 @@ def create_account():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+ACCOUNT_FIELDS = {
+    "id": Account.id,
+    "code": Account.code,
+    "name": Account.name,
+    "type": Account.type,
+    "description": Account.description,
+    "parent_id": Account.parent_id,
+    "is_active": Account.is_active,
+    "created_at": Account.created_at,
+    "updated_at": Account.updated_at
+}
+
 @app.route('/api/accounts', methods=['GET'])
 def get_accounts():
-    """모든 계정과목을 조회합니다."""
+    """계정과목 목록을 조회합니다. (fields, sort, limit, cursor, type, is_active, parent_id 파라미터 지원)"""
     try:
         session = Session()
-        accounts = session.query(Account).all()
-        
-        result = []
-        for account in accounts:
-            result.append({
-                'id': account.id,
-                'code': account.code,
-                'name': account.name,
-                'type': account.type.name,
-                'description': account.description,
-                'parent_id': account.parent_id,
-                'is_active': account.is_active,
-                'created_at': account.created_at.isoformat() if account.created_at else None,
-                'updated_at': account.updated_at.isoformat() if account.updated_at else None
-            })
-        
-        return jsonify(result), 200
+        try:
+            params = parse_list_params(ACCOUNT_FIELDS, sort_fields=('id', 'code'))
+            filters = []
+            if request.args.get('type'):
+                filters.append(Account.type == AccountType[request.args['type'].upper()])
+            if request.args.get('is_active') is not None:
+                filters.append(Account.is_active == (request.args['is_active'].lower() in ('1', 'true', 'yes')))
+            if request.args.get('parent_id'):
+                filters.append(Account.parent_id == request.args.get('parent_id', type=int))
+            
+            items, next_cursor = keyset_page(session, ACCOUNT_FIELDS, params, filters)
+            return list_response(items, next_cursor)
+        except (ValueError, KeyError) as e:
+            return jsonify({"error": f"잘못된 요청입니다: {e}"}), 400
+        finally:
+            session.close()
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        session.close()
 
 @app.route('/api/accounts/<string:code>', methods=['GET'])
 def get_account(code):
     """특정 계정과목을 조회합니다."""
     try:
         session = Session()
-        account = session.query(Account).filter(Account.code == code).first()
+        cached = chart_of_accounts_cache.get(session, code)
+        account = session.get(Account, cached.id) if cached else None
         
         if not account:
             return jsonify({"error": "계정과목을 찾을 수 없습니다."}), 404
@@ -240,6 +333,44 @@ def create_journal_entry():
         logger.error(f"전표 생성 중 오류 발생: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/journal-entries/batch', methods=['POST'])
+def create_journal_entries_batch():
+    """여러 전표를 하나의 트랜잭션으로 일괄 생성합니다."""
+    try:
+        data = request.get_json(force=True)
+        
+        if not data or not isinstance(data.get('entries'), list):
+            return jsonify({"error": "entries 필드가 필요합니다."}), 400
+        
+        session = Session()
+        
+        try:
+            results = accounting_manager.create_journal_entries_bulk(
+                session=session,
+                entries=data['entries'],
+                created_by=data.get('created_by')
+            )
+            
+            created_count = sum(1 for result in results if result['entry_id'] is not None)
+            
+            return jsonify({
+                "message": "전표 일괄 생성이 완료되었습니다.",
+                "created_count": created_count,
+                "failed_count": len(results) - created_count,
+                "results": results
+            }), 201 if created_count == len(results) else 207
+            
+        except Exception as e:
+            session.rollback()
+            logger.error(f"전표 일괄 생성 중 오류 발생: {str(e)}")
+            return jsonify({"error": str(e)}), 500
+            
+        finally:
+            session.close()
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/budgets', methods=['POST'])
 def create_budget():
     """새로운 예산을 생성합니다."""
@@ -275,7 +406,8 @@ def analyze_budget_variance(budget_id):
         
         analysis = advanced_accounting_manager.analyze_budget_variance(
             session=session,
-            budget_id=budget_id
+            budget_id=budget_id,
+            include_descendants=request.args.get('include_descendants', 'false').lower() in ('1', 'true', 'yes')
         )
         
         return jsonify(analysis)
@@ -284,6 +416,32 @@ def analyze_budget_variance(budget_id):
         logger.error(f"예산 분석 중 오류 발생: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/fiscal-years/<int:fiscal_year_id>/budget-variance', methods=['GET'])
+def analyze_fiscal_year_budget_variance(fiscal_year_id):
+    """회계연도의 모든 예산 실적을 한 번에 분석합니다."""
+    try:
+        session = Session()
+        try:
+            if not session.query(FiscalYear).get(fiscal_year_id):
+                return jsonify({"error": "회계연도를 찾을 수 없습니다."}), 404
+            
+            analysis = advanced_accounting_manager.analyze_fiscal_year_budget_variance(
+                session=session,
+                fiscal_year_id=fiscal_year_id,
+                budget_type=request.args.get('type'),
+                cost_center_id=request.args.get('cost_center_id', type=int),
+                include_descendants=request.args.get('include_descendants', 'false').lower() in ('1', 'true', 'yes')
+            )
+            return jsonify(analysis)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
+        
+    except Exception as e:
+        logger.error(f"회계연도 예산 분석 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/cost-centers', methods=['POST'])
 def create_cost_center():
     """새로운 원가 중심점을 생성합니다."""
@@ -335,28 +493,158 @@ def allocate_costs(journal_line_id):
         logger.error(f"원가 배부 중 오류 발생: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
-@app.route('/api/cash-flow-statements', methods=['POST'])
-def generate_cash_flow_statement():
-    """현금 흐름표를 생성합니다."""
+def _allocation_rule_to_dict(rule):
+    """배부 규칙을 응답용 딕셔너리로 변환합니다."""
+    return {
+        "id": rule.id,
+        "name": rule.name,
+        "account_id": rule.account_id,
+        "account_code_from": rule.account_code_from,
+        "account_code_to": rule.account_code_to,
+        "description": rule.description,
+        "is_active": rule.is_active,
+        "allocations": [{
+            "cost_center_id": item.cost_center_id,
+            "ratio": item.ratio
+        } for item in rule.items]
+    }
+
+@app.route('/api/allocation-rules', methods=['POST'])
+def create_allocation_rule():
+    """원가 배부 규칙을 생성합니다."""
     try:
-        data = request.json
+        data = request.get_json()
+        
+        for field in ['name', 'allocations']:
+            if not data or field not in data:
+                return jsonify({"error": f"{field} 필드가 필요합니다."}), 400
+        
         session = Session()
+        try:
+            rule = advanced_accounting_manager.create_allocation_rule(
+                session=session,
+                name=data['name'],
+                allocations=data['allocations'],
+                account_id=data.get('account_id'),
+                account_code_from=data.get('account_code_from'),
+                account_code_to=data.get('account_code_to'),
+                description=data.get('description')
+            )
+            
+            return jsonify({
+                "message": "배부 규칙이 성공적으로 생성되었습니다.",
+                "rule": _allocation_rule_to_dict(rule)
+            }), 201
+        except ValueError as e:
+            session.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
         
-        cash_flows = advanced_accounting_manager.generate_cash_flow_statement(
-            session=session,
-            start_date=datetime.fromisoformat(data['start_date']),
-            end_date=datetime.fromisoformat(data['end_date'])
-        )
+    except Exception as e:
+        logger.error(f"배부 규칙 생성 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+ALLOCATION_RULE_FIELDS = {
+    "id": AllocationRule.id,
+    "name": AllocationRule.name,
+    "account_id": AllocationRule.account_id,
+    "account_code_from": AllocationRule.account_code_from,
+    "account_code_to": AllocationRule.account_code_to,
+    "description": AllocationRule.description,
+    "is_active": AllocationRule.is_active
+}
+
+@app.route('/api/allocation-rules', methods=['GET'])
+def list_allocation_rules():
+    """원가 배부 규칙 목록을 조회합니다. (fields, sort, limit, cursor, active_only 파라미터 지원)"""
+    try:
+        session = Session()
+        try:
+            params = parse_list_params(ALLOCATION_RULE_FIELDS, sort_fields=('name', 'id'),
+                                       extra_fields=('allocations',))
+            filters = []
+            if request.args.get('active_only', 'true').lower() in ('1', 'true', 'yes'):
+                filters.append(AllocationRule.is_active == True)
+            
+            selected = params["selected"]
+            items, next_cursor = keyset_page(
+                session, ALLOCATION_RULE_FIELDS, dict(params, selected=selected + ['id']), filters
+            )
+            
+            # 배부 비율은 페이지에 포함된 규칙만 한 번에 조회
+            if 'allocations' in selected:
+                allocations = {}
+                for rule_id, cost_center_id, ratio in session.query(
+                    AllocationRuleItem.rule_id, AllocationRuleItem.cost_center_id, AllocationRuleItem.ratio
+                ).filter(AllocationRuleItem.rule_id.in_([item["id"] for item in items]))\
+                        .order_by(AllocationRuleItem.id):
+                    allocations.setdefault(rule_id, []).append({"cost_center_id": cost_center_id, "ratio": ratio})
+                for item in items:
+                    item["allocations"] = allocations.get(item["id"], [])
+            if 'id' not in selected:
+                for item in items:
+                    del item["id"]
+            
+            return list_response(items, next_cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
         
-        return jsonify({
-            "message": "현금 흐름표가 성공적으로 생성되었습니다.",
-            "cash_flows": [{
-                "id": flow.id,
-                "type": flow.type,
-                "amount": flow.amount,
-                "description": flow.description
-            } for flow in cash_flows]
+    except Exception as e:
+        logger.error(f"배부 규칙 조회 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/allocation-rules/<int:rule_id>/apply', methods=['POST'])
+def apply_allocation_rule(rule_id):
+    """기간 내 규칙 대상 전표 라인을 원가 중심점에 일괄 배부합니다."""
+    try:
+        data = request.get_json()
+        
+        for field in ['start_date', 'end_date']:
+            if not data or field not in data:
+                return jsonify({"error": f"{field} 필드가 필요합니다."}), 400
+        
+        session = Session()
+        try:
+            result = advanced_accounting_manager.apply_allocation_rule(
+                session=session,
+                rule_id=rule_id,
+                start_date=datetime.fromisoformat(data['start_date']),
+                end_date=datetime.fromisoformat(data['end_date'])
+            )
+            
+            return jsonify({
+                "message": "원가가 일괄 배부되었습니다.",
+                **result
+            })
+        except ValueError as e:
+            session.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
+        
+    except Exception as e:
+        logger.error(f"원가 일괄 배부 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/cash-flow-statements', methods=['POST'])
+def generate_cash_flow_statement():
+    """현금 흐름표 생성 작업을 등록합니다. (결과는 GET /api/jobs/<job_id>)"""
+    try:
+        data = request.get_json(force=True) or {}
+        try:
+            start_date = datetime.fromisoformat(data['start_date'])
+            end_date = datetime.fromisoformat(data['end_date'])
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({"error": f"start_date와 end_date가 올바르지 않습니다: {e}"}), 400
+        
+        job_id = job_queue.enqueue('cash_flow_statement', {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat()
         })
+        return _job_accepted(job_id, "현금 흐름표 생성 작업이 등록되었습니다.")
         
     except Exception as e:
         logger.error(f"현금 흐름표 생성 중 오류 발생: {str(e)}")
@@ -364,26 +652,48 @@ def generate_cash_flow_statement():
 
 @app.route('/api/tax-reports', methods=['POST'])
 def generate_tax_report():
-    """세금 신고 자료를 생성합니다."""
+    """세금 신고 자료 생성 작업을 등록합니다. (결과는 GET /api/jobs/<job_id>)"""
     try:
-        data = request.json
-        session = Session()
+        data = request.get_json(force=True) or {}
+        try:
+            report_type = data['report_type']
+            period_start = datetime.fromisoformat(data['period_start'])
+            period_end = datetime.fromisoformat(data['period_end'])
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({"error": f"잘못된 요청입니다: {e}"}), 400
+        
+        # 작업 등록 전에 검증하여 잘못된 요청이 202로 등록된 뒤 실패하지 않도록 함
+        if report_type not in TaxManager.REPORT_TYPES:
+            return jsonify({"error": f"지원하지 않는 세금 신고 유형입니다: {report_type}"}), 400
+        if period_start > period_end:
+            return jsonify({"error": "시작일이 종료일보다 늦습니다."}), 400
+        
+        job_id = job_queue.enqueue('tax_report', {
+            "report_type": report_type,
+            "period_start": period_start.isoformat(),
+            "period_end": period_end.isoformat()
+        })
+        return _job_accepted(job_id, "세금 신고 자료 생성 작업이 등록되었습니다.")
         
-        tax_report = advanced_accounting_manager.generate_tax_report(
-            session=session,
-            report_type=data['report_type'],
-            period_start=datetime.fromisoformat(data['period_start']),
-            period_end=datetime.fromisoformat(data['period_end'])
-        )
+    except Exception as e:
+        logger.error(f"세금 신고 자료 생성 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/tax-reports/vat/quarterly', methods=['POST'])
+def generate_quarterly_vat_reports():
+    """연도의 부가가치세 분기 신고 자료(1기·2기 예정/확정) 생성 작업을 등록합니다. (결과는 GET /api/jobs/<job_id>)"""
+    try:
+        data = request.get_json(force=True) or {}
+        try:
+            year = int(data['year'])
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({"error": f"year 필드가 올바르지 않습니다: {e}"}), 400
         
-        return jsonify({
-            "message": "세금 신고 자료가 성공적으로 생성되었습니다.",
-            "report_id": tax_report.id,
-            "total_amount": tax_report.total_amount
-        }), 201
+        job_id = job_queue.enqueue('vat_quarterly_reports', {"year": year})
+        return _job_accepted(job_id, "부가가치세 분기 신고 자료 생성 작업이 등록되었습니다.")
         
     except Exception as e:
-        logger.error(f"세금 신고 자료 생성 중 오류 발생: {str(e)}")
+        logger.error(f"부가가치세 분기 신고 자료 생성 중 오류 발생: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
 @app.route('/api/tax-reports/<int:report_id>/submit', methods=['POST'])
@@ -435,9 +745,38 @@ def analyze_account(account_id):
         logger.error(f"계정과목 분석 중 오류 발생: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/accounts/analysis', methods=['POST'])
+def analyze_accounts():
+    """활성 계정과목 전체(또는 account_ids)를 한 번에 분석합니다."""
+    try:
+        data = request.get_json()
+        
+        if not data or 'analysis_date' not in data:
+            return jsonify({"error": "analysis_date 필드가 필요합니다."}), 400
+        
+        session = Session()
+        try:
+            analyses = advanced_accounting_manager.analyze_accounts(
+                session=session,
+                analysis_date=datetime.fromisoformat(data['analysis_date']),
+                account_ids=data.get('account_ids')
+            )
+            
+            return jsonify({
+                "message": "계정과목 분석이 성공적으로 완료되었습니다.",
+                "count": len(analyses),
+                "analyses": analyses
+            })
+        finally:
+            session.close()
+        
+    except Exception as e:
+        logger.error(f"계정과목 일괄 분석 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/fiscal-years/<int:fiscal_year_id>/close', methods=['POST'])
 def close_fiscal_year(fiscal_year_id):
-    """회계연도를 마감합니다."""
+    """회계연도 마감 작업을 등록합니다. (결과는 GET /api/jobs/<job_id>)"""
     try:
         data = request.get_json(force=True)
         
@@ -450,29 +789,136 @@ def close_fiscal_year(fiscal_year_id):
             fiscal_year = session.query(FiscalYear).get(fiscal_year_id)
             if not fiscal_year:
                 return jsonify({"error": "회계연도를 찾을 수 없습니다."}), 404
+            if fiscal_year.is_closed:
+                return jsonify({"error": "이미 마감된 회계연도입니다."}), 400
             
-            fiscal_year = accounting_manager.close_fiscal_year(
-                session=session,
-                fiscal_year_id=fiscal_year_id,
-                closed_by=data['closed_by']
-            )
-            session.commit()
-            
-            return jsonify({
-                "message": "회계연도가 성공적으로 마감되었습니다.",
-                "fiscal_year_id": fiscal_year.id,
-                "year": fiscal_year.year,
-                "closed_at": fiscal_year.closed_at.isoformat(),
-                "closed_by": fiscal_year.closed_by
+            job_id = job_queue.enqueue('close_fiscal_year', {
+                "fiscal_year_id": fiscal_year_id,
+                "closed_by": data['closed_by']
             })
+            return _job_accepted(job_id, "회계연도 마감 작업이 등록되었습니다.",
+                                 fiscal_year_id=fiscal_year.id, year=fiscal_year.year)
             
-        except Exception as e:
-            session.rollback()
-            return jsonify({"error": str(e)}), 500
+        finally:
+            session.close()
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def _trial_balance_params(session):
+    """시산표 요청 파라미터(기간, 단위, 합산 여부)를 해석합니다."""
+    fiscal_year_id = request.args.get('fiscal_year_id', type=int)
+    if fiscal_year_id:
+        fiscal_year = session.query(FiscalYear).get(fiscal_year_id)
+        if not fiscal_year:
+            raise ValueError("회계연도를 찾을 수 없습니다.")
+        start_date, end_date = fiscal_year.start_date, fiscal_year.end_date
+    else:
+        if not request.args.get('start_date') or not request.args.get('end_date'):
+            raise ValueError("start_date와 end_date 또는 fiscal_year_id가 필요합니다.")
+        start_date = datetime.fromisoformat(request.args['start_date'])
+        end_date = datetime.fromisoformat(request.args['end_date'])
+    
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "granularity": request.args.get('granularity', 'month'),
+        "rollup": request.args.get('rollup', 'false').lower() in ('1', 'true', 'yes')
+    }
+
+@app.route('/api/trial-balance', methods=['GET'])
+def get_trial_balance():
+    """기간별 시산표를 조회합니다."""
+    try:
+        session = Session()
+        try:
+            params = _trial_balance_params(session)
+            trial_balance = trial_balance_manager.generate_trial_balance(
+                session,
+                include_zero=request.args.get('include_zero', 'false').lower() in ('1', 'true', 'yes'),
+                **params
+            )
+            return jsonify(trial_balance)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
+        
+    except Exception as e:
+        logger.error(f"시산표 조회 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/financial-statements', methods=['GET'])
+def get_financial_statements():
+    """계정과목 계층 단계별 재무상태표와 손익계산서를 조회합니다."""
+    try:
+        session = Session()
+        try:
+            fiscal_year_id = request.args.get('fiscal_year_id', type=int)
+            if fiscal_year_id:
+                fiscal_year = session.query(FiscalYear).get(fiscal_year_id)
+                if not fiscal_year:
+                    return jsonify({"error": "회계연도를 찾을 수 없습니다."}), 404
+                start_date, end_date = fiscal_year.start_date, fiscal_year.end_date
+            elif request.args.get('start_date') and request.args.get('end_date'):
+                start_date = datetime.fromisoformat(request.args['start_date'])
+                end_date = datetime.fromisoformat(request.args['end_date'])
+            else:
+                return jsonify({"error": "start_date와 end_date 또는 fiscal_year_id가 필요합니다."}), 400
             
+            statements = advanced_accounting_manager.generate_financial_statements(
+                session,
+                start_date,
+                end_date,
+                level=request.args.get('level', type=int)
+            )
+            return jsonify(statements)
         finally:
             session.close()
         
+    except Exception as e:
+        logger.error(f"재무제표 조회 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """작업 상태, 진행률, 결과(완료 시) 또는 오류(실패 시)를 조회합니다."""
+    try:
+        job = job_queue.get(job_id)
+        if not job:
+            return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"작업 조회 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>/retry', methods=['POST'])
+def retry_job(job_id):
+    """실패한 작업을 마지막 재개 지점부터 다시 실행하도록 대기열에 넣습니다."""
+    try:
+        job = job_queue.get(job_id)
+        if not job:
+            return jsonify({"error": "작업을 찾을 수 없습니다."}), 404
+        if not job_queue.retry(job_id):
+            return jsonify({"error": "실패한 작업만 다시 실행할 수 있습니다."}), 409
+        return _job_accepted(job_id, "작업을 다시 대기열에 넣었습니다.")
+    except Exception as e:
+        logger.error(f"작업 재실행 중 오류 발생: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/system/db-pool', methods=['GET'])
+def get_db_pool_metrics():
+    """데이터베이스 연결 풀 대여/반납 집계를 조회합니다."""
+    try:
+        return jsonify(pool_metrics.snapshot())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/system/account-cache', methods=['GET'])
+def get_account_cache_stats():
+    """계정과목 캐시 적중/실패 집계를 조회합니다."""
+    try:
+        return jsonify(chart_of_accounts_cache.stats())
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -777,9 +1223,82 @@ def download_custom_excel():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/excel/journal/export', methods=['GET'])
+def export_journal_excel():
+    """전표를 CSV 또는 Excel로 스트리밍 내보냅니다."""
+    try:
+        export_format = request.args.get('format', 'xlsx').lower()
+        if export_format not in ('csv', 'xlsx'):
+            return jsonify({"error": "format은 csv 또는 xlsx여야 합니다."}), 400
+        
+        start_date = request.args.get('start_date')
+        end_date = request.args.get('end_date')
+        start_date = datetime.fromisoformat(start_date) if start_date else None
+        end_date = datetime.fromisoformat(end_date) if end_date else None
+        
+        if export_format == 'csv':
+            def generate():
+                # 응답이 끝날 때까지 세션을 유지하고 조각 단위로 전송
+                session = Session()
+                try:
+                    yield from excel_manager.iter_journal_csv(session, start_date, end_date)
+                finally:
+                    session.close()
+            
+            return Response(
+                stream_with_context(generate()),
+                mimetype='text/csv',
+                headers={"Content-Disposition": "attachment; filename=journal_entries.csv"}
+            )
+        
+        # xlsx는 constant_memory 모드로 임시 파일에 기록한 뒤 전송
+        fd, output_path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        session = Session()
+        try:
+            excel_manager.write_journal_excel(session, output_path, start_date, end_date)
+        except Exception:
+            os.remove(output_path)
+            raise
+        finally:
+            session.close()
+        
+        response = send_file(output_path, as_attachment=True, download_name='journal_entries.xlsx')
+        response.call_on_close(lambda: os.remove(output_path))
+        return response
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/excel/trial-balance/export', methods=['GET'])
+def export_trial_balance_excel():
+    """기간별 시산표를 Excel 파일로 내보냅니다."""
+    try:
+        session = Session()
+        fd, output_path = tempfile.mkstemp(suffix='.xlsx')
+        os.close(fd)
+        try:
+            params = _trial_balance_params(session)
+            excel_manager.export_trial_balance(session, output_path, **params)
+        except ValueError as e:
+            os.remove(output_path)
+            return jsonify({"error": str(e)}), 400
+        except Exception:
+            os.remove(output_path)
+            raise
+        finally:
+            session.close()
+        
+        response = send_file(output_path, as_attachment=True, download_name='trial_balance.xlsx')
+        response.call_on_close(lambda: os.remove(output_path))
+        return response
+        
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/excel/upload', methods=['POST'])
 def upload_excel():
-    """엑셀 파일을 업로드합니다."""
+    """엑셀 파일을 업로드하고 계정과목/전표 가져오기 작업을 등록합니다. (결과는 GET /api/jobs/<job_id>)"""
     try:
         if 'file' not in request.files:
             return jsonify({"error": "파일이 없습니다."}), 400
@@ -791,20 +1310,20 @@ def upload_excel():
         if file.filename == '' or not file.filename.endswith(('.xlsx', '.xls')):
             return jsonify({"error": "올바른 엑셀 파일이 아닙니다."}), 400
             
-        # 실제 구현시에는 파일 저장 및 DB에 엑셀 파일 정보 저장
-        # 임시 응답
+        # 작업 프로세스가 읽을 수 있도록 임시 파일로 저장 (가져오기에 성공하면 작업에서 삭제)
+        fd, file_path = tempfile.mkstemp(prefix='excel_import_', suffix=os.path.splitext(file.filename)[1])
+        with os.fdopen(fd, 'wb') as f:
+            file.save(f)
+        
+        job_id = job_queue.enqueue('excel_import', {"file_path": file_path, "name": name})
         excel_file = {
-            "id": 1,
             "name": name,
             "description": description,
             "file_path": f"excel/{file.filename}",
             "created_at": datetime.now().isoformat()
         }
-        
-        return jsonify({
-            "message": "엑셀 파일이 업로드되었습니다.",
-            "excel_file": excel_file
-        }), 201
+        return _job_accepted(job_id, "엑셀 파일이 업로드되었습니다. 가져오기 작업이 등록되었습니다.",
+                             excel_file=excel_file)
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1006,5 +1525,15 @@ if __name__ == '__main__':
     # 서버 시작 시 데이터베이스 초기화
     init_db()
     
+    # 작업 프로세스 시작 (ALLONEFLOW_JOB_WORKERS=0이면 python -m jobs.worker로 따로 실행)
+    job_workers = None
+    worker_count = int(os.environ.get('ALLONEFLOW_JOB_WORKERS', 2))
+    if worker_count > 0:
+        job_workers = JobWorkerPool(engine.url.render_as_string(hide_password=False), worker_count).start()
+    
     logger.info("Starting server...")
-    app.run(host='0.0.0.0', port=80, debug=False) 
\ No newline at end of file
+    try:
+        app.run(host='0.0.0.0', port=80, debug=False)
+    finally:
+        if job_workers:
+            job_workers.stop()
\ No newline at end of file
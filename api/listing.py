@@ -0,0 +1,126 @@
+"""
+목록 API 공통 처리: 키셋(커서) 페이지네이션, 필드 선택, 컬럼 전용 조회, ETag
+
+요청 파라미터:
+    fields  반환할 필드 목록 (쉼표 구분, 생략 시 전체)
+    sort    정렬 기준 필드 (고유 값 필드만 허용, 생략 시 첫 번째 허용 필드)
+    limit   한 번에 반환할 최대 행 수 (생략 시 전체)
+    cursor  이전 응답의 X-Next-Cursor 헤더 값
+
+응답 본문은 기존과 같은 JSON 배열이며, 다음 페이지가 있으면 X-Next-Cursor와
+Link(rel="next") 헤더로 커서를 알려줍니다. If-None-Match가 ETag와 같으면 304를 반환합니다.
+"""
+import base64
+import enum
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+from flask import jsonify, request
+from sqlalchemy.orm import Session
+
+MAX_LIMIT = 1000
+
+def encode_cursor(sort: str, value: Any) -> str:
+    """정렬 필드와 마지막 행의 값을 불투명한 커서 문자열로 만듭니다."""
+    payload = json.dumps([sort, value], ensure_ascii=False, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, sort: str) -> Any:
+    """커서 문자열에서 마지막 행의 값을 꺼냅니다."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, TypeError):
+        raise ValueError("cursor 값이 올바르지 않습니다.")
+    if cursor_sort != sort:
+        raise ValueError("cursor와 sort가 일치하지 않습니다.")
+    return value
+
+def serialize_value(value: Any) -> Any:
+    """컬럼 값을 JSON 값으로 변환합니다."""
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def parse_list_params(fields: Dict[str, Any], sort_fields: Tuple[str, ...],
+                      extra_fields: Tuple[str, ...] = ()) -> dict:
+    """
+    fields/sort/limit/cursor 요청 파라미터를 검증합니다. (잘못된 값은 ValueError)
+
+    extra_fields는 컬럼이 아닌 필드(엔드포인트에서 따로 채우는 필드)의 이름입니다.
+    """
+    available = list(fields) + list(extra_fields)
+    requested = request.args.get('fields')
+    if requested:
+        selected = list(dict.fromkeys(name.strip() for name in requested.split(',') if name.strip()))
+        unknown = [name for name in selected if name not in available]
+        if unknown:
+            raise ValueError(f"알 수 없는 필드입니다: {', '.join(unknown)}")
+    else:
+        selected = available
+
+    sort = request.args.get('sort', sort_fields[0])
+    if sort not in sort_fields:
+        raise ValueError(f"sort는 {', '.join(sort_fields)} 중 하나여야 합니다.")
+
+    limit = request.args.get('limit', type=int)
+    if limit is not None and not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f"limit은 1~{MAX_LIMIT} 사이여야 합니다.")
+
+    cursor = request.args.get('cursor')
+    return {
+        "selected": selected,
+        "sort": sort,
+        "limit": limit,
+        "after": decode_cursor(cursor, sort) if cursor else None
+    }
+
+def keyset_page(session: Session, fields: Dict[str, Any], params: dict,
+                filters: Iterable = ()) -> Tuple[List[dict], Optional[str]]:
+    """
+    선택한 컬럼만 조회하여(ORM 객체 생성 없이) 한 페이지의 행과 다음 커서를 반환합니다.
+
+    Args:
+        session (Session): 데이터베이스 세션
+        fields (Dict[str, Any]): 응답 필드 이름 → 컬럼
+        params (dict): parse_list_params 결과
+        filters (Iterable): 추가 조회 조건
+
+    Returns:
+        Tuple[List[dict], Optional[str]]: 행 목록, 다음 페이지 커서 (없으면 None)
+    """
+    selected = list(dict.fromkeys(name for name in params["selected"] if name in fields))
+    sort, limit = params["sort"], params["limit"]
+    sort_column = fields[sort]
+
+    # 커서 계산을 위해 정렬 필드는 항상 조회
+    names = selected if sort in selected else selected + [sort]
+    query = session.query(*[fields[name].label(name) for name in names])\
+        .filter(*filters).order_by(sort_column)
+    if params["after"] is not None:
+        query = query.filter(sort_column > params["after"])
+    if limit is not None:
+        query = query.limit(limit + 1)
+
+    rows = query.all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, serialize_value(getattr(rows[-1], sort)))
+
+    items = [{name: serialize_value(getattr(row, name)) for name in selected} for row in rows]
+    return items, next_cursor
+
+def list_response(items: List[dict], next_cursor: Optional[str] = None):
+    """목록 응답을 만들고 다음 페이지 헤더와 ETag(조건부 요청 시 304)를 설정합니다."""
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.path}?{urlencode(args)}>; rel="next"'
+    response.add_etag()
+    return response.make_conditional(request)
@@ -166,6 +166,10 @@ function closeFiscalYear(id) {
         if (data.error) {
             throw new Error(data.error);
         }
+        showToast('회계연도 마감을 진행 중입니다.');
+        return waitForJob(data.job_id);
+    })
+    .then(() => {
         showToast('회계연도가 성공적으로 마감되었습니다.');
         loadFiscalYears();
     })
@@ -448,6 +452,25 @@ function getAccountTypeDisplayName(type) {
     return typeMap[type] || type;
 }
 
+// 백그라운드 작업이 끝날 때까지 상태를 조회하고 결과를 반환
+function waitForJob(jobId, interval = 1000) {
+    return fetch(`${API_BASE_URL}/api/jobs/${jobId}`)
+        .then(response => response.json())
+        .then(job => {
+            if (job.error && job.status !== 'FAILED') {
+                throw new Error(job.error);
+            }
+            if (job.status === 'SUCCEEDED') {
+                return job.result;
+            }
+            if (job.status === 'FAILED') {
+                throw new Error(job.error || '작업이 실패했습니다.');
+            }
+            return new Promise(resolve => setTimeout(resolve, interval))
+                .then(() => waitForJob(jobId, interval));
+        });
+}
+
 // 토스트 메시지 표시
 function showToast(message, isError = false) {
     const toast = document.getElementById('toast');
@@ -903,6 +926,10 @@ function uploadExcelFile() {
         if (data.error) {
             throw new Error(data.error);
         }
+        showToast('엑셀 파일을 가져오는 중입니다.');
+        return waitForJob(data.job_id);
+    })
+    .then(() => {
         showToast('엑셀 파일이 성공적으로 업로드되었습니다.');
         document.getElementById('excel-name').value = '';
         document.getElementById('excel-description').value = '';
@@ -0,0 +1,143 @@
+"""
+읽기/쓰기가 섞인 동시 API 요청 처리량을 기본 엔진과 설정 엔진(WAL, pragma, 연결 풀)으로 비교하는 벤치마크
+
+사용 예:
+    python -m benchmarks.api_concurrency --threads 16 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, insert
+from database.config import create_db_engine
+from database.models import Account, AccountType
+import api.app as api_app
+
+READ_PATHS = [
+    '/api/accounts',
+    '/api/trial-balance?start_date=2024-01-01&end_date=2024-12-31&granularity=quarter',
+    '/api/financial-statements?start_date=2024-01-01&end_date=2024-12-31',
+]
+
+def prepare_database(engine, account_count: int, entry_count: int, seed: int = 42) -> list:
+    """API 엔진을 교체하고 계정과목과 전표를 생성합니다. 생성된 계정과목 ID 목록을 반환합니다."""
+    api_app.engine = engine
+    api_app.Session.configure(bind=engine)
+    api_app.init_db()
+
+    types = [AccountType.ASSET, AccountType.LIABILITY, AccountType.REVENUE, AccountType.EXPENSE]
+    session = api_app.Session()
+    try:
+        session.execute(insert(Account), [
+            {'code': f'{10000 + i}', 'name': f'계정{i}', 'type': types[i % len(types)]}
+            for i in range(account_count)
+        ])
+        session.commit()
+        account_ids = [account.id for account in session.query(Account.id)]
+    finally:
+        session.close()
+
+    client = api_app.app.test_client()
+    client.post('/api/journal-entries/batch', json={
+        'created_by': 'benchmark',
+        'entries': [random_entry(random.Random(seed + i), account_ids) for i in range(entry_count)]
+    })
+    return account_ids
+
+def random_entry(rng: random.Random, account_ids: list) -> dict:
+    """두 계정 사이의 임의 전표를 만듭니다."""
+    debit_account, credit_account = rng.sample(account_ids, 2)
+    amount = rng.randrange(100, 1000000) / 100
+    return {
+        'entry_date': (datetime(2024, 1, 1) + timedelta(days=rng.randrange(366))).isoformat(),
+        'description': 'benchmark',
+        'created_by': 'benchmark',
+        'lines': [
+            {'account_id': debit_account, 'debit': amount, 'credit': 0},
+            {'account_id': credit_account, 'debit': 0, 'credit': amount}
+        ]
+    }
+
+def run_load(account_ids: list, threads: int, seconds: float, write_ratio: float) -> dict:
+    """여러 스레드에서 읽기/쓰기 요청을 보내고 처리 건수와 지연 시간을 집계합니다."""
+    results = {'read': [], 'write': [], 'errors': 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(number: int):
+        rng = random.Random(number)
+        client = api_app.app.test_client()
+        local = {'read': [], 'write': [], 'errors': 0}
+        while time.perf_counter() < deadline:
+            began = time.perf_counter()
+            if rng.random() < write_ratio:
+                kind = 'write'
+                response = client.post('/api/journal-entries', json=random_entry(rng, account_ids))
+            else:
+                kind = 'read'
+                response = client.get(rng.choice(READ_PATHS))
+            if response.status_code >= 400:
+                local['errors'] += 1
+            else:
+                local[kind].append(time.perf_counter() - began)
+        with lock:
+            results['read'].extend(local['read'])
+            results['write'].extend(local['write'])
+            results['errors'] += local['errors']
+
+    workers = [threading.Thread(target=worker, args=(number,)) for number in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return results
+
+def percentile(values: list, ratio: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="API 동시성 벤치마크")
+    parser.add_argument('--threads', type=int, default=16, help="동시 요청 스레드 수")
+    parser.add_argument('--seconds', type=float, default=10, help="설정별 측정 시간(초)")
+    parser.add_argument('--write-ratio', type=float, default=0.2, help="쓰기 요청 비율")
+    parser.add_argument('--accounts', type=int, default=200, help="생성할 계정과목 수")
+    parser.add_argument('--entries', type=int, default=5000, help="미리 생성할 전표 수")
+    args = parser.parse_args(argv)
+
+    logging.getLogger('api.app').setLevel(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        configurations = [
+            ('기본 엔진', lambda url: create_engine(url)),
+            ('WAL + pragma + 연결 풀', lambda url: create_db_engine(url)),
+        ]
+        for label, factory in configurations:
+            url = f"sqlite:///{os.path.join(temp_dir, f'benchmark_{len(label)}.db')}"
+            engine = factory(url)
+            try:
+                account_ids = prepare_database(engine, args.accounts, args.entries)
+                results = run_load(account_ids, args.threads, args.seconds, args.write_ratio)
+            finally:
+                engine.dispose()
+
+            completed = len(results['read']) + len(results['write'])
+            print(f"{label}: 처리량 {completed / args.seconds:8.1f}건/초 "
+                  f"(읽기 {len(results['read'])}, 쓰기 {len(results['write'])}, 오류 {results['errors']}), "
+                  f"읽기 p95 {percentile(results['read'], 0.95) * 1000:.0f}ms, "
+                  f"쓰기 p95 {percentile(results['write'], 0.95) * 1000:.0f}ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+원장 인덱스 적용 전/후의 쿼리 계획과 보고서 처리 시간을 비교하는 벤치마크
+
+사용 예:
+    python -m benchmarks.ledger_indexes --entries 50000 --accounts 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+from database.models import (
+    Base, Account, AccountType, JournalEntry, JournalLine, FiscalYear, Budget, BudgetType
+)
+from database.migrate import create_missing_indexes
+from accounting.advanced_accounting_manager import AdvancedAccountingManager
+from accounting.period_balance_manager import PeriodBalanceManager
+
+def build_database(db_path: str, entry_count: int, account_count: int, seed: int = 42):
+    """인덱스 없이 합성 원장 데이터베이스를 생성합니다."""
+    engine = create_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(engine)
+
+    # 벤치마크 기준선을 위해 모델에 정의된 보조 인덱스를 제거
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(text(f'DROP INDEX IF EXISTS {index.name}'))
+
+    rng = random.Random(seed)
+    types = [AccountType.ASSET, AccountType.LIABILITY, AccountType.REVENUE, AccountType.EXPENSE]
+    session = sessionmaker(bind=engine)()
+
+    session.execute(insert(Account), [
+        {'id': i, 'code': f'{1000 + i}', 'name': f'계정{i}', 'type': types[i % len(types)]}
+        for i in range(1, account_count + 1)
+    ])
+
+    start = datetime(2023, 1, 1)
+    entries, lines = [], []
+    for entry_id in range(1, entry_count + 1):
+        entry_date = start + timedelta(days=rng.randrange(730))
+        amount = rng.randrange(1000, 1000000)
+        entries.append({'id': entry_id, 'entry_date': entry_date, 'description': '합성 전표',
+                        'created_by': 'benchmark', 'is_posted': True})
+        debit_account, credit_account = rng.sample(range(1, account_count + 1), 2)
+        lines.append({'entry_id': entry_id, 'account_id': debit_account, 'debit': amount, 'credit': 0})
+        lines.append({'entry_id': entry_id, 'account_id': credit_account, 'debit': 0, 'credit': amount})
+
+    session.execute(insert(JournalEntry), entries)
+    session.execute(insert(JournalLine), lines)
+
+    fiscal_year = FiscalYear(year=2024, start_date=datetime(2024, 1, 1),
+                             end_date=datetime(2024, 12, 31, 23, 59, 59))
+    session.add(fiscal_year)
+    session.flush()
+
+    # 월 경계에 맞지 않는 예산 기간으로 라인 직접 조회 경로를 측정
+    session.execute(insert(Budget), [
+        {'fiscal_year_id': fiscal_year.id, 'account_id': account_id, 'type': BudgetType.PROJECT,
+         'period_start': datetime(2024, 2, 10), 'period_end': datetime(2024, 8, 20), 'amount': 1000000}
+        for account_id in range(1, account_count + 1)
+    ])
+    session.commit()
+
+    PeriodBalanceManager().rebuild(session)
+    session.close()
+    return engine
+
+def explain(engine, sql: str) -> list:
+    """SQLite 쿼리 계획을 반환합니다."""
+    with engine.connect() as conn:
+        return [row[-1] for row in conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+
+def run_reports(engine, account_count: int) -> dict:
+    """AdvancedAccountingManager 보고서 처리 시간을 측정합니다."""
+    manager = AdvancedAccountingManager()
+    session = sessionmaker(bind=engine)()
+    timings = {}
+
+    try:
+        began = time.perf_counter()
+        for budget_id in range(1, account_count + 1):
+            manager.analyze_budget_variance(session, budget_id)
+        timings['analyze_budget_variance (전체 예산)'] = time.perf_counter() - began
+
+        began = time.perf_counter()
+        manager.generate_tax_report(session, 'CORPORATE_TAX', datetime(2024, 1, 15), datetime(2024, 6, 20))
+        timings['generate_tax_report (CORPORATE_TAX)'] = time.perf_counter() - began
+
+        began = time.perf_counter()
+        for account_id in range(1, min(account_count, 50) + 1):
+            manager.analyze_account(session, account_id, datetime(2024, 6, 20))
+        timings['analyze_account (50개 계정)'] = time.perf_counter() - began
+    finally:
+        session.rollback()
+        session.close()
+
+    return timings
+
+PLAN_QUERIES = {
+    '계정별 기간 합계': (
+        "SELECT journal_lines.account_id, sum(journal_lines.debit), sum(journal_lines.credit) "
+        "FROM journal_lines JOIN journal_entries ON journal_entries.id = journal_lines.entry_id "
+        "WHERE journal_entries.entry_date >= '2024-02-10' AND journal_entries.entry_date < '2024-03-01' "
+        "AND journal_lines.account_id IN (1, 2, 3) GROUP BY journal_lines.account_id"
+    ),
+    '기간 내 승인 전표': (
+        "SELECT id FROM journal_entries WHERE entry_date >= '2024-01-01' "
+        "AND entry_date <= '2024-01-31' AND is_posted = 1"
+    ),
+    '계정별 예산': "SELECT id FROM budgets WHERE account_id = 1",
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="원장 인덱스 벤치마크")
+    parser.add_argument('--entries', type=int, default=50000, help="생성할 전표 수")
+    parser.add_argument('--accounts', type=int, default=200, help="생성할 계정과목 수")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'benchmark.db')
+        print(f"합성 데이터 생성: 전표 {args.entries}건, 라인 {args.entries * 2}건, 계정 {args.accounts}개")
+        engine = build_database(db_path, args.entries, args.accounts)
+
+        results = {}
+        for label in ('인덱스 적용 전', '인덱스 적용 후'):
+            if label == '인덱스 적용 후':
+                created = create_missing_indexes(engine)
+                with engine.begin() as conn:
+                    conn.execute(text('ANALYZE'))
+                print(f"\n생성된 인덱스: {', '.join(created)}")
+
+            print(f"\n=== {label} ===")
+            for name, sql in PLAN_QUERIES.items():
+                print(f"[{name}]")
+                for step in explain(engine, sql):
+                    print(f"  {step}")
+
+            results[label] = run_reports(engine, args.accounts)
+
+        print("\n=== 처리 시간 (초) ===")
+        before, after = results['인덱스 적용 전'], results['인덱스 적용 후']
+        for name in before:
+            speedup = before[name] / after[name] if after[name] else float('inf')
+            print(f"{name:40s} 전 {before[name]:8.3f}  후 {after[name]:8.3f}  ({speedup:.1f}배)")
+
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
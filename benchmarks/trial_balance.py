@@ -0,0 +1,90 @@
+"""
+월별 시산표 계산 시간을 측정하는 벤치마크
+
+사용 예:
+    python -m benchmarks.trial_balance --accounts 2000 --months 24
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from database.models import Base, Account, AccountType, AccountPeriodBalance
+from accounting.period_balance_manager import PeriodBalanceManager
+from accounting.trial_balance_manager import TrialBalanceManager
+
+def build_database(db_path: str, account_count: int, months: int, seed: int = 42):
+    """계층형 계정과목과 월별 집계 데이터를 가진 합성 데이터베이스를 생성합니다."""
+    engine = create_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(engine)
+
+    rng = random.Random(seed)
+    types = list(AccountType)
+    session = sessionmaker(bind=engine)()
+
+    # 10개 계정마다 하나를 상위 계정으로 두는 2단계 계층
+    session.execute(insert(Account), [
+        {'id': i, 'code': f'{10000 + i}', 'name': f'계정{i}', 'type': types[i % len(types)],
+         'parent_id': None if i % 10 == 1 else i - (i - 1) % 10}
+        for i in range(1, account_count + 1)
+    ])
+
+    # 조회 시작 이전 12개월을 포함해 월별 집계 생성
+    balances = []
+    period = PeriodBalanceManager.period_of(datetime(2022, 1, 1))
+    for _ in range(months + 12):
+        for account_id in range(1, account_count + 1):
+            balances.append({'account_id': account_id, 'period': period,
+                             'debit': rng.randrange(0, 1000000), 'credit': rng.randrange(0, 1000000)})
+        period = PeriodBalanceManager.next_period(period)
+
+    session.execute(insert(AccountPeriodBalance), balances)
+    session.commit()
+    session.close()
+    return engine
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="시산표 벤치마크")
+    parser.add_argument('--accounts', type=int, default=2000, help="생성할 계정과목 수")
+    parser.add_argument('--months', type=int, default=24, help="시산표 월 수")
+    parser.add_argument('--repeat', type=int, default=5, help="반복 측정 횟수")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, 'benchmark.db')
+        print(f"합성 데이터 생성: 계정 {args.accounts}개, 월별 집계 {args.accounts * (args.months + 12)}행")
+        engine = build_database(db_path, args.accounts, args.months)
+
+        manager = TrialBalanceManager()
+        start = datetime(2023, 1, 1)
+        end_period = start.year * 100 + start.month
+        for _ in range(args.months - 1):
+            end_period = PeriodBalanceManager.next_period(end_period)
+        end = datetime(end_period // 100, end_period % 100, 28)
+
+        session = sessionmaker(bind=engine)()
+        try:
+            for granularity, rollup in (('month', False), ('month', True), ('quarter', True), ('year', True)):
+                timings = []
+                for _ in range(args.repeat):
+                    began = time.perf_counter()
+                    result = manager.generate_trial_balance(session, start, end, granularity, rollup)
+                    timings.append(time.perf_counter() - began)
+                label = f"{granularity} / rollup={rollup}"
+                print(f"{label:25s} 열 {len(result['periods']):3d}개, 계정 {len(result['accounts'])}개: "
+                      f"최소 {min(timings):.3f}초, 평균 {sum(timings) / len(timings):.3f}초")
+        finally:
+            session.close()
+            engine.dispose()
+
+if __name__ == '__main__':
+    main()
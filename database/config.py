@@ -0,0 +1,156 @@
+"""
+데이터베이스 엔진 설정
+
+기본값은 프로젝트 루트의 SQLite 파일이며, 환경 변수로 다른 데이터베이스(PostgreSQL 등)와
+연결 풀 크기를 지정할 수 있습니다.
+
+환경 변수:
+    ALLONEFLOW_DATABASE_URL      SQLAlchemy 데이터베이스 URL (예: postgresql+psycopg2://user:pw@host/aof)
+    ALLONEFLOW_DB_POOL_SIZE      연결 풀 크기 (기본 10)
+    ALLONEFLOW_DB_MAX_OVERFLOW   풀 크기를 넘어 추가로 열 수 있는 연결 수 (기본 20)
+    ALLONEFLOW_DB_POOL_TIMEOUT   연결을 기다리는 최대 시간(초) (기본 30)
+    ALLONEFLOW_DB_BUSY_TIMEOUT   SQLite 잠금 대기 시간(밀리초) (기본 5000)
+"""
+import os
+import threading
+import time
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+
+DATABASE_URL_ENV = 'ALLONEFLOW_DATABASE_URL'
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alloneflow.db')
+
+# SQLite 연결마다 적용하는 설정
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',       # 쓰기 중에도 읽기가 막히지 않도록 WAL 사용
+    'synchronous': 'NORMAL',     # WAL에서는 NORMAL로도 커밋 후 손상되지 않음
+    'cache_size': -64000,        # 페이지 캐시 64MB (음수는 KB 단위)
+    'mmap_size': 268435456,      # 256MB 메모리 매핑 읽기
+    'temp_store': 'MEMORY',
+}
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def database_url(db_path: Optional[str] = None) -> str:
+    """환경 변수에 지정된 URL 또는 SQLite 파일 URL을 반환합니다."""
+    return os.environ.get(DATABASE_URL_ENV) or f'sqlite:///{db_path or DEFAULT_DB_PATH}'
+
+def create_db_engine(url: Optional[str] = None, **kwargs) -> Engine:
+    """
+    설정이 적용된 데이터베이스 엔진을 생성합니다.
+
+    SQLite 파일에는 WAL 저널, synchronous/cache_size/mmap_size 설정과 잠금 대기 시간을
+    적용하고, 여러 스레드가 연결을 나눠 쓸 수 있도록 연결 풀을 구성합니다.
+    그 밖의 데이터베이스(PostgreSQL 등)에는 연결 풀과 연결 확인(pre-ping)을 적용합니다.
+
+    Args:
+        url (Optional[str]): 데이터베이스 URL (None이면 database_url())
+        **kwargs: create_engine에 그대로 전달할 추가 인자
+
+    Returns:
+        Engine: 데이터베이스 엔진
+    """
+    url = make_url(url or database_url())
+    options = {
+        'pool_size': _env_int('ALLONEFLOW_DB_POOL_SIZE', 10),
+        'max_overflow': _env_int('ALLONEFLOW_DB_MAX_OVERFLOW', 20),
+        'pool_timeout': _env_int('ALLONEFLOW_DB_POOL_TIMEOUT', 30),
+    }
+
+    if url.get_backend_name() != 'sqlite':
+        options.update(pool_pre_ping=True, pool_recycle=1800)
+        options.update(kwargs)
+        return create_engine(url, **options)
+
+    if url.database in (None, '', ':memory:'):
+        # 메모리 데이터베이스는 연결마다 별도 데이터베이스이므로 기본 설정 사용
+        return create_engine(url, **kwargs)
+
+    busy_timeout = _env_int('ALLONEFLOW_DB_BUSY_TIMEOUT', 5000)
+    options['connect_args'] = {'timeout': busy_timeout / 1000, 'check_same_thread': False}
+    options.update(kwargs)
+    engine = create_engine(url, **options)
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f'PRAGMA busy_timeout = {busy_timeout}')
+            for name, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
+
+    return engine
+
+class PoolMetrics:
+    """
+    연결 풀의 연결 대여(checkout)/반납(checkin) 횟수와 사용 중인 연결 수를 집계하는 클래스
+
+    반납되지 않고 쌓이는 연결(세션 누수)은 checked_out과 peak_checked_out으로 확인할 수 있습니다.
+    """
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.total_hold_seconds = 0.0
+        self.max_hold_seconds = 0.0
+
+        event.listen(engine, 'connect', self._on_connect)
+        event.listen(engine, 'checkout', self._on_checkout)
+        event.listen(engine, 'checkin', self._on_checkin)
+        event.listen(engine, 'invalidate', self._on_invalidate)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.perf_counter()
+        with self._lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop('checked_out_at', None)
+        with self._lock:
+            self.checkins += 1
+            if checked_out_at is not None:
+                self.checked_out -= 1
+                held = time.perf_counter() - checked_out_at
+                self.total_hold_seconds += held
+                self.max_hold_seconds = max(self.max_hold_seconds, held)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        """현재까지의 집계 값을 반환합니다."""
+        with self._lock:
+            returned = self.checkins
+            return {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "checked_out": self.checked_out,
+                "peak_checked_out": self.peak_checked_out,
+                "avg_hold_ms": self.total_hold_seconds / returned * 1000 if returned else 0.0,
+                "max_hold_ms": self.max_hold_seconds * 1000,
+                "pool_status": self.engine.pool.status()
+            }
+
+def attach_pool_metrics(engine: Engine) -> PoolMetrics:
+    """엔진의 연결 풀에 대여/반납 집계를 연결합니다."""
+    return PoolMetrics(engine)
@@ -0,0 +1,244 @@
+"""
+기존 AllOneFlow 데이터베이스를 현재 모델 정의에 맞게 갱신하는 명령행 도구
+
+사용 예:
+    python -m database.migrate indexes
+    python -m database.migrate --db /var/www/aof/alloneflow.db indexes
+    python -m database.migrate rebuild-balances
+    python -m database.migrate rebuild-closure
+    python -m database.migrate rebuild-cash-flows
+    python -m database.migrate money
+"""
+import argparse
+import logging
+import os
+from typing import List
+from sqlalchemy import Integer, create_engine, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+from database.config import DATABASE_URL_ENV
+from database.models import Base
+from database.money import Money, MINOR_UNITS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'alloneflow.db')
+
+def create_missing_tables(engine: Engine) -> List[str]:
+    """
+    모델에 정의되어 있지만 데이터베이스에 없는 테이블을 생성합니다.
+
+    Args:
+        engine (Engine): 데이터베이스 엔진
+
+    Returns:
+        List[str]: 생성된 테이블 이름 목록
+    """
+    existing = set(inspect(engine).get_table_names())
+    missing = [table for table in Base.metadata.sorted_tables if table.name not in existing]
+    Base.metadata.create_all(engine, tables=missing)
+    return [table.name for table in missing]
+
+def create_missing_indexes(engine: Engine) -> List[str]:
+    """
+    기존 테이블에 누락된 인덱스를 생성합니다. 데이터는 변경하지 않습니다.
+
+    Args:
+        engine (Engine): 데이터베이스 엔진
+
+    Returns:
+        List[str]: 생성된 인덱스 이름 목록
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_indexes = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name in existing_indexes:
+                continue
+            index.create(bind=engine)
+            created.append(index.name)
+            logger.info(f"인덱스 생성: {table.name}.{index.name}")
+
+    return created
+
+def create_missing_columns(engine: Engine) -> List[str]:
+    """
+    기존 테이블에 누락된 NULL 허용 컬럼을 추가합니다. (ALTER TABLE ... ADD COLUMN)
+
+    NOT NULL 컬럼과 기본 키 컬럼은 기존 행을 채울 값이 없으므로 추가하지 않습니다.
+
+    Args:
+        engine (Engine): 데이터베이스 엔진
+
+    Returns:
+        List[str]: 추가된 컬럼 목록 (테이블.컬럼)
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns or not column.nullable or column.primary_key:
+                continue
+            column_type = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+            added.append(f"{table.name}.{column.name}")
+            logger.info(f"컬럼 추가: {table.name}.{column.name}")
+
+    return added
+
+def migrate_money_columns(engine: Engine) -> List[str]:
+    """
+    실수(REAL/FLOAT)로 저장된 금액 컬럼을 최소 단위 정수(BIGINT)로 변환합니다.
+
+    이미 정수형인 컬럼은 건너뛰므로 여러 번 실행해도 안전합니다. SQLite는 컬럼 타입을
+    변경할 수 없으므로 테이블을 새로 만들어 데이터를 옮기고, PostgreSQL은
+    ALTER COLUMN ... USING으로 변환합니다.
+
+    Args:
+        engine (Engine): 데이터베이스 엔진
+
+    Returns:
+        List[str]: 변환된 '테이블.컬럼' 목록
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    converted = []
+
+    for table in Base.metadata.sorted_tables:
+        money_columns = [column.name for column in table.columns if isinstance(column.type, Money)]
+        if not money_columns or table.name not in existing_tables:
+            continue
+
+        column_types = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+        pending = [name for name in money_columns
+                   if name in column_types and not isinstance(column_types[name], Integer)]
+        if not pending:
+            continue
+
+        if engine.dialect.name == 'sqlite':
+            _rebuild_sqlite_money_table(engine, table, pending)
+        elif engine.dialect.name == 'postgresql':
+            with engine.begin() as conn:
+                for name in pending:
+                    conn.exec_driver_sql(
+                        f'ALTER TABLE {table.name} ALTER COLUMN {name} TYPE BIGINT '
+                        f'USING ROUND({name} * {MINOR_UNITS})::BIGINT'
+                    )
+        else:
+            raise NotImplementedError(f"지원하지 않는 데이터베이스입니다: {engine.dialect.name}")
+
+        converted.extend(f'{table.name}.{name}' for name in pending)
+        logger.info(f"금액 컬럼 변환: {table.name} ({', '.join(pending)})")
+
+    return converted
+
+def _rebuild_sqlite_money_table(engine: Engine, table, pending: List[str]) -> None:
+    """SQLite 테이블을 현재 모델 정의로 다시 만들면서 금액 컬럼을 최소 단위 정수로 옮깁니다."""
+    temp_name = f'_{table.name}_money'
+    temp_table = table.to_metadata(Base.metadata, name=temp_name)
+    columns = [column.name for column in table.columns]
+    select_list = ', '.join(
+        f'CAST(ROUND({name} * {MINOR_UNITS}) AS INTEGER)' if name in pending else name
+        for name in columns
+    )
+
+    try:
+        with engine.connect() as conn:
+            # 테이블 교체 중 다른 테이블의 외래 키 참조가 검사되지 않도록 비활성화
+            conn.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            conn.commit()
+            with conn.begin():
+                conn.execute(CreateTable(temp_table))
+                conn.exec_driver_sql(
+                    f'INSERT INTO {temp_name} ({", ".join(columns)}) '
+                    f'SELECT {select_list} FROM {table.name}'
+                )
+                conn.exec_driver_sql(f'DROP TABLE {table.name}')
+                conn.exec_driver_sql(f'ALTER TABLE {temp_name} RENAME TO {table.name}')
+                for index in table.indexes:
+                    index.create(bind=conn)
+    finally:
+        Base.metadata.remove(temp_table)
+
+def rebuild_period_balances(engine: Engine) -> int:
+    """월별 잔액 집계 테이블을 전표 라인으로부터 다시 생성합니다."""
+    from accounting.period_balance_manager import PeriodBalanceManager
+
+    session = sessionmaker(bind=engine)()
+    try:
+        return PeriodBalanceManager().rebuild(session)
+    finally:
+        session.close()
+
+def rebuild_account_closure(engine: Engine) -> int:
+    """계정과목 계층 클로저 테이블을 Account.parent_id로부터 다시 생성합니다."""
+    from accounting.account_hierarchy_manager import AccountHierarchyManager
+
+    session = sessionmaker(bind=engine)()
+    try:
+        return AccountHierarchyManager().rebuild(session)
+    finally:
+        session.close()
+
+def rebuild_cash_flows(engine: Engine) -> int:
+    """현금흐름 분류를 지우고 전체 전표를 다시 분류합니다. (중복 저장된 행 정리)"""
+    from accounting.cash_flow_manager import CashFlowManager
+
+    session = sessionmaker(bind=engine)()
+    try:
+        return CashFlowManager().rebuild(session)
+    finally:
+        session.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AllOneFlow 데이터베이스 마이그레이션 도구")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite 데이터베이스 파일 경로")
+    parser.add_argument('--url', default=os.environ.get(DATABASE_URL_ENV),
+                        help=f"SQLAlchemy 데이터베이스 URL (지정 시 --db 무시, 기본값: ${DATABASE_URL_ENV})")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('indexes', help="누락된 테이블, 컬럼과 인덱스를 생성합니다.")
+    subparsers.add_parser('rebuild-balances', help="월별 잔액 집계를 다시 생성합니다.")
+    subparsers.add_parser('rebuild-closure', help="계정과목 계층 클로저를 다시 생성합니다.")
+    subparsers.add_parser('rebuild-cash-flows', help="현금흐름 분류를 다시 생성합니다.")
+    subparsers.add_parser('money', help="실수 금액 컬럼을 최소 단위 정수로 변환합니다.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    engine = create_engine(args.url or f'sqlite:///{args.db}')
+
+    if args.command == 'indexes':
+        tables = create_missing_tables(engine)
+        columns = create_missing_columns(engine)
+        indexes = create_missing_indexes(engine)
+        print(f"생성된 테이블: {', '.join(tables) or '없음'}")
+        print(f"추가된 컬럼: {', '.join(columns) or '없음'}")
+        print(f"생성된 인덱스: {', '.join(indexes) or '없음'}")
+    elif args.command == 'rebuild-balances':
+        count = rebuild_period_balances(engine)
+        print(f"월별 잔액 집계 {count}건을 생성했습니다.")
+    elif args.command == 'rebuild-closure':
+        count = rebuild_account_closure(engine)
+        print(f"계정과목 계층 클로저 {count}건을 생성했습니다.")
+    elif args.command == 'rebuild-cash-flows':
+        count = rebuild_cash_flows(engine)
+        print(f"현금흐름 {count}건을 생성했습니다.")
+    elif args.command == 'money':
+        columns = migrate_money_columns(engine)
+        print(f"변환된 금액 컬럼: {', '.join(columns) or '없음'}")
+
+if __name__ == '__main__':
+    main()
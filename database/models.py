@@ -1,8 +1,9 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Enum, UniqueConstraint, Index, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
 from datetime import datetime
+from database.money import Money
 
 Base = declarative_base()
 
@@ -21,7 +22,7 @@ class Account(Base):
     name = Column(String(100), nullable=False)
     type = Column(Enum(AccountType), nullable=False)
     description = Column(String(500))
-    parent_id = Column(Integer, ForeignKey('accounts.id'))
+    parent_id = Column(Integer, ForeignKey('accounts.id'), index=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -31,30 +32,82 @@ class Account(Base):
 
 class JournalEntry(Base):
     __tablename__ = 'journal_entries'
+    __table_args__ = (
+        Index('ix_journal_entries_entry_date_is_posted', 'entry_date', 'is_posted'),
+    )
     
     id = Column(Integer, primary_key=True)
     entry_date = Column(DateTime, nullable=False)
     description = Column(String(500))
     is_posted = Column(Boolean, default=False)
     created_by = Column(String(100), nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     approved_by = Column(String(100))
     
     lines = relationship("JournalLine", back_populates="entry")
 
 class JournalLine(Base):
     __tablename__ = 'journal_lines'
+    __table_args__ = (
+        # 계정별 합계 조회가 테이블을 읽지 않도록 금액 컬럼까지 포함하는 커버링 인덱스
+        Index('ix_journal_lines_account_covering', 'account_id', 'entry_id', 'debit', 'credit'),
+        Index('ix_journal_lines_entry_id', 'entry_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     entry_id = Column(Integer, ForeignKey('journal_entries.id'), nullable=False)
     account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
-    debit = Column(Float, default=0)
-    credit = Column(Float, default=0)
+    debit = Column(Money, default=0)
+    credit = Column(Money, default=0)
     description = Column(String(500))
     
     entry = relationship("JournalEntry", back_populates="lines")
     account = relationship("Account", back_populates="journal_lines")
 
+class AccountPeriodBalance(Base):
+    __tablename__ = 'account_period_balances'
+    __table_args__ = (
+        UniqueConstraint('account_id', 'period', name='uq_account_period_balances_account_period'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
+    period = Column(Integer, nullable=False)  # YYYYMM (예: 202403)
+    debit = Column(Money, default=0)
+    credit = Column(Money, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    account = relationship("Account")
+
+class AccountBalanceSnapshot(Base):
+    """계정과목별 월말 누적 잔액(차변 - 대변) 스냅샷"""
+    __tablename__ = 'account_balance_snapshots'
+    __table_args__ = (
+        UniqueConstraint('account_id', 'period', name='uq_account_balance_snapshots_account_period'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
+    period = Column(Integer, nullable=False)  # YYYYMM (해당 월말 기준)
+    balance = Column(Money, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    account = relationship("Account")
+
+class AccountClosure(Base):
+    """계정과목 계층의 모든 (상위, 하위) 쌍 (자기 자신 포함, depth=0)"""
+    __tablename__ = 'account_closures'
+    __table_args__ = (
+        Index('ix_account_closures_descendant_id', 'descendant_id'),
+    )
+
+    ancestor_id = Column(Integer, ForeignKey('accounts.id'), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey('accounts.id'), primary_key=True)
+    depth = Column(Integer, nullable=False)  # 상위 계정에서 하위 계정까지의 거리
+
+    ancestor = relationship("Account", foreign_keys=[ancestor_id])
+    descendant = relationship("Account", foreign_keys=[descendant_id])
+
 class FiscalYear(Base):
     __tablename__ = 'fiscal_years'
     
@@ -74,6 +127,10 @@ class BudgetType(enum.Enum):
 
 class Budget(Base):
     __tablename__ = 'budgets'
+    __table_args__ = (
+        Index('ix_budgets_account_id_period', 'account_id', 'period_start', 'period_end'),
+        Index('ix_budgets_fiscal_year_id', 'fiscal_year_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     fiscal_year_id = Column(Integer, ForeignKey('fiscal_years.id'), nullable=False)
@@ -81,7 +138,7 @@ class Budget(Base):
     type = Column(Enum(BudgetType), nullable=False)
     period_start = Column(DateTime, nullable=False)
     period_end = Column(DateTime, nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     description = Column(String(500))
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -102,27 +159,65 @@ class CostAllocation(Base):
     __tablename__ = 'cost_allocations'
     
     id = Column(Integer, primary_key=True)
-    journal_line_id = Column(Integer, ForeignKey('journal_lines.id'), nullable=False)
+    journal_line_id = Column(Integer, ForeignKey('journal_lines.id'), nullable=False, index=True)
     cost_center_id = Column(Integer, ForeignKey('cost_centers.id'), nullable=False)
     ratio = Column(Float, nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     journal_line = relationship("JournalLine")
     cost_center = relationship("CostCenter")
 
+class AllocationRule(Base):
+    """원가 배부 규칙 (계정과목 또는 계정코드 범위별 원가 중심점 배부 비율)"""
+    __tablename__ = 'allocation_rules'
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), unique=True, nullable=False)
+    account_id = Column(Integer, ForeignKey('accounts.id'))
+    account_code_from = Column(String(10))  # 계정코드 범위 시작 (포함)
+    account_code_to = Column(String(10))    # 계정코드 범위 끝 (포함)
+    description = Column(String(500))
+    is_active = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    account = relationship("Account")
+    items = relationship("AllocationRuleItem", back_populates="rule", order_by="AllocationRuleItem.id")
+
+class AllocationRuleItem(Base):
+    __tablename__ = 'allocation_rule_items'
+    __table_args__ = (
+        UniqueConstraint('rule_id', 'cost_center_id', name='uq_allocation_rule_items_rule_cost_center'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    rule_id = Column(Integer, ForeignKey('allocation_rules.id'), nullable=False)
+    cost_center_id = Column(Integer, ForeignKey('cost_centers.id'), nullable=False)
+    ratio = Column(Float, nullable=False)
+    
+    rule = relationship("AllocationRule", back_populates="items")
+    cost_center = relationship("CostCenter")
+
 class CashFlow(Base):
     __tablename__ = 'cash_flows'
     
     id = Column(Integer, primary_key=True)
-    entry_id = Column(Integer, ForeignKey('journal_entries.id'), nullable=False)
+    entry_id = Column(Integer, ForeignKey('journal_entries.id'), nullable=False, index=True)
     type = Column(String(50), nullable=False)  # OPERATING, INVESTING, FINANCING
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)  # 현금 순증감 (유입 +, 유출 -)
     description = Column(String(500))
     created_at = Column(DateTime, default=datetime.utcnow)
     
     entry = relationship("JournalEntry")
 
+class ProcessingWatermark(Base):
+    """증분 처리 작업의 마지막 처리 위치 (예: 현금흐름 분류를 마친 마지막 전표 ID)"""
+    __tablename__ = 'processing_watermarks'
+    
+    name = Column(String(50), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class TaxReport(Base):
     __tablename__ = 'tax_reports'
     
@@ -130,7 +225,7 @@ class TaxReport(Base):
     report_type = Column(String(50), nullable=False)  # VAT, CORPORATE_TAX
     period_start = Column(DateTime, nullable=False)
     period_end = Column(DateTime, nullable=False)
-    total_amount = Column(Float, nullable=False)
+    total_amount = Column(Money, nullable=False)
     status = Column(String(50), default="DRAFT")  # DRAFT, SUBMITTED, APPROVED
     submitted_at = Column(DateTime)
     submitted_by = Column(String(100))
@@ -142,9 +237,32 @@ class AccountAnalysis(Base):
     id = Column(Integer, primary_key=True)
     account_id = Column(Integer, ForeignKey('accounts.id'), nullable=False)
     analysis_date = Column(DateTime, nullable=False)
-    balance = Column(Float, nullable=False)
+    balance = Column(Money, nullable=False)
     trend = Column(String(50))  # INCREASING, DECREASING, STABLE
     variance_percentage = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    account = relationship("Account") 
\ No newline at end of file
+    account = relationship("Account") 
+
+class Job(Base):
+    """백그라운드 작업 큐의 작업 (작업 프로세스가 QUEUED 작업을 가져가 실행)"""
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        Index('ix_jobs_status_id', 'status', 'id'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    type = Column(String(50), nullable=False)  # close_fiscal_year, cash_flow_statement, tax_report, excel_import
+    status = Column(String(20), nullable=False, default="QUEUED")  # QUEUED, RUNNING, SUCCEEDED, FAILED
+    params = Column(Text)  # JSON
+    progress = Column(Float, default=0.0)  # 0.0 ~ 1.0
+    progress_message = Column(String(200))
+    result = Column(Text)  # JSON
+    error = Column(Text)
+    attempts = Column(Integer, default=0)
+    worker = Column(String(100))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    heartbeat_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    checkpoint = Column(Text)  # JSON (작업이 데이터와 함께 커밋한 재개 지점, 다시 실행될 때 이어서 처리)
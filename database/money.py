@@ -0,0 +1,90 @@
+"""
+금액을 정수 최소 단위(1/100)로 저장하는 고정소수점 타입과 변환 함수
+
+데이터베이스에는 BIGINT(최소 단위 정수)로 저장하고, 파이썬에서는 Decimal로 다룹니다.
+합계와 비교가 정확하므로 부동소수점 오차 허용 범위가 필요 없습니다.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Iterable, List, Union
+import numpy as np
+from sqlalchemy import BigInteger, bindparam
+from sqlalchemy.types import TypeDecorator
+
+MINOR_UNIT_EXPONENT = 2
+MINOR_UNITS = 10 ** MINOR_UNIT_EXPONENT
+
+Amount = Union[Decimal, int, float, str]
+
+def to_decimal(value: Amount) -> Decimal:
+    """금액을 최소 단위로 반올림한 Decimal로 변환합니다. (None은 0)"""
+    return from_minor(to_minor(value))
+
+def to_minor(value: Amount) -> int:
+    """금액을 최소 단위 정수로 변환합니다. (반올림: ROUND_HALF_UP)"""
+    if value is None:
+        return 0
+    if isinstance(value, (int, np.integer)) and not isinstance(value, bool):
+        return int(value) * MINOR_UNITS
+    if not isinstance(value, Decimal):
+        # float는 repr 표현 그대로 해석하여 2진 오차를 제거
+        value = Decimal(repr(float(value))) if isinstance(value, (float, np.floating)) else Decimal(str(value).strip())
+    return int(value.scaleb(MINOR_UNIT_EXPONENT).to_integral_value(rounding=ROUND_HALF_UP))
+
+def from_minor(minor: int) -> Decimal:
+    """최소 단위 정수를 Decimal 금액으로 변환합니다."""
+    return Decimal(int(minor)).scaleb(-MINOR_UNIT_EXPONENT)
+
+def to_minor_array(values: Iterable[Amount]) -> np.ndarray:
+    """금액 목록을 최소 단위 int64 배열로 변환합니다."""
+    return np.fromiter((to_minor(value) for value in values), dtype=np.int64)
+
+def float_array_to_minor(values: np.ndarray) -> np.ndarray:
+    """
+    실수 금액 배열을 최소 단위 int64 배열로 변환합니다. (벡터 연산, 반올림: ROUND_HALF_UP)
+
+    1.005 * 100 = 100.49999...처럼 2진 표현 오차가 반올림 결과를 바꾸지 않도록
+    소수 6자리에서 먼저 정리한 뒤 반올림합니다.
+    """
+    scaled = np.round(np.asarray(values, dtype=np.float64) * MINOR_UNITS, 6)
+    return (np.sign(scaled) * np.floor(np.abs(scaled) + 0.5)).astype(np.int64)
+
+def minor_bindparam(name: str):
+    """
+    Money 컬럼에 최소 단위 정수를 그대로 넣기 위한 바인드 파라미터를 만듭니다.
+
+    대량 삽입에서 Decimal 변환을 건너뛰기 위해 사용합니다.
+    예: JournalLine.__table__.insert().values(debit=minor_bindparam('debit'))
+    """
+    return bindparam(name, type_=BigInteger)
+
+def from_minor_array(minors: np.ndarray) -> List[Decimal]:
+    """최소 단위 int64 배열을 Decimal 금액 목록으로 변환합니다."""
+    return [from_minor(minor) for minor in minors.tolist()]
+
+class Money(TypeDecorator):
+    """
+    금액 컬럼 타입 (BIGINT 최소 단위 저장, Decimal 반환)
+
+    Decimal, int, float, str 금액을 받아 최소 단위 정수로 저장합니다.
+    func.sum 등의 집계 결과도 같은 타입으로 처리되어 Decimal로 반환됩니다.
+    정수가 아닌 값을 읽으면(변환 전 REAL 컬럼의 원 단위 금액) ValueError를 발생시킵니다.
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_minor(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # 실수는 변환 전 REAL 컬럼의 원 단위 금액이므로 최소 단위로 읽으면 100배 오차가 남
+        if isinstance(value, float) or (isinstance(value, Decimal) and value != value.to_integral_value()):
+            raise ValueError(f"금액 컬럼에 정수가 아닌 값이 있습니다: {value!r} "
+                             f"(python -m database.migrate money로 변환 필요)")
+        return from_minor(int(value))
+
+    def coerce_compared_value(self, op, value):
+        return self
@@ -48,15 +48,19 @@ class ERPConnector:
             self.logger.error(f"거래 내역 조회 중 오류 발생: {str(e)}")
             raise
     
-    def sync_transactions(self, db_session: Session, transactions: List[Dict]) -> None:
+    def sync_transactions(self, db_session: Session, transactions: List[Dict]) -> List[Transaction]:
         """
         가져온 거래 내역을 데이터베이스에 동기화합니다.
         
         Args:
             db_session (Session): 데이터베이스 세션
             transactions (List[Dict]): 동기화할 거래 내역 목록
+            
+        Returns:
+            List[Transaction]: 저장된 거래 목록
         """
         try:
+            created = []
             for trans_data in transactions:
                 transaction = Transaction(
                     transaction_date=datetime.fromisoformat(trans_data["date"]),
@@ -66,7 +70,9 @@ class ERPConnector:
                     contract_id=trans_data.get("contract_id")
                 )
                 db_session.add(transaction)
+                created.append(transaction)
             db_session.commit()
+            return created
         except Exception as e:
             db_session.rollback()
             self.logger.error(f"거래 내역 동기화 중 오류 발생: {str(e)}")
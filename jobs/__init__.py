@@ -0,0 +1,6 @@
+"""
+AllOneFlow 백그라운드 작업 패키지
+"""
+
+from .queue import JobQueue, JobStatus
+from .worker import JobWorkerPool
@@ -0,0 +1,244 @@
+import json
+import logging
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Optional
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from database.models import Job
+
+logger = logging.getLogger(__name__)
+
+class JobStatus:
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+def _json_default(value: Any) -> Any:
+    """작업 인자/결과의 Decimal, 날짜 값을 JSON 값으로 변환합니다."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"JSON으로 변환할 수 없는 값입니다: {type(value).__name__}")
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, default=_json_default)
+
+class JobQueue:
+    """
+    데이터베이스 테이블(jobs)을 사용하는 작업 큐
+
+    별도의 메시지 브로커 없이 API 프로세스는 작업을 등록(enqueue)하고, 작업 프로세스는
+    QUEUED 상태의 작업을 하나씩 가져가(claim) 실행한 뒤 결과를 기록합니다. 모든 메서드는
+    짧은 트랜잭션을 따로 열어 처리하므로 실행 중인 작업의 트랜잭션과 섞이지 않습니다.
+    """
+
+    def __init__(self, engine: Engine, max_attempts: int = 3):
+        self.Session = sessionmaker(bind=engine)
+        self.max_attempts = max_attempts
+
+    def enqueue(self, job_type: str, params: Optional[dict] = None) -> int:
+        """작업을 등록하고 작업 ID를 반환합니다."""
+        session = self.Session()
+        try:
+            job = Job(type=job_type, status=JobStatus.QUEUED, params=dumps(params or {}), progress=0.0)
+            session.add(job)
+            session.commit()
+            return job.id
+        finally:
+            session.close()
+
+    def claim(self, worker: str) -> Optional[dict]:
+        """
+        가장 오래된 QUEUED 작업을 RUNNING으로 바꾸고 가져옵니다.
+
+        상태 조건을 건 UPDATE로 선점하므로 여러 프로세스가 동시에 가져가도 한 작업은
+        한 프로세스만 실행합니다.
+
+        Returns:
+            Optional[dict]: {"id", "type", "params", "checkpoint"} (대기 중인 작업이 없으면 None)
+                checkpoint는 이전 시도에서 커밋한 재개 지점 (없으면 None)
+        """
+        session = self.Session()
+        try:
+            while True:
+                candidate = session.query(Job.id, Job.type, Job.params, Job.checkpoint)\
+                    .filter(Job.status == JobStatus.QUEUED).order_by(Job.id).first()
+                if candidate is None:
+                    session.rollback()
+                    return None
+
+                now = datetime.utcnow()
+                claimed = session.query(Job).filter(
+                    Job.id == candidate.id,
+                    Job.status == JobStatus.QUEUED
+                ).update({
+                    'status': JobStatus.RUNNING,
+                    'worker': worker,
+                    'attempts': Job.attempts + 1,
+                    'started_at': now,
+                    'heartbeat_at': now
+                }, synchronize_session=False)
+                session.commit()
+                if claimed:
+                    return {"id": candidate.id, "type": candidate.type,
+                            "params": json.loads(candidate.params or '{}'),
+                            "checkpoint": json.loads(candidate.checkpoint) if candidate.checkpoint else None}
+        finally:
+            session.close()
+
+    def report_progress(self, job_id: int, progress: Optional[float], message: Optional[str] = None) -> None:
+        """
+        진행률(0.0 ~ 1.0, None이면 유지)과 메시지를 기록합니다.
+
+        작업의 트랜잭션이 데이터베이스 쓰기 잠금을 잡고 있으면 기록하지 못할 수 있으며,
+        이 경우 다음 보고로 넘어갑니다.
+        """
+        session = self.Session()
+        try:
+            values = {'progress_message': message, 'heartbeat_at': datetime.utcnow()}
+            if progress is not None:
+                values['progress'] = max(0.0, min(1.0, float(progress)))
+            session.query(Job).filter(Job.id == job_id, Job.status == JobStatus.RUNNING)\
+                .update(values, synchronize_session=False)
+            session.commit()
+        except OperationalError as e:
+            session.rollback()
+            logger.debug(f"작업 {job_id} 진행률 기록 생략: {e}")
+        finally:
+            session.close()
+
+    def heartbeat(self, job_id: int, worker: str) -> None:
+        """
+        실행 중인 작업의 heartbeat_at을 갱신합니다. (작업 프로세스의 heartbeat 스레드에서 호출)
+
+        진행률 보고와 관계없이 주기적으로 호출하여, 오래 걸리는 작업이 requeue_stale()로
+        되돌려져 두 번 실행되지 않도록 합니다.
+        """
+        session = self.Session()
+        try:
+            session.query(Job).filter(Job.id == job_id, Job.status == JobStatus.RUNNING, Job.worker == worker)\
+                .update({'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+            session.commit()
+        except OperationalError as e:
+            session.rollback()
+            logger.debug(f"작업 {job_id} heartbeat 기록 생략: {e}")
+        finally:
+            session.close()
+
+    @staticmethod
+    def save_checkpoint(session: Session, job_id: int, state: Any) -> None:
+        """
+        작업의 재개 지점을 작업 세션 안에서 기록합니다. (커밋은 호출자가 수행)
+
+        작업 데이터와 같은 트랜잭션으로 커밋되므로, 작업이 중단되어 다시 실행되면
+        마지막으로 커밋된 지점부터 이어서 처리할 수 있습니다.
+        """
+        session.query(Job).filter(Job.id == job_id).update(
+            {'checkpoint': dumps(state), 'heartbeat_at': datetime.utcnow()}, synchronize_session=False)
+
+    def complete(self, job_id: int, result: Any) -> None:
+        """작업을 성공으로 마치고 결과를 기록합니다."""
+        self._finish(job_id, {'status': JobStatus.SUCCEEDED, 'result': dumps(result),
+                              'progress': 1.0, 'error': None})
+
+    def fail(self, job_id: int, error: str) -> None:
+        """작업을 실패로 마치고 오류를 기록합니다."""
+        self._finish(job_id, {'status': JobStatus.FAILED, 'error': error})
+
+    def _finish(self, job_id: int, values: dict) -> None:
+        session = self.Session()
+        try:
+            now = datetime.utcnow()
+            session.query(Job).filter(Job.id == job_id).update(
+                {**values, 'finished_at': now, 'heartbeat_at': now}, synchronize_session=False)
+            session.commit()
+        finally:
+            session.close()
+
+    def retry(self, job_id: int) -> bool:
+        """
+        실패한 작업을 다시 대기열에 넣습니다. (재개 지점은 유지하고 시도 횟수는 처음부터 다시 셈)
+
+        묶음마다 재개 지점을 커밋하는 작업은 마지막으로 커밋된 지점부터 이어서 처리합니다.
+
+        Returns:
+            bool: 다시 대기열에 넣었으면 True (작업이 없거나 실패 상태가 아니면 False)
+        """
+        session = self.Session()
+        try:
+            retried = session.query(Job).filter(Job.id == job_id, Job.status == JobStatus.FAILED).update({
+                'status': JobStatus.QUEUED,
+                'worker': None,
+                'attempts': 0,
+                'error': None,
+                'finished_at': None
+            }, synchronize_session=False)
+            session.commit()
+            return bool(retried)
+        finally:
+            session.close()
+
+    def requeue_stale(self, stale_seconds: float) -> int:
+        """
+        오래 갱신되지 않은 RUNNING 작업을 다시 대기열에 넣습니다. (이전 실행에서 중단된 작업)
+
+        실행 중인 작업은 작업 프로세스가 주기적으로 heartbeat_at을 갱신하므로, stale_seconds는
+        heartbeat 간격보다 충분히 길어야 합니다.
+
+        시도 횟수가 max_attempts에 이른 작업은 실패로 처리합니다.
+
+        Returns:
+            int: 다시 대기열에 넣거나 실패 처리한 작업 수
+        """
+        threshold = datetime.utcnow() - timedelta(seconds=stale_seconds)
+        return self._requeue(Job.heartbeat_at < threshold)
+
+    def requeue_worker(self, worker: str) -> int:
+        """비정상 종료된 작업 프로세스가 실행하던 작업을 다시 대기열에 넣습니다."""
+        return self._requeue(Job.worker == worker)
+
+    def _requeue(self, condition) -> int:
+        session = self.Session()
+        try:
+            running = session.query(Job).filter(Job.status == JobStatus.RUNNING, condition)
+            failed = running.filter(Job.attempts >= self.max_attempts).update({
+                'status': JobStatus.FAILED,
+                'error': "작업 프로세스가 중단되어 작업을 마치지 못했습니다.",
+                'finished_at': datetime.utcnow()
+            }, synchronize_session=False)
+            requeued = running.update({'status': JobStatus.QUEUED, 'worker': None},
+                                      synchronize_session=False)
+            session.commit()
+            return failed + requeued
+        finally:
+            session.close()
+
+    def get(self, job_id: int) -> Optional[dict]:
+        """작업 상태를 조회합니다. (없으면 None)"""
+        session = self.Session()
+        try:
+            job = session.query(Job).get(job_id)
+            return self.to_dict(job) if job else None
+        finally:
+            session.close()
+
+    @staticmethod
+    def to_dict(job: Job) -> dict:
+        return {
+            "job_id": job.id,
+            "type": job.type,
+            "status": job.status,
+            "progress": job.progress,
+            "progress_message": job.progress_message,
+            "params": json.loads(job.params) if job.params else None,
+            "result": json.loads(job.result) if job.result else None,
+            "error": job.error,
+            "attempts": job.attempts,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "started_at": job.started_at.isoformat() if job.started_at else None,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None
+        }
@@ -0,0 +1,114 @@
+"""
+작업 큐에서 실행하는 작업 함수
+
+각 작업은 (session, params, progress)를 받아 JSON으로 저장할 결과(dict)를 반환합니다.
+progress(진행률 0.0~1.0 또는 None, 메시지)는 진행 상황을 작업 상태에 기록합니다.
+중간에 커밋하는 작업은 progress.checkpoint(이전 시도의 재개 지점)와
+progress.save_checkpoint(session, 상태)로 다시 실행될 때 이어서 처리합니다.
+"""
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict
+from sqlalchemy.orm import Session
+from accounting.accounting_manager import AccountingManager
+from accounting.advanced_accounting_manager import AdvancedAccountingManager
+from accounting.excel_manager import ExcelManager
+
+Progress = Callable[..., None]
+
+accounting_manager = AccountingManager()
+advanced_accounting_manager = AdvancedAccountingManager()
+excel_manager = ExcelManager()
+
+def close_fiscal_year(session: Session, params: dict, progress: Progress) -> dict:
+    """회계연도를 마감합니다. (결산 전표 생성)"""
+    progress(0.1, "결산 전표 생성 중")
+    fiscal_year = accounting_manager.close_fiscal_year(
+        session=session,
+        fiscal_year_id=params['fiscal_year_id'],
+        closed_by=params['closed_by']
+    )
+    return {
+        "fiscal_year_id": fiscal_year.id,
+        "year": fiscal_year.year,
+        "closed_at": fiscal_year.closed_at.isoformat(),
+        "closed_by": fiscal_year.closed_by
+    }
+
+def cash_flow_statement(session: Session, params: dict, progress: Progress) -> dict:
+    """새 전표를 현금흐름으로 분류하고 기간의 현금흐름표를 생성합니다."""
+    progress(0.1, "현금흐름 분류 중")
+    return advanced_accounting_manager.generate_cash_flow_statement(
+        session=session,
+        start_date=datetime.fromisoformat(params['start_date']),
+        end_date=datetime.fromisoformat(params['end_date'])
+    )
+
+def tax_report(session: Session, params: dict, progress: Progress) -> dict:
+    """세금 신고 자료를 생성합니다."""
+    progress(0.1, "세금 신고 자료 집계 중")
+    report = advanced_accounting_manager.generate_tax_report(
+        session=session,
+        report_type=params['report_type'],
+        period_start=datetime.fromisoformat(params['period_start']),
+        period_end=datetime.fromisoformat(params['period_end'])
+    )
+    return {"report_id": report.id, "total_amount": report.total_amount}
+
+def vat_quarterly_reports(session: Session, params: dict, progress: Progress) -> dict:
+    """연도의 부가가치세 분기 신고 자료(1기·2기 예정/확정)를 생성합니다."""
+    progress(0.1, "부가가치세 분기 신고 자료 집계 중")
+    reports = advanced_accounting_manager.generate_vat_reports(session, params['year'])
+    return {
+        "year": params['year'],
+        "reports": [
+            {
+                "report_id": report.id,
+                "period": label,
+                "period_start": report.period_start.isoformat(),
+                "period_end": report.period_end.isoformat(),
+                "output_tax": result["output_tax"],
+                "input_tax": result["input_tax"],
+                "total_amount": report.total_amount
+            }
+            for label, report, result in reports
+        ]
+    }
+
+def excel_import(session: Session, params: dict, progress: Progress) -> dict:
+    """
+    업로드된 Excel 파일의 계정과목과 전표를 가져옵니다. (성공하면 파일 삭제)
+
+    묶음마다 커밋하면서 재개 지점을 함께 기록하므로, 작업 프로세스가 중단되어 다시
+    실행되면 이미 가져온 묶음은 건너뜁니다. 실패하면 파일을 남겨 두므로
+    JobQueue.retry()로 마지막 재개 지점부터 다시 실행할 수 있습니다.
+    """
+    file_path = params['file_path']
+    summary = excel_manager.import_excel_streaming(
+        session, file_path,
+        on_chunk=lambda sheet_name, rows: progress(None, f"{sheet_name}: {rows}행 읽는 중"),
+        resume=progress.checkpoint,
+        on_batch=lambda state: progress.save_checkpoint(session, state)
+    )
+    if params.get('delete_after', True) and os.path.exists(file_path):
+        os.remove(file_path)
+
+    rejections = summary['rejections']
+    return {
+        "name": params.get('name'),
+        "accounts_created": summary['accounts_created'],
+        "entries_created": summary['entries_created'],
+        "rejected_count": summary['rejected_count'],
+        # 거부된 행은 앞쪽 100개만 결과에 저장
+        "rejections": json.loads(rejections.head(100).to_json(orient='records', force_ascii=False,
+                                                              date_format='iso'))
+    }
+
+TASKS: Dict[str, Callable[[Session, dict, Progress], dict]] = {
+    'close_fiscal_year': close_fiscal_year,
+    'cash_flow_statement': cash_flow_statement,
+    'tax_report': tax_report,
+    'vat_quarterly_reports': vat_quarterly_reports,
+    'excel_import': excel_import,
+}
@@ -0,0 +1,227 @@
+"""
+작업 프로세스: jobs 테이블에서 작업을 가져와 실행합니다. (외부 메시지 브로커 불필요)
+
+API 서버(python -m api.app)는 ALLONEFLOW_JOB_WORKERS 개(기본 2)의 작업 프로세스를 함께
+시작합니다. 작업 프로세스만 따로 실행할 수도 있습니다.
+
+사용 예:
+    python -m jobs.worker --processes 4
+    python -m jobs.worker --url postgresql+psycopg2://user:pw@host/aof
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from sqlalchemy.orm import sessionmaker
+from database.config import create_db_engine, database_url
+from database.migrate import create_missing_columns, migrate_money_columns
+from database.models import Job
+from jobs.queue import JobQueue
+from jobs.tasks import TASKS
+
+logger = logging.getLogger(__name__)
+
+# 실행 중인 작업의 heartbeat_at 갱신 간격(초) (JobWorkerPool의 stale_seconds보다 충분히 짧게)
+HEARTBEAT_INTERVAL = 60.0
+
+class JobProgress:
+    """
+    작업 함수에 전달하는 진행 상황 기록기
+
+    progress(진행률, 메시지)로 호출하며, 이어서 처리할 수 있는 작업은 checkpoint(이전 시도에서
+    커밋한 재개 지점, 없으면 None)를 읽고 save_checkpoint()로 작업 데이터와 같은 트랜잭션에
+    재개 지점을 기록합니다.
+    """
+
+    def __init__(self, queue: JobQueue, job: dict):
+        self.queue = queue
+        self.job_id = job['id']
+        self.checkpoint = job.get('checkpoint')
+
+    def __call__(self, fraction: Optional[float], message: Optional[str] = None) -> None:
+        self.queue.report_progress(self.job_id, fraction, message)
+
+    def save_checkpoint(self, session, state) -> None:
+        """재개 지점을 작업 세션에 기록합니다. (작업 데이터와 함께 커밋)"""
+        self.queue.save_checkpoint(session, self.job_id, state)
+        self.checkpoint = state
+
+def execute_job(queue: JobQueue, Session: sessionmaker, job: dict, worker: Optional[str] = None,
+                heartbeat_interval: float = HEARTBEAT_INTERVAL) -> None:
+    """
+    가져온 작업 하나를 실행하고 결과 또는 오류를 기록합니다.
+
+    실행하는 동안 별도 스레드가 heartbeat_interval초마다 heartbeat_at을 갱신하므로, 진행률을
+    자주 보고하지 않는 작업도 실행 중에 중단된 작업으로 오인되어 다시 실행되지 않습니다.
+    """
+    task = TASKS.get(job['type'])
+    if task is None:
+        queue.fail(job['id'], f"알 수 없는 작업 유형입니다: {job['type']}")
+        return
+
+    stop_heartbeat = threading.Event()
+
+    def heartbeat() -> None:
+        while not stop_heartbeat.wait(heartbeat_interval):
+            queue.heartbeat(job['id'], worker)
+
+    heartbeat_thread = None
+    if worker is not None:
+        heartbeat_thread = threading.Thread(target=heartbeat, name=f"job-heartbeat-{job['id']}", daemon=True)
+        heartbeat_thread.start()
+
+    session = Session()
+    try:
+        result = task(session, job['params'], JobProgress(queue, job))
+        session.commit()
+        queue.complete(job['id'], result)
+    except Exception as e:
+        session.rollback()
+        logger.exception(f"작업 {job['id']}({job['type']}) 실행 중 오류 발생")
+        queue.fail(job['id'], str(e))
+    finally:
+        stop_heartbeat.set()
+        if heartbeat_thread is not None:
+            heartbeat_thread.join()
+        session.close()
+
+def run_worker(url: str, name: Optional[str] = None, poll_interval: float = 1.0,
+               stop_event=None, heartbeat_interval: float = HEARTBEAT_INTERVAL) -> None:
+    """
+    작업이 있으면 하나씩 실행하고, 없으면 poll_interval초마다 다시 확인합니다.
+
+    Args:
+        url (str): 데이터베이스 URL
+        name (Optional[str]): 작업 프로세스 이름 (작업의 worker 컬럼에 기록)
+        poll_interval (float): 대기열이 비었을 때 다시 확인하는 간격(초)
+        stop_event: 설정되면 현재 작업을 마친 뒤 종료하는 이벤트
+        heartbeat_interval (float): 실행 중인 작업의 heartbeat_at 갱신 간격(초)
+    """
+    logging.basicConfig(level=logging.INFO)
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    engine = create_db_engine(url)
+    queue = JobQueue(engine)
+    Session = sessionmaker(bind=engine)
+    logger.info(f"작업 프로세스 시작: {name}")
+
+    try:
+        while stop_event is None or not stop_event.is_set():
+            job = queue.claim(name)
+            if job is None:
+                if stop_event is not None:
+                    stop_event.wait(poll_interval)
+                else:
+                    time.sleep(poll_interval)
+                continue
+            execute_job(queue, Session, job, name, heartbeat_interval)
+    finally:
+        engine.dispose()
+
+class JobWorkerPool:
+    """
+    작업 프로세스 여러 개를 시작하고 관리하는 클래스
+
+    비정상 종료된 프로세스는 다시 시작하고, 그 프로세스가 실행하던 작업은 대기열로 되돌립니다.
+    시작할 때는 heartbeat_at이 stale_seconds 넘게 갱신되지 않은 작업(이전 실행에서 중단된
+    작업)을 되돌립니다. 실행 중인 작업은 heartbeat_interval초마다 갱신됩니다.
+    작업 프로세스를 따로 실행해도 금액을 잘못 읽지 않도록 시작할 때 실수(REAL) 금액 컬럼을
+    최소 단위 정수로 변환합니다.
+    """
+
+    def __init__(self, url: str, processes: int = 2, poll_interval: float = 1.0,
+                 stale_seconds: float = 3600, heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        if heartbeat_interval * 3 > stale_seconds:
+            raise ValueError("stale_seconds는 heartbeat_interval의 3배 이상이어야 합니다.")
+        self.url = url
+        self.processes = processes
+        self.poll_interval = poll_interval
+        self.stale_seconds = stale_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self._context = multiprocessing.get_context('spawn')
+        self._stop = self._context.Event()
+        self._workers: List[Tuple[str, multiprocessing.Process]] = []
+        self._engine = None
+        self._queue = None
+        self._monitor = None
+
+    def start(self) -> 'JobWorkerPool':
+        """금액 컬럼을 변환하고 이전 실행에서 중단된 작업을 되돌린 뒤 작업 프로세스를 시작합니다."""
+        self._engine = create_db_engine(self.url)
+        Job.__table__.create(self._engine, checkfirst=True)
+        create_missing_columns(self._engine)
+        converted = migrate_money_columns(self._engine)
+        if converted:
+            logger.info(f"금액 컬럼 변환 완료: {', '.join(converted)}")
+        self._queue = JobQueue(self._engine)
+        requeued = self._queue.requeue_stale(self.stale_seconds)
+        if requeued:
+            logger.info(f"중단된 작업 {requeued}건을 다시 대기열에 넣었습니다.")
+
+        self._workers = [self._spawn() for _ in range(self.processes)]
+        self._monitor = threading.Thread(target=self._watch, name='job-worker-monitor', daemon=True)
+        self._monitor.start()
+        return self
+
+    def _spawn(self) -> Tuple[str, multiprocessing.Process]:
+        name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        process = self._context.Process(
+            target=run_worker,
+            args=(self.url, name, self.poll_interval, self._stop, self.heartbeat_interval),
+            name=f"job-worker-{name}",
+            daemon=True
+        )
+        process.start()
+        return name, process
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval * 5):
+            for index, (name, process) in enumerate(self._workers):
+                if process.is_alive() or self._stop.is_set():
+                    continue
+                logger.warning(f"작업 프로세스 {name}가 종료되어(코드 {process.exitcode}) 다시 시작합니다.")
+                self._queue.requeue_worker(name)
+                self._workers[index] = self._spawn()
+
+    def stop(self, timeout: float = 30) -> None:
+        """실행 중인 작업을 마칠 때까지 기다린 뒤 작업 프로세스를 종료합니다."""
+        self._stop.set()
+        deadline = time.monotonic() + timeout
+        for name, process in self._workers:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join()
+                self._queue.requeue_worker(name)
+        if self._engine is not None:
+            self._engine.dispose()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AllOneFlow 작업 프로세스")
+    parser.add_argument('--url', help="데이터베이스 URL (기본: ALLONEFLOW_DATABASE_URL 또는 alloneflow.db)")
+    parser.add_argument('--processes', type=int, default=2, help="작업 프로세스 수")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="대기열 확인 간격(초)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    pool = JobWorkerPool(args.url or database_url(), args.processes, args.poll_interval).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("작업 프로세스를 종료합니다.")
+    finally:
+        pool.stop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import types
+import pytest
+from sqlalchemy import Float, MetaData, create_engine
+from sqlalchemy.orm import sessionmaker
+
+# 저장소 루트의 패키지(database, accounting 등)를 가져올 수 있도록 경로 추가
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+# anomaly_detection은 AllOneFlow 패키지 안에 있는 것처럼 상대 임포트(..database)하므로
+# 저장소 루트를 'aof' 패키지로, AllOneFlow/database(Transaction 모델)를 그 database로 등록
+# (from aof.anomaly_detection... 로 가져옴)
+for name, path in (('aof', root), ('aof.database', os.path.join(root, 'AllOneFlow', 'database'))):
+    package = types.ModuleType(name)
+    package.__path__ = [path]
+    sys.modules.setdefault(name, package)
+
+from database.models import Base
+from database.money import Money
+
+@pytest.fixture
+def engine(tmp_path):
+    """테스트마다 새로 만드는 SQLite 파일 엔진 (테이블 없음)"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'alloneflow.db'}")
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def session(engine):
+    """현재 모델 정의로 테이블을 만든 데이터베이스의 세션"""
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def legacy_engine(engine):
+    """금액 컬럼이 실수(REAL)였던 이전 스키마로 테이블을 만든 엔진"""
+    legacy = MetaData()
+    for table in Base.metadata.sorted_tables:
+        for column in table.to_metadata(legacy).columns:
+            if isinstance(column.type, Money):
+                column.type = Float()
+    legacy.create_all(engine)
+    return engine
@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from accounting.chart_of_accounts_cache import chart_of_accounts_cache
+from database.models import Account, AccountType, Base
+
+@pytest.fixture
+def accounts(session):
+    session.add_all([
+        Account(code='1100', name='현금', type=AccountType.ASSET),
+        Account(code='5100', name='급여', type=AccountType.EXPENSE),
+    ])
+    session.commit()
+
+@pytest.fixture
+def cache(accounts):
+    """세션 이벤트에 등록된 공용 캐시 (계정과목을 만든 뒤 비우고 집계를 0으로 맞춤)"""
+    chart_of_accounts_cache.invalidate()
+    chart_of_accounts_cache.hits = chart_of_accounts_cache.misses = 0
+    chart_of_accounts_cache.loads = chart_of_accounts_cache.invalidations = 0
+    return chart_of_accounts_cache
+
+def test_lookups_after_first_load_are_served_from_memory(session, cache):
+    statements = []
+    event.listen(session.get_bind(), 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+    assert cache.get(session, '1100').type == AccountType.ASSET
+    assert cache.resolve(session, ['1100', '5100']).keys() == {'1100', '5100'}
+    assert cache.id_for(session, '5100') == cache.code_map(session)['5100']
+
+    assert len(statements) == 1
+    assert cache.stats()['loads'] == 1 and cache.stats()['hits'] == 4
+
+def test_committed_account_changes_invalidate_the_cache(session, cache):
+    cache.get(session, '5100')
+
+    session.query(Account).filter(Account.code == '5100').one().type = AccountType.ASSET
+    session.commit()
+    assert cache.get(session, '5100').type == AccountType.ASSET
+
+    # ORM 일괄 UPDATE도 감지
+    session.query(Account).filter(Account.code == '5100').update({'type': AccountType.EXPENSE})
+    session.commit()
+    assert cache.get(session, '5100').type == AccountType.EXPENSE
+    assert cache.stats()['invalidations'] == 2 and cache.stats()['loads'] == 3
+
+def test_uncommitted_changes_are_only_visible_to_their_session(engine, session, cache):
+    other = sessionmaker(bind=engine)()
+    cache.get(other, '1100')
+
+    session.add(Account(code='1200', name='예금', type=AccountType.ASSET))
+    session.flush()
+    assert cache.get(session, '1200') is not None
+    assert cache.get(other, '1200') is None
+
+    session.rollback()
+    assert cache.get(session, '1200') is None
+    assert cache.stats()['invalidations'] == 1
+    other.close()
+
+def test_missing_codes_are_looked_up_and_added(session, cache):
+    cache.get(session, '1100')
+    # 다른 프로세스에서 추가된 계정과목 (세션 이벤트 없음)
+    session.connection().exec_driver_sql(
+        "INSERT INTO accounts (code, name, type, is_active) VALUES ('2100', '미지급금', 'LIABILITY', 1)")
+    session.commit()
+
+    assert cache.get(session, '2100').type == AccountType.LIABILITY
+    # 찾은 계정과목은 캐시에 추가되어 다음 조회부터 적중
+    assert cache.get(session, '2100') is not None
+    assert cache.stats()['misses'] == 1 and cache.stats()['loads'] == 1
+
+def test_each_database_has_its_own_cache(tmp_path, session, cache):
+    other_engine = create_engine(f"sqlite:///{tmp_path / 'other.db'}")
+    Base.metadata.create_all(other_engine)
+    other = sessionmaker(bind=other_engine)()
+    try:
+        assert cache.get(session, '1100') is not None
+        assert cache.get(other, '1100') is None
+    finally:
+        other.close()
+        other_engine.dispose()
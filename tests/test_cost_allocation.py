@@ -0,0 +1,20 @@
+import numpy as np
+from accounting.cost_allocation_manager import CostAllocationManager
+
+def test_split_amounts_sums_to_original_amounts():
+    rng = np.random.default_rng(0)
+    amounts = rng.integers(-10 ** 9, 10 ** 9, size=500)
+    for ratios in (np.array([1 / 3, 1 / 3, 1 / 3]), np.array([0.5, 0.25, 0.125, 0.125]), rng.random(7)):
+        shares = CostAllocationManager.split_amounts(amounts, ratios)
+        assert shares.shape == (len(amounts), len(ratios))
+        assert (shares.sum(axis=1) == amounts).all()
+        # 각 몫은 정확한 비율 금액과 최소 단위 1 미만으로 차이남
+        exact = amounts[:, None] * (ratios / ratios.sum())[None, :]
+        assert (np.abs(shares - exact) < 1).all()
+
+def test_split_amounts_gives_remainder_to_largest_fractions_first():
+    shares = CostAllocationManager.split_amounts(np.array([100, -100, 1, 0]), np.array([1 / 3, 1 / 3, 1 / 3]))
+    assert shares.tolist() == [[34, 33, 33], [-34, -33, -33], [1, 0, 0], [0, 0, 0]]
+
+    shares = CostAllocationManager.split_amounts(np.array([10]), np.array([0.15, 0.35, 0.5]))
+    assert shares.tolist() == [[2, 3, 5]]
@@ -0,0 +1,136 @@
+from datetime import datetime
+from decimal import Decimal
+import openpyxl
+import pandas as pd
+import pytest
+from accounting.accounting_manager import AccountingManager
+from accounting.excel_manager import ExcelManager
+from database.models import AccountPeriodBalance, AccountType, JournalEntry, JournalLine
+
+@pytest.fixture
+def accounts(session):
+    manager = AccountingManager()
+    return {
+        code: manager.create_account(session, code, name, account_type).id
+        for code, name, account_type in [
+            ('1100', '현금', AccountType.ASSET),
+            ('4100', '매출', AccountType.REVENUE),
+        ]
+    }
+
+def _sheet(rows, start_row=2):
+    df = pd.DataFrame(rows, columns=['날짜', '적요', '계정코드', '차변', '대변'])
+    df.index = range(start_row, start_row + len(df))
+    return df
+
+def test_import_journal_entries_creates_one_entry_per_date(session, accounts):
+    entry_ids, rejected = ExcelManager().import_journal_entries(session, _sheet([
+        ('2024-03-01', '매출', '1100', 1000.5, None),
+        ('2024-03-01', '매출', '4100', '', '1000.50'),
+        ('2024-03-02', '매출', '1100', '20', ' '),
+        ('2024-03-02', '매출', '4100', None, 20),
+    ]))
+
+    assert len(entry_ids) == 2 and rejected.empty
+    lines = session.query(JournalLine).join(JournalEntry).order_by(JournalLine.id).all()
+    assert [(line.debit, line.credit) for line in lines] == [
+        (Decimal('1000.50'), Decimal('0')), (Decimal('0'), Decimal('1000.50')),
+        (Decimal('20'), Decimal('0')), (Decimal('0'), Decimal('20')),
+    ]
+    balance = session.query(AccountPeriodBalance).filter_by(account_id=accounts['1100'], period=202403).one()
+    assert balance.debit == Decimal('1020.50')
+
+def test_import_journal_entries_rejects_unparseable_amounts(session, accounts):
+    entry_ids, rejected = ExcelManager().import_journal_entries(session, _sheet([
+        ('2024-03-01', '매출', '1100', '1,000', None),
+        ('2024-03-01', '매출', '4100', None, '1,000'),
+        ('2024-03-01', '매출', '1100', 5, None),
+        ('2024-03-01', '매출', '4100', None, 5),
+        ('2024-03-02', '매출', '1100', 'abc', None),
+        ('2024-03-02', '매출', '4100', None, 0),
+    ]))
+
+    # 금액을 읽을 수 없는 행이 0원으로 들어가지 않고 날짜 전체가 거부됨
+    assert entry_ids == []
+    assert session.query(JournalEntry).count() == 0
+    assert rejected['행번호'].tolist() == [2, 3, 4, 5, 6, 7]
+    assert rejected['사유'].tolist() == [
+        "잘못된 금액 형식", "잘못된 금액 형식",
+        "같은 날짜의 다른 행이 거부됨", "같은 날짜의 다른 행이 거부됨",
+        "잘못된 금액 형식", "같은 날짜의 다른 행이 거부됨",
+    ]
+    assert list(rejected.columns) == ['행번호', '날짜', '적요', '계정코드', '차변', '대변', '사유']
+    assert rejected.loc[0, '차변'] == '1,000'
+
+def test_import_journal_entries_rejects_bad_dates_accounts_and_unbalanced_dates(session, accounts):
+    entry_ids, rejected = ExcelManager().import_journal_entries(session, _sheet([
+        (None, '매출', '1100', 10, None),
+        ('2024-03-01', '매출', '9999', 10, None),
+        ('2024-03-01', '매출', '4100', None, 10),
+        ('2024-03-02', '매출', '1100', 10, None),
+        ('2024-03-02', '매출', '4100', None, 9.99),
+        ('2024-03-03', '매출', '1100', 7, None),
+        ('2024-03-03', '매출', '4100', None, 7),
+    ]))
+
+    assert len(entry_ids) == 1
+    assert dict(zip(rejected['행번호'], rejected['사유'])) == {
+        2: "잘못된 날짜 형식",
+        3: "계정과목을 찾을 수 없음",
+        4: "차변과 대변의 합계가 일치하지 않음",
+        5: "차변과 대변의 합계가 일치하지 않음",
+        6: "차변과 대변의 합계가 일치하지 않음",
+    }
+    entry = session.get(JournalEntry, entry_ids[0])
+    assert entry.entry_date == datetime(2024, 3, 3)
+
+def _write_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = '전표'
+    sheet.append(['날짜', '적요', '계정코드', '차변', '대변'])
+    for row in rows:
+        sheet.append(list(row))
+    workbook.save(path)
+    return str(path)
+
+class _RecordingExcelManager(ExcelManager):
+    """전표 가져오기에 넘어간 행 수를 기록"""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_sizes = []
+
+    def import_journal_entries(self, session, df, commit=True):
+        self.batch_sizes.append(len(df))
+        return super().import_journal_entries(session, df, commit)
+
+def test_import_excel_streaming_bounds_rows_of_a_date_spanning_chunks(session, accounts, tmp_path):
+    # 한 날짜(월말)에 적요별로 균형 잡힌 거래 30건이 여러 조각에 걸침
+    rows = []
+    for i in range(30):
+        rows += [('2024-03-31', f'월말 {i}', '1100', i + 1, None), ('2024-03-31', f'월말 {i}', '4100', None, i + 1)]
+    rows += [('2024-04-01', '매출', '1100', 7, None), ('2024-04-01', '매출', '4100', None, 7)]
+    manager = _RecordingExcelManager()
+
+    summary = manager.import_excel_streaming(session, _write_workbook(tmp_path / 'journal.xlsx', rows), chunk_size=8)
+
+    assert summary['rejected_count'] == 0
+    assert max(manager.batch_sizes) <= 2 * 8
+    assert session.query(JournalLine).count() == len(rows)
+    # 같은 날짜는 적요 경계에서 나뉜 여러 전표가 되고 각 전표는 균형을 이룸
+    march = session.query(JournalEntry).filter(JournalEntry.entry_date == datetime(2024, 3, 31)).all()
+    assert len(march) > 1
+    for entry in march:
+        assert sum(line.debit for line in entry.lines) == sum(line.credit for line in entry.lines)
+    balance = session.query(AccountPeriodBalance).filter_by(account_id=accounts['1100'], period=202403).one()
+    assert balance.debit == Decimal(sum(range(1, 31)))
+
+def test_import_excel_streaming_does_not_carry_a_single_oversized_run(session, accounts, tmp_path):
+    rows = [('2024-03-31', '급여', '1100' if i % 2 else '4100', 1, None) for i in range(40)]
+    manager = _RecordingExcelManager()
+
+    manager.import_excel_streaming(session, _write_workbook(tmp_path / 'journal.xlsx', rows), chunk_size=8)
+
+    assert sum(manager.batch_sizes) == len(rows)
+    assert max(manager.batch_sizes) <= 2 * 8
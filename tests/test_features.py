@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytest
+from aof.anomaly_detection.features import TransactionFeatureBuilder
+
+START = datetime(2024, 1, 1)
+
+def _transactions(count, days, seed=0, first_id=1):
+    rng = np.random.default_rng(seed)
+    seconds = np.sort(rng.integers(0, days * 86400, count))
+    return [
+        {"id": first_id + i, "transaction_date": START + timedelta(seconds=int(second)),
+         "amount": round(float(rng.choice([rng.normal(50000, 8000), 120000.0])), 2),
+         "category": str(rng.choice(['사무용품', '출장비', '식대'])),
+         "contract_id": int(rng.choice([-1, 1, 2])) if rng.random() < 0.7 else None}
+        for i, second in enumerate(seconds.tolist())
+    ]
+
+def _assert_features_equal(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    np.testing.assert_allclose(actual.to_numpy(dtype=float), expected.to_numpy(dtype=float), rtol=1e-7, atol=1e-9)
+
+def test_transform_of_each_new_transaction_matches_build_over_all_transactions():
+    history = _transactions(400, 60)
+    builder = TransactionFeatureBuilder()
+    builder.reset(history)
+    assert builder.is_warm
+
+    seen = list(history)
+    for transaction in _transactions(30, 2, seed=1, first_id=1000):
+        transaction["transaction_date"] += timedelta(days=60)
+        features = builder.transform([transaction])
+        seen.append(transaction)
+        _assert_features_equal(features, builder.build(seen).iloc[[-1]].reset_index(drop=True))
+
+def test_state_keeps_only_the_last_window_days():
+    history = _transactions(300, 30)
+    builder = TransactionFeatureBuilder(window_days=10)
+    builder.reset(history)
+
+    latest = max(transaction["transaction_date"] for transaction in history)
+    recent = {transaction["id"] for transaction in history if transaction["transaction_date"] >= latest - timedelta(days=10)}
+    assert set(builder._entries) == recent
+
+    # 나중 거래를 더하면 닿은 그룹은 바로, 닿지 않은 그룹은 보관 건수만큼 더해질 때 정리
+    builder.SWEEP_MIN_ROWS = 1
+    stored = len(builder._entries)
+    for i in range(2 * stored):
+        builder.append([{"id": 10000 + i, "transaction_date": latest + timedelta(days=20, seconds=i),
+                         "amount": 1000.0, "category": '신규', "contract_id": None}])
+    assert all(transaction_id >= 10000 for transaction_id in builder._entries)
+    assert set(builder._windows['category_key']) == {'신규'}
+    assert not builder._windows['contract_key']
+
+def test_reappending_a_transaction_replaces_its_previous_values():
+    history = _transactions(200, 20)
+    changed = dict(history[-1], amount=999999.0, category='식대')
+    builder = TransactionFeatureBuilder()
+    builder.reset(history)
+    builder.append([changed])
+
+    expected = TransactionFeatureBuilder()
+    expected.reset(history[:-1] + [changed])
+    assert builder._entries == expected._entries
+
+    probe = [{"id": 5000, "transaction_date": START + timedelta(days=21), "amount": 48000.0,
+              "category": '식대', "contract_id": 1}]
+    _assert_features_equal(builder.transform(probe, update_state=False),
+                           expected.transform(probe, update_state=False))
+
+@pytest.mark.parametrize('position', [-1, -5])
+def test_rescoring_a_stored_transaction_does_not_count_itself(position):
+    history = _transactions(200, 20)
+    builder = TransactionFeatureBuilder()
+    builder.reset(history)
+    rescored = history[position]
+
+    features = builder.transform([rescored], update_state=False)
+    expected = builder.build(history).iloc[[len(history) + position]].reset_index(drop=True)
+
+    for prefix in ('category', 'contract'):
+        for name in ('count_recent', 'hours_since_last'):
+            column = f'{prefix}_{name}'
+            assert features[column].iloc[0] == pytest.approx(expected[column].iloc[0])
+
+def test_transform_on_a_cold_builder_matches_build():
+    transactions = _transactions(100, 10)
+    builder = TransactionFeatureBuilder()
+    _assert_features_equal(builder.transform(transactions, update_state=False), builder.build(transactions))
+    assert not builder.is_warm
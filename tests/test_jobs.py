@@ -0,0 +1,140 @@
+import os
+from datetime import datetime, timedelta
+import openpyxl
+import pytest
+from sqlalchemy import Integer, inspect
+from sqlalchemy.orm import sessionmaker
+from accounting.excel_manager import ExcelManager
+from database.models import Account, Job, JournalEntry
+from jobs import tasks
+from jobs.queue import JobQueue, JobStatus
+from jobs.worker import JobWorkerPool, execute_job
+
+@pytest.fixture
+def queue(session, engine):
+    return JobQueue(engine)
+
+def _age_heartbeat(session, job_id, seconds):
+    session.query(Job).filter(Job.id == job_id)\
+        .update({'heartbeat_at': datetime.utcnow() - timedelta(seconds=seconds)})
+    session.commit()
+
+def test_claim_hands_out_each_job_once_in_order(queue):
+    first = queue.enqueue('tax_report', {'report_type': 'VAT'})
+    second = queue.enqueue('excel_import')
+
+    claimed = [queue.claim('worker-a'), queue.claim('worker-b')]
+
+    assert [job['id'] for job in claimed] == [first, second]
+    assert claimed[0]['params'] == {'report_type': 'VAT'} and claimed[0]['checkpoint'] is None
+    assert queue.claim('worker-a') is None
+    job = queue.get(first)
+    assert job['status'] == JobStatus.RUNNING and job['attempts'] == 1
+
+def test_requeue_stale_skips_jobs_with_recent_heartbeat(session, queue):
+    job_id = queue.enqueue('excel_import')
+    queue.claim('worker-a')
+    _age_heartbeat(session, job_id, 600)
+
+    queue.heartbeat(job_id, 'worker-a')
+    assert queue.requeue_stale(300) == 0
+
+    # 다른 작업 프로세스의 heartbeat는 반영하지 않음
+    _age_heartbeat(session, job_id, 600)
+    queue.heartbeat(job_id, 'worker-b')
+    assert queue.requeue_stale(300) == 1
+    assert queue.get(job_id)['status'] == JobStatus.QUEUED
+    assert queue.claim('worker-b')['id'] == job_id
+
+def test_requeue_fails_jobs_that_used_up_their_attempts(engine, session):
+    queue = JobQueue(engine, max_attempts=2)
+    job_id = queue.enqueue('excel_import')
+    for attempt in range(2):
+        queue.claim('worker-a')
+        assert queue.requeue_worker('worker-a') == 1
+
+    job = queue.get(job_id)
+    assert job['status'] == JobStatus.FAILED and job['attempts'] == 2
+    assert queue.claim('worker-a') is None
+
+def test_checkpoint_commits_with_job_data_and_is_handed_to_next_attempt(engine, queue):
+    job_id = queue.enqueue('excel_import')
+    queue.claim('worker-a')
+
+    Session = sessionmaker(bind=engine)
+    committed, rolled_back = Session(), Session()
+    JobQueue.save_checkpoint(committed, job_id, {'batch': 1})
+    committed.commit()
+    committed.close()
+    JobQueue.save_checkpoint(rolled_back, job_id, {'batch': 2})
+    rolled_back.rollback()
+    rolled_back.close()
+
+    queue.requeue_worker('worker-a')
+    assert queue.claim('worker-b')['checkpoint'] == {'batch': 1}
+
+def _write_workbook(path):
+    workbook = openpyxl.Workbook()
+    accounts = workbook.active
+    accounts.title = '계정과목'
+    accounts.append(['계정코드', '계정명', '계정유형'])
+    accounts.append(['1100', '현금', 'ASSET'])
+    accounts.append(['4100', '매출', 'REVENUE'])
+    journal = workbook.create_sheet('전표')
+    journal.append(['날짜', '적요', '계정코드', '차변', '대변'])
+    journal.append(['2024-03-01', '매출', '1100', 1000, None])
+    journal.append(['2024-03-01', '매출', '4100', None, 1000])
+    workbook.save(path)
+    return str(path)
+
+class _FailingOnceExcelManager(ExcelManager):
+    """첫 전표 묶음에서 한 번 실패"""
+
+    def __init__(self):
+        super().__init__()
+        self.failed = False
+
+    def import_journal_entries(self, session, df, commit=True):
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("연결이 끊어졌습니다.")
+        return super().import_journal_entries(session, df, commit)
+
+def test_failed_excel_import_keeps_file_and_resumes_on_retry(engine, session, queue, tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks, 'excel_manager', _FailingOnceExcelManager())
+    file_path = _write_workbook(tmp_path / 'upload.xlsx')
+    job_id = queue.enqueue('excel_import', {'file_path': file_path, 'name': '3월'})
+    Session = sessionmaker(bind=engine)
+
+    execute_job(queue, Session, queue.claim('worker-a'))
+
+    job = queue.get(job_id)
+    assert job['status'] == JobStatus.FAILED and job['error'] == "연결이 끊어졌습니다."
+    assert os.path.exists(file_path)
+    assert session.query(Account).count() == 2  # 계정과목 묶음은 커밋됨
+
+    assert queue.retry(job_id)
+    retried = queue.claim('worker-a')
+    assert retried['checkpoint']['batch'] == 1
+    execute_job(queue, Session, retried)
+
+    job = queue.get(job_id)
+    assert job['status'] == JobStatus.SUCCEEDED and job['attempts'] == 1
+    assert job['result']['accounts_created'] == 2 and job['result']['entries_created'] == 1
+    assert not os.path.exists(file_path)
+    session.expire_all()
+    assert session.query(Account).count() == 2
+    assert session.query(JournalEntry).count() == 1
+
+def test_retry_only_requeues_failed_jobs(queue):
+    job_id = queue.enqueue('excel_import')
+    assert not queue.retry(job_id)
+    assert not queue.retry(job_id + 1)
+
+def test_worker_pool_start_converts_legacy_money_columns(legacy_engine):
+    pool = JobWorkerPool(legacy_engine.url.render_as_string(hide_password=False), processes=0,
+                         stale_seconds=60, heartbeat_interval=1).start()
+    pool.stop(timeout=1)
+
+    column_types = {column['name']: column['type'] for column in inspect(legacy_engine).get_columns('journal_lines')}
+    assert isinstance(column_types['debit'], Integer) and isinstance(column_types['credit'], Integer)
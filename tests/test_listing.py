@@ -0,0 +1,80 @@
+import pytest
+from flask import Flask, jsonify
+from accounting.accounting_manager import AccountingManager
+from api.listing import encode_cursor, keyset_page, list_response, parse_list_params
+from database.models import Account, AccountType
+
+ACCOUNT_FIELDS = {
+    "id": Account.id,
+    "code": Account.code,
+    "name": Account.name,
+    "type": Account.type
+}
+
+@pytest.fixture
+def client(session):
+    manager = AccountingManager()
+    for code, name, account_type in [
+        ('1100', '현금', AccountType.ASSET), ('1200', '예금', AccountType.ASSET),
+        ('2100', '미지급금', AccountType.LIABILITY), ('4100', '매출', AccountType.REVENUE),
+        ('5100', '급여', AccountType.EXPENSE),
+    ]:
+        manager.create_account(session, code, name, account_type)
+
+    app = Flask(__name__)
+
+    @app.route('/accounts')
+    def list_accounts():
+        try:
+            params = parse_list_params(ACCOUNT_FIELDS, sort_fields=('id', 'code'))
+            items, next_cursor = keyset_page(session, ACCOUNT_FIELDS, params)
+            return list_response(items, next_cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    return app.test_client()
+
+def test_cursor_pages_cover_every_row_once_in_sort_order(client):
+    codes, url = [], '/accounts?sort=code&limit=2&fields=code'
+    while True:
+        response = client.get(url)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= 2 and all(list(item) == ['code'] for item in page)
+        codes += [item['code'] for item in page]
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            assert 'Link' not in response.headers
+            break
+        assert f'cursor={cursor}' in response.headers['Link'] and 'rel="next"' in response.headers['Link']
+        url = f'/accounts?sort=code&limit=2&fields=code&cursor={cursor}'
+
+    assert codes == ['1100', '1200', '2100', '4100', '5100']
+
+def test_field_selection_serializes_enums_and_rejects_unknown_fields(client):
+    assert client.get('/accounts?fields=code,type&limit=1').get_json() == [{'code': '1100', 'type': 'ASSET'}]
+
+    response = client.get('/accounts?fields=code,balance')
+    assert response.status_code == 400 and 'balance' in response.get_json()['error']
+
+@pytest.mark.parametrize('query', [
+    'sort=name',
+    'limit=0',
+    'cursor=not-a-cursor',
+    f"sort=code&cursor={encode_cursor('id', 3)}",
+])
+def test_invalid_list_params_are_rejected(client, query):
+    assert client.get(f'/accounts?{query}').status_code == 400
+
+def test_etag_returns_304_until_the_list_changes(client, session):
+    first = client.get('/accounts?fields=code,name')
+    etag = first.headers['ETag']
+
+    assert client.get('/accounts?fields=code,name', headers={'If-None-Match': etag}).status_code == 304
+    # 다른 필드 선택은 다른 응답
+    assert client.get('/accounts?fields=code', headers={'If-None-Match': etag}).status_code == 200
+
+    session.query(Account).filter(Account.code == '1200').update({'name': '보통예금'})
+    session.commit()
+    changed = client.get('/accounts?fields=code,name', headers={'If-None-Match': etag})
+    assert changed.status_code == 200 and changed.headers['ETag'] != etag
@@ -0,0 +1,45 @@
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import Integer, inspect
+from sqlalchemy.orm import sessionmaker
+from database.migrate import migrate_money_columns
+from database.models import Account, AccountType, JournalEntry, JournalLine
+
+def test_migrate_money_columns_round_trip(legacy_engine):
+    engine = legacy_engine
+    session = sessionmaker(bind=engine)()
+    cash = Account(code='1100', name='현금', type=AccountType.ASSET)
+    entry = JournalEntry(entry_date=datetime(2024, 3, 15), description='매출', created_by='tester')
+    session.add_all([cash, entry])
+    session.commit()
+
+    legacy_amounts = [1234.56, 0.1, 99999999.99, 0.0, 0.3]
+    session.connection().exec_driver_sql(
+        'INSERT INTO journal_lines (entry_id, account_id, debit, credit) VALUES (?, ?, ?, ?)',
+        [(entry.id, cash.id, amount, 0.0) for amount in legacy_amounts]
+    )
+    session.commit()
+    session.close()
+
+    converted = migrate_money_columns(engine)
+    assert {'journal_lines.debit', 'journal_lines.credit'} <= set(converted)
+
+    inspector = inspect(engine)
+    column_types = {column['name']: column['type'] for column in inspector.get_columns('journal_lines')}
+    assert isinstance(column_types['debit'], Integer)
+    assert isinstance(column_types['credit'], Integer)
+    assert {index['name'] for index in inspector.get_indexes('journal_lines')} == \
+        {index.name for index in JournalLine.__table__.indexes}
+
+    session = sessionmaker(bind=engine)()
+    try:
+        debits = [line.debit for line in session.query(JournalLine).order_by(JournalLine.id)]
+        assert debits == [Decimal(str(amount)).quantize(Decimal('0.01')) for amount in legacy_amounts]
+        assert all(isinstance(debit, Decimal) for debit in debits)
+        # 테이블 교체 후에도 외래 키가 모두 유효함
+        assert session.connection().exec_driver_sql('PRAGMA foreign_key_check').fetchall() == []
+    finally:
+        session.close()
+
+    # 이미 변환된 컬럼은 건너뜀
+    assert migrate_money_columns(engine) == []
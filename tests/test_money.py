@@ -0,0 +1,73 @@
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+import pytest
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+from database.models import Account, AccountType, JournalEntry, JournalLine
+from database.money import float_array_to_minor, from_minor, to_decimal, to_minor
+
+@pytest.mark.parametrize("value, expected", [
+    (None, 0),
+    (0, 0),
+    (12, 1200),
+    (np.int64(7), 700),
+    (Decimal('0.005'), 1),
+    (Decimal('-0.005'), -1),
+    (Decimal('0.004'), 0),
+    ('1234.565', 123457),
+    (' 10.1 ', 1010),
+    (1.005, 101),     # 1.005 * 100 = 100.49999... 이지만 repr 기준으로 반올림
+    (2.675, 268),
+    (0.1 + 0.2, 30),
+    (-1.005, -101),
+    (np.float64(19.995), 2000),
+])
+def test_to_minor_rounds_half_up(value, expected):
+    assert to_minor(value) == expected
+
+def test_to_decimal_round_trip():
+    assert to_decimal(1.005) == Decimal('1.01')
+    assert to_decimal('-0.125') == Decimal('-0.13')
+    assert from_minor(to_minor(Decimal('99999999.99'))) == Decimal('99999999.99')
+
+def test_float_array_to_minor_matches_to_minor():
+    values = [0.0, 1.005, -1.005, 2.675, 0.1 + 0.2, 19.995, 1234.565, -0.004, 99999999.99]
+    assert float_array_to_minor(np.array(values)).tolist() == [to_minor(value) for value in values]
+
+def _legacy_line(engine, amount):
+    """변환 전(REAL) 스키마에 원 단위 금액 전표 행을 넣습니다."""
+    session = sessionmaker(bind=engine)()
+    cash = Account(code='1100', name='현금', type=AccountType.ASSET)
+    entry = JournalEntry(entry_date=datetime(2024, 3, 15), description='매출', created_by='tester')
+    session.add_all([cash, entry])
+    session.commit()
+    session.connection().exec_driver_sql(
+        'INSERT INTO journal_lines (entry_id, account_id, debit, credit) VALUES (?, ?, ?, ?)',
+        (entry.id, cash.id, amount, 0)
+    )
+    session.commit()
+    return session
+
+def test_money_rejects_unconverted_real_amounts(legacy_engine):
+    session = _legacy_line(legacy_engine, 1234.56)
+    try:
+        # 원 단위 실수를 최소 단위로 읽어 100배 작은 금액이 되지 않도록 거부
+        with pytest.raises(ValueError, match="정수가 아닌 값"):
+            session.query(JournalLine.debit).one()
+    finally:
+        session.close()
+
+def test_money_reads_integer_minor_units_and_sums(session):
+    session.add_all([
+        Account(code='1100', name='현금', type=AccountType.ASSET),
+        JournalEntry(entry_date=datetime(2024, 3, 15), description='매출', created_by='tester'),
+    ])
+    session.commit()
+    session.add_all([JournalLine(entry_id=1, account_id=1, debit=amount, credit=0)
+                     for amount in ('1234.56', Decimal('0.01'), 7)])
+    session.commit()
+
+    assert [debit for debit, in session.query(JournalLine.debit).order_by(JournalLine.id)] == \
+        [Decimal('1234.56'), Decimal('0.01'), Decimal('7')]
+    assert session.query(func.sum(JournalLine.debit)).scalar() == Decimal('1241.57')
@@ -0,0 +1,53 @@
+from datetime import datetime
+from decimal import Decimal
+import numpy as np
+from accounting.accounting_manager import AccountingManager
+from accounting.period_balance_manager import PeriodBalanceManager
+from database.models import AccountPeriodBalance, AccountType
+
+def _period_balances(session):
+    return {
+        (row.account_id, row.period): (row.debit, row.credit)
+        for row in session.query(AccountPeriodBalance)
+    }
+
+def _create_accounts(manager, session):
+    return {
+        code: manager.create_account(session, code, name, account_type).id
+        for code, name, account_type in [
+            ('1100', '현금', AccountType.ASSET),
+            ('4100', '매출', AccountType.REVENUE),
+            ('5100', '급여', AccountType.EXPENSE),
+            ('5200', '임차료', AccountType.EXPENSE),
+        ]
+    }
+
+def test_apply_lines_matches_rebuild(session):
+    manager = AccountingManager()
+    accounts = _create_accounts(manager, session)
+    rng = np.random.default_rng(7)
+
+    # 건별 전표와 일괄 전표, 여러 달, 최소 단위 미만 금액(반올림)을 섞어서 반영
+    for i in range(30):
+        amount = float(rng.integers(1, 10 ** 7)) / 1000
+        manager.create_journal_entry(session, datetime(2024, 1 + i % 12, 1 + i % 28), f"전표 {i}", [
+            {'account_id': accounts['1100'], 'debit': amount},
+            {'account_id': accounts['4100'], 'credit': amount},
+        ], created_by='tester')
+    manager.create_journal_entries_bulk(session, [
+        {
+            'entry_date': datetime(2024, 1 + i % 12, 15),
+            'description': f"비용 {i}",
+            'lines': [
+                {'account_id': accounts['5100' if i % 2 else '5200'], 'debit': str(Decimal(i) + Decimal('0.1'))},
+                {'account_id': accounts['1100'], 'credit': str(Decimal(i) + Decimal('0.1'))},
+            ],
+        }
+        for i in range(40)
+    ], created_by='tester')
+
+    incremental = _period_balances(session)
+    assert incremental
+
+    PeriodBalanceManager().rebuild(session)
+    assert _period_balances(session) == incremental
@@ -0,0 +1,111 @@
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+from aof.anomaly_detection.anomaly_detector import AnomalyDetector
+from aof.anomaly_detection.features import TransactionFeatureBuilder
+from aof.anomaly_detection.model_store import AnomalyModelStore
+from aof.anomaly_detection.streaming import StreamingAnomalyScorer
+from aof.database.models import Base, Transaction
+
+HOOKS = ('before_flush', 'after_flush', 'after_commit', 'after_rollback')
+
+@pytest.fixture
+def Sessions(engine):
+    Base.metadata.create_all(engine)
+    rng = np.random.default_rng(0)
+    now = datetime.utcnow()
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Transaction(transaction_date=now - timedelta(days=int(days), hours=int(hours)),
+                    amount=float(amount), category=category)
+        for days, hours, amount, category in zip(
+            rng.integers(1, 80, 300), rng.integers(9, 18, 300), rng.normal(50000, 5000, 300),
+            rng.choice(['사무용품', '출장비'], 300))
+    ])
+    session.commit()
+    session.close()
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def detector(Sessions, tmp_path):
+    detector = AnomalyDetector(model_store=AnomalyModelStore(str(tmp_path / 'models')), n_jobs=1)
+    session = Sessions()
+    try:
+        detector.train(session)
+    finally:
+        session.close()
+    return detector
+
+@pytest.fixture
+def scorer(detector):
+    scorer = StreamingAnomalyScorer(detector).listen()
+    yield scorer
+    scorer.stop(timeout=5)
+    # 세션 이벤트는 전역으로 등록되므로 다른 테스트에 남지 않도록 해지
+    for name in HOOKS:
+        event.remove(Session, name, getattr(scorer, f'_{name}'))
+
+def _transaction(amount, category='사무용품'):
+    return Transaction(transaction_date=datetime.utcnow(), amount=amount, category=category)
+
+def test_commit_scores_new_transactions_in_the_insert_and_extends_warm_state(Sessions, scorer):
+    builder = scorer.detector.feature_builder
+    assert builder.is_warm
+    session = Sessions()
+    session.add_all([_transaction(51000), _transaction(49000, '출장비')])
+    session.commit()
+
+    stored = session.query(Transaction).filter(Transaction.anomaly_score.isnot(None)).all()
+    assert len(stored) == 2
+    assert all(transaction.anomaly_model_version == 1 for transaction in stored)
+    assert StreamingAnomalyScorer.pop_summary(session)['scored'] == 2
+    assert {transaction.id for transaction in stored} <= set(builder._entries)
+    session.close()
+
+def test_rollback_discards_scored_transactions(Sessions, scorer):
+    builder = scorer.detector.feature_builder
+    known = set(builder._entries)
+    session = Sessions()
+    session.add(_transaction(10_000_000))
+    session.flush()
+    session.rollback()
+
+    assert not any(key.startswith('anomaly_stream') for key in session.info)
+    assert set(builder._entries) == known
+    assert scorer.stats()['pending_alerts'] == 0
+    session.close()
+
+def test_commit_does_not_warm_a_cold_feature_builder(Sessions, scorer):
+    scorer.detector.feature_builder = TransactionFeatureBuilder()
+    session = Sessions()
+    session.add(_transaction(52000))
+    session.commit()
+
+    assert not scorer.detector.feature_builder.is_warm
+    # 다음 warm_features()에서 방금 커밋한 거래까지 데이터베이스에서 채움
+    scorer.detector.warm_features(session)
+    assert len(scorer.detector.feature_builder._entries) == 301
+    session.close()
+
+def test_started_scorer_updates_state_and_delivers_alerts_off_the_committing_thread(Sessions, scorer):
+    received = []
+    delivered = threading.Event()
+    scorer.subscribe(lambda alert: (received.append(alert), delivered.set()))
+    scorer.start()
+
+    session = Sessions()
+    session.info['anomaly_stream_source'] = 'erp'
+    session.add_all([_transaction(50000), _transaction(50_000_000)])
+    session.commit()
+    ids = [transaction.id for transaction in session.query(Transaction.id).filter(Transaction.is_anomaly.is_(True))]
+
+    assert delivered.wait(5)
+    scorer.stop(timeout=5)
+    assert received[0].source == 'erp' and received[0].amount == 50_000_000
+    assert received[0].transaction_id in ids
+    assert scorer.stats()['pending_updates'] == 0
+    assert len(scorer.detector.feature_builder._entries) == 302
+    session.close()
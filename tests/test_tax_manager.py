@@ -0,0 +1,63 @@
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from accounting.accounting_manager import AccountingManager
+from accounting.tax_manager import TaxManager
+from database.models import Account, AccountType
+
+YEAR = (datetime(2023, 1, 1), datetime(2023, 12, 31, 23, 59, 59, 999999))
+
+@pytest.fixture
+def ledger(session):
+    manager = AccountingManager()
+    accounts = {
+        code: manager.create_account(session, code, name, account_type).id
+        for code, name, account_type in [
+            ('1100', '현금', AccountType.ASSET),
+            ('4100', '매출', AccountType.REVENUE),
+            ('5100', '급여', AccountType.EXPENSE),
+        ]
+    }
+    for date, debit_account, credit_account, amount in [
+        (datetime(2023, 3, 1), '1100', '4100', 1000),
+        (datetime(2023, 6, 1), '5100', '1100', 300),
+    ]:
+        manager.create_journal_entry(session, date, "거래", [
+            {'account_id': accounts[debit_account], 'debit': amount},
+            {'account_id': accounts[credit_account], 'credit': amount},
+        ], created_by='tester')
+    return manager, accounts
+
+def test_corporate_tax_for_closed_period_is_cached(session, ledger):
+    tax_manager = TaxManager()
+    first, = tax_manager.compute(session, 'CORPORATE_TAX', [YEAR])
+    second, = tax_manager.compute(session, 'CORPORATE_TAX', [YEAR])
+
+    assert first['total_amount'] == Decimal('700')
+    assert second is first
+
+def test_retroactive_entry_invalidates_cached_report(session, ledger):
+    manager, accounts = ledger
+    tax_manager = TaxManager()
+    tax_manager.compute(session, 'CORPORATE_TAX', [YEAR])
+
+    manager.create_journal_entry(session, datetime(2023, 6, 15), "소급", [
+        {'account_id': accounts['1100'], 'debit': 50},
+        {'account_id': accounts['4100'], 'credit': 50},
+    ], created_by='tester')
+
+    result, = tax_manager.compute(session, 'CORPORATE_TAX', [YEAR])
+    assert result['total_amount'] == Decimal('750')
+
+def test_account_type_change_invalidates_cached_report(session, ledger):
+    _, accounts = ledger
+    tax_manager = TaxManager()
+    tax_manager.compute(session, 'CORPORATE_TAX', [YEAR])
+
+    # 급여 계정을 자산으로 바꾸면 비용에서 빠짐
+    session.get(Account, accounts['5100']).type = AccountType.ASSET
+    session.commit()
+
+    result, = tax_manager.compute(session, 'CORPORATE_TAX', [YEAR])
+    assert result['total_expense'] == Decimal('0')
+    assert result['total_amount'] == Decimal('1000')
@@ -0,0 +1,49 @@
+from datetime import datetime
+from decimal import Decimal
+from accounting.accounting_manager import AccountingManager
+from database.models import AccountType, JournalEntry, JournalLine
+
+def _create_accounts(manager, session):
+    return {
+        code: manager.create_account(session, code, name, account_type).id
+        for code, name, account_type in [
+            ('1100', '현금', AccountType.ASSET),
+            ('4100', '매출', AccountType.REVENUE),
+            ('5100', '급여', AccountType.EXPENSE),
+            ('5200', '임차료', AccountType.EXPENSE),
+        ]
+    }
+
+def test_closing_entry_balances_and_zeroes_income_accounts(session):
+    manager = AccountingManager()
+    accounts = _create_accounts(manager, session)
+    fiscal_year = manager.create_fiscal_year(session, 2024)
+
+    for date, debit_account, credit_account, amount in [
+        (datetime(2024, 2, 10), '1100', '4100', '1000.10'),
+        (datetime(2024, 5, 20), '1100', '4100', '0.05'),
+        (datetime(2024, 6, 30), '5100', '1100', '333.33'),
+        (datetime(2024, 12, 31), '5200', '1100', '100.01'),
+    ]:
+        manager.create_journal_entry(session, date, "거래", [
+            {'account_id': accounts[debit_account], 'debit': amount},
+            {'account_id': accounts[credit_account], 'credit': amount},
+        ], created_by='tester')
+
+    manager.close_fiscal_year(session, fiscal_year.id, closed_by='tester')
+    assert fiscal_year.is_closed
+
+    closing = session.query(JournalEntry).filter(JournalEntry.description == "2024년 결산 전표").one()
+    lines = session.query(JournalLine).filter(JournalLine.entry_id == closing.id).all()
+    assert sum(line.debit for line in lines) == sum(line.credit for line in lines)
+
+    # 수익·비용 계정은 0이 되고 당기순이익은 이익잉여금으로 대체됨
+    totals = manager.period_balance_manager.account_totals(
+        session, start=fiscal_year.start_date, end=fiscal_year.end_date,
+        account_types=[AccountType.REVENUE, AccountType.EXPENSE]
+    )
+    assert all(debit == credit for debit, credit in totals.values())
+
+    retained_earnings = [line for line in lines if line.description == "당기순이익(손실) 대체"]
+    assert len(retained_earnings) == 1
+    assert retained_earnings[0].credit - retained_earnings[0].debit == Decimal('566.81')